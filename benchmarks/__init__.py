@@ -0,0 +1 @@
+"""Offline micro-benchmarks for slug_farm.  Run with `python -m benchmarks --help`."""
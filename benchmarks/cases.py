@@ -0,0 +1,137 @@
+"""
+Benchmark cases, one zero-argument callable per name.
+
+Names read `<backend>.<stage>[.<variant>]`, so `--filter request.` or `--filter .call`
+picks out a slice.  Setup happens here, outside the timed callables.
+"""
+
+from typing import Any, Callable
+
+from slug_farm import BashSlug, PythonSlug, RequestSlug, SessionPool, UDP_Slug
+
+DEPTHS = (1, 10, 50)
+KWARG_COUNTS = (0, 5, 50)
+
+
+def square(number: int) -> int:
+    return number * number
+
+
+def task_kwargs(count: int) -> dict[str, Any]:
+    return {f"opt_{i}": i for i in range(count)}
+
+
+def bash_at_depth(depth: int) -> BashSlug:
+    slug = BashSlug("git", "git")
+    for i in range(depth - 1):
+        slug = slug.branch(f"sub{i}", command=f"sub{i}", slug_kwargs={f"f{i}": True})
+    return slug
+
+
+def request_at_depth(depth: int, base_url: str) -> RequestSlug:
+    slug = RequestSlug("api", base_url=base_url, headers={"Accept": "application/json"})
+    for i in range(depth - 1):
+        slug = slug.branch(f"s{i}", url_segment=f"/s{i}", sub_params={f"p{i}": i})
+    return slug
+
+
+def udp_at_depth(depth: int, port: int) -> UDP_Slug:
+    slug = UDP_Slug("udp", url="127.0.0.1", port=port, burst_size=1)
+    for i in range(depth - 1):
+        slug = slug.branch(f"b{i}", slug_kwargs={f"k{i}": i})
+    return slug
+
+
+def branch_cases(http_url: str, udp_port: int) -> dict[str, Callable[[], Any]]:
+    cases = {}
+    for depth in DEPTHS:
+        bash = bash_at_depth(depth)
+        request = request_at_depth(depth, http_url)
+        udp = udp_at_depth(depth, udp_port)
+        cases[f"bash.branch.depth_{depth}"] = lambda s=bash: s.branch(
+            "leaf", command="status", slug_kwargs={"s": True}
+        )
+        cases[f"request.branch.depth_{depth}"] = lambda s=request: s.branch(
+            "leaf", url_segment="/{item_id}", sub_params={"limit": 10}
+        )
+        cases[f"udp.branch.depth_{depth}"] = lambda s=udp: s.branch(
+            "leaf", slug_kwargs={"sensor": "north"}
+        )
+    return cases
+
+
+def assemble_cases(http_url: str, udp_port: int) -> dict[str, Callable[[], Any]]:
+    cases = {}
+    for depth in DEPTHS:
+        slugs = {
+            "bash": bash_at_depth(depth),
+            "request": request_at_depth(depth, http_url),
+            "udp": udp_at_depth(depth, udp_port),
+        }
+        for count in KWARG_COUNTS:
+            kwargs = task_kwargs(count)
+            for backend, slug in slugs.items():
+                cases[f"{backend}.assemble.depth_{depth}.kwargs_{count}"] = (
+                    lambda s=slug, k=kwargs: s.assemble_tokens(None, k)
+                )
+    python = PythonSlug("square", square)
+    for count in KWARG_COUNTS:
+        cases[f"python.assemble.kwargs_{count}"] = lambda k=task_kwargs(count): (
+            python.assemble_tokens(None, k)
+        )
+    return cases
+
+
+def format_and_process_cases(
+    http_url: str, udp_port: int
+) -> dict[str, Callable[[], Any]]:
+    cases = {}
+    bash = bash_at_depth(10)
+    udp = udp_at_depth(10, udp_port)
+    for count in KWARG_COUNTS:
+        kwargs = task_kwargs(count)
+        cases[f"bash.format_kwargs.kwargs_{count}"] = lambda k=kwargs: (
+            bash.format_kwargs(k)
+        )
+        cases[f"udp.format_kwargs.kwargs_{count}"] = lambda k=kwargs: udp.format_kwargs(
+            k
+        )
+
+    for backend, slug in (
+        ("bash", bash),
+        ("request", request_at_depth(10, http_url)),
+        ("udp", udp),
+        ("python", PythonSlug("square", square)),
+    ):
+        tokens = slug.assemble_tokens(None, task_kwargs(5))
+        cases[f"{backend}.process_tokens.depth_10"] = lambda s=slug, t=tokens: (
+            s.process_tokens(t)
+        )
+    return cases
+
+
+def call_cases(http_url: str, udp_port: int) -> dict[str, Callable[[], Any]]:
+    """End to end: assemble, process, execute and handle_response against real I/O."""
+    true = BashSlug("true", "true")
+    crops = RequestSlug("stub", base_url=http_url).branch("crops", "/crops")
+    pooled = RequestSlug("stub", base_url=http_url, transport=SessionPool()).branch(
+        "crops", "/crops"
+    )
+    udp = udp_at_depth(1, udp_port)
+    python = PythonSlug("square", square)
+    return {
+        "bash.call": lambda: true(),
+        "request.call": lambda: crops(task_kwargs={"season": 2026}),
+        "request.call.session_pool": lambda: pooled(task_kwargs={"season": 2026}),
+        "udp.call": lambda: udp(task_kwargs={"reading": 1}),
+        "python.call": lambda: python(task_kwargs={"number": 7}),
+    }
+
+
+def collect_cases(http_url: str, udp_port: int) -> dict[str, Callable[[], Any]]:
+    return {
+        **branch_cases(http_url, udp_port),
+        **assemble_cases(http_url, udp_port),
+        **format_and_process_cases(http_url, udp_port),
+        **call_cases(http_url, udp_port),
+    }
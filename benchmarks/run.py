@@ -0,0 +1,148 @@
+"""
+Offline micro-benchmarks for the slug pipeline.
+
+    python -m benchmarks --json results.json
+    python -m benchmarks --compare baseline.json --tolerance 0.2
+
+Every case is timed `--repeat` times.  Each run loops the case until at least
+`--min-time` seconds pass, and per-call seconds are reported as min and median.  With
+`--compare`, a case whose median grew by more than `--tolerance` is a regression, and
+the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from benchmarks.cases import collect_cases
+from benchmarks.stubs import StubHTTPServer, UDPSink
+from slug_farm import SlugResult
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> dict[str, Any]:
+    number = 1
+    while True:  # calibrate so one run lasts at least min_time
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number)
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_cases(
+    name_filter: Optional[str], repeat: int, min_time: float
+) -> dict[str, dict[str, Any]]:
+    results = {}
+    with StubHTTPServer() as http, UDPSink() as sink:
+        cases = collect_cases(http.url, sink.port)
+        for name, fn in cases.items():
+            if name_filter and name_filter not in name:
+                continue
+            outcome = fn()
+            if isinstance(outcome, SlugResult) and not outcome.ok:
+                results[name] = {"error": outcome.error or str(outcome.output)}
+            else:
+                results[name] = measure(fn, repeat, min_time)
+            print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def format_row(name: str, result: dict[str, Any], extra: str = "") -> str:
+    if "error" in result:
+        return f"{name:<45} ERROR {result['error']}"
+    return f"{name:<45} {result['median'] * 1e6:>12.2f} us {extra}"
+
+
+def compare(
+    current: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Prints current vs baseline medians and returns the names that regressed."""
+    regressions = []
+    print(f"\n{'case':<45} {'baseline':>12}    {'current':>12}    ratio")
+    for name, result in current.items():
+        before = baseline.get(name)
+        if "error" in result or not before or "error" in before:
+            continue
+        ratio = result["median"] / before["median"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / (1 + tolerance):
+            flag = "  faster"
+        print(
+            f"{name:<45} {before['median'] * 1e6:>12.2f} us "
+            f"{result['median'] * 1e6:>12.2f} us {ratio:>6.2f}x{flag}"
+        )
+    missing = set(baseline) - set(current)
+    if missing:
+        print(f"\n{len(missing)} baseline case(s) not run this time")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed median slowdown before a case counts as a regression (0.2 = 20%%)",
+    )
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="minimum seconds per timed run"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.filter, max(1, args.repeat), args.min_time)
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
@@ -0,0 +1,83 @@
+"""In-process, offline endpoints for the end-to-end cases: an HTTP stub and a UDP sink."""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_BODY = json.dumps({"crops": ["wheat", "corn", "rye"], "acres": 120}).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled transports can reuse sockets
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_BODY)))
+        self.end_headers()
+        self.wfile.write(STUB_BODY)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class StubHTTPServer:
+    """Answers every GET/POST with the same small JSON body, on 127.0.0.1."""
+
+    def __init__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubHTTPServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class UDPSink:
+    """Loopback socket that drains and counts whatever UDP_Slugs send it."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.received = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.sock.getsockname()[1]
+
+    def _drain(self) -> None:
+        while self._running:
+            try:
+                self.sock.recv(65535)
+            except (socket.timeout, OSError):
+                continue
+            self.received += 1
+
+    def __enter__(self) -> "UDPSink":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._running = False
+        self._thread.join()
+        self.sock.close()
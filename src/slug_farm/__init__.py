@@ -1,19 +1,84 @@
-from .base import CommandSegment, Slug, SlugResult
-from .bash_slugs import BashSlug
+from .base import CommandSegment, LazyPayload, Slug, SlugResult
+from .bash_slugs import BashPipe, BashSlug, BatchResult, PipeResult
+from .burst_scheduler import BurstHandle, BurstScheduler
 from .python_slug import PythonSlug
+from .pagination import (
+    ChainedPaginator,
+    CursorPagination,
+    IndexedPaginator,
+    LinkHeaderPagination,
+    OffsetPagination,
+    PagePagination,
+    PaginationError,
+    Paginator,
+)
+from .observers import PhaseEvent, PhaseTimer, SlugObserver
+from .launchers import ForkServerLauncher, Launcher, SpawnLauncher
+from .pipelines import NodeRun, SlugPipeline
+from .process_pool import ProcessPool
+from .rate_limits import RateLimiter, TokenBucket
 from .request_slugs import RequestPackage, RequestSlug
-from .udp_slugs import UDP_Package, UDP_Slug
+from .response_cache import (
+    MemoryCacheBackend,
+    ResponseCache,
+    SQLiteCacheBackend,
+)
+from .streams import ProcessStream, ResponseStream
+from .transports import HTTPXTransport, PoolStats, SessionPool, Transport
+from .udp_slugs import BulkResult, UDP_Package, UDP_Slug
+from .udp_sockets import UDPSocketPool
 from .registries import SlugRegistry
+from .single_flight import SingleFlight
+from .token_cache import FrozenDict, TokenCache
 
 __all__ = [
     "CommandSegment",
+    "LazyPayload",
     "Slug",
     "SlugRegistry",
     "SlugResult",
+    "SingleFlight",
+    "SlugPipeline",
+    "NodeRun",
+    "TokenCache",
+    "FrozenDict",
     "BashSlug",
+    "BashPipe",
+    "PipeResult",
+    "BatchResult",
+    "BurstHandle",
+    "BurstScheduler",
+    "ProcessPool",
+    "Launcher",
+    "SpawnLauncher",
+    "ForkServerLauncher",
     "PythonSlug",
     "RequestPackage",
     "RequestSlug",
+    "CursorPagination",
+    "LinkHeaderPagination",
+    "OffsetPagination",
+    "PagePagination",
+    "PaginationError",
+    "Paginator",
+    "IndexedPaginator",
+    "ChainedPaginator",
+    "PhaseEvent",
+    "PhaseTimer",
+    "SlugObserver",
+    "RateLimiter",
+    "TokenBucket",
+    "MemoryCacheBackend",
+    "ResponseCache",
+    "SQLiteCacheBackend",
+    "ProcessStream",
+    "ResponseStream",
+    "HTTPXTransport",
+    "PoolStats",
+    "SessionPool",
+    "Transport",
+    "BulkResult",
     "UDP_Package",
     "UDP_Slug",
+    "UDPSocketPool",
 ]
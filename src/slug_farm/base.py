@@ -1,23 +1,166 @@
-import copy
+import asyncio
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
+from slug_farm.observers import PhaseEvent, SlugObserver
+from slug_farm.single_flight import SingleFlight, freeze
+from slug_farm.token_cache import (
+    EMPTY,
+    FrozenDict,
+    TokenCache,
+    freeze_tokens,
+    shared_frozen,
+)
 
-@dataclass(slots=True)
+
+_UNRESOLVED = object()
+
+
+def _resolved_payload(value: Any) -> "LazyPayload":
+    payload = LazyPayload(None)
+    payload._value = value
+    return payload
+
+
+class LazyPayload:
+    """
+    A body that is only decoded the first time someone reads `SlugResult.output`.
+    The decoded value is memoized, so results sharing one payload decode it once.
+    """
+
+    __slots__ = ("_decode", "_value")
+
+    def __init__(self, decode: Optional[Callable[[], Any]]):
+        self._decode = decode
+        self._value = _UNRESOLVED
+
+    @property
+    def resolved(self) -> bool:
+        return self._value is not _UNRESOLVED
+
+    def resolve(self) -> Any:
+        if self._value is _UNRESOLVED:
+            self._value = self._decode()
+            self._decode = None
+        return self._value
+
+    def __reduce__(self):
+        return _resolved_payload, (self.resolve(),)
+
+
+class _OutputField:
+    """`SlugResult.output`: accepts a LazyPayload and hands back its decoded value."""
+
+    def __get__(self, obj: Any, objtype: Any = None) -> Any:
+        if obj is None:
+            raise AttributeError("output")  # keeps the dataclass field required
+        value = obj.__dict__["_output"]
+        if isinstance(value, LazyPayload):
+            value = value.resolve()
+            obj.__dict__["_output"] = value
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__["_output"] = value
+
+
+@dataclass
 class SlugResult:
     ok: bool
     status: int
-    output: Any
+    output: Any = _OutputField()
     error: str = ""
     tokens: list[Any] = field(default_factory=list)
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class CommandSegment:
     command: Optional[str] = None
     kwargs: dict = field(default_factory=dict)
 
 
+class SegmentChain(Sequence):
+    """
+    Persistent, read-only list of CommandSegments.
+
+    Each node points at its parent's chain and holds only its own segment, so a branch
+    (or a per-call overlay of task kwargs) costs one node instead of a copy of every
+    ancestor.  Segments are shared between slugs and must not be mutated in place.
+    """
+
+    __slots__ = ("segment", "parent", "depth")
+
+    def __init__(
+        self,
+        segment: Optional[CommandSegment] = None,
+        parent: Optional["SegmentChain"] = None,
+    ):
+        self.segment = segment
+        self.parent = parent if parent else None
+        self.depth = 0 if segment is None else 1 + (parent.depth if parent else 0)
+
+    @classmethod
+    def of(cls, segments: Optional[Iterable[CommandSegment]] = None) -> "SegmentChain":
+        """Accepts an existing chain as-is, or builds one from any iterable of segments."""
+        if isinstance(segments, SegmentChain):
+            return segments
+        chain = EMPTY_CHAIN
+        for segment in segments or ():
+            chain = chain.append(segment)
+        return chain
+
+    def append(self, segment: CommandSegment) -> "SegmentChain":
+        return SegmentChain(segment, self)
+
+    def merge_last(self, kwargs: dict) -> "SegmentChain":
+        """Overlays kwargs onto the last segment, or starts a commandless one."""
+        if self.segment is None:
+            return self.append(
+                CommandSegment(command=None, kwargs=shared_frozen(kwargs))
+            )
+        merged = CommandSegment(
+            self.segment.command, FrozenDict({**self.segment.kwargs, **kwargs})
+        )
+        return SegmentChain(merged, self.parent)
+
+    def without_kwargs(self) -> "SegmentChain":
+        return SegmentChain.of(CommandSegment(seg.command, EMPTY) for seg in self)
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def __iter__(self) -> Iterator[CommandSegment]:
+        nodes = []
+        node = self
+        while node is not None and node.segment is not None:
+            nodes.append(node.segment)
+            node = node.parent
+        return reversed(nodes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.depth
+        if not 0 <= index < self.depth:
+            raise IndexError("segment index out of range")
+        node = self
+        for _ in range(self.depth - 1 - index):
+            node = node.parent
+        return node.segment
+
+    def __repr__(self) -> str:
+        return f"SegmentChain({list(self)!r})"
+
+
+EMPTY_CHAIN = SegmentChain()
+
+
 def default_command_formatter(command: Optional[str] = None):
     """Does Nothing"""
     return command
@@ -28,16 +171,74 @@ def default_kwarg_formatter(kwargs: Optional[dict[str, Any]] = None):
     return kwargs
 
 
+def bounded_map(
+    executor: Executor,
+    fn: Callable[..., Any],
+    args_iter: Iterable[tuple],
+    max_pending: int,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """
+    `fn(*args)` for each args tuple on `executor`, pulling the input lazily and keeping
+    at most `max_pending` calls in flight.  Yields in input order, or as calls finish.
+    """
+    pending: Any = deque() if ordered else set()
+
+    def drain(down_to: int) -> Iterator[Any]:
+        while len(pending) > down_to:
+            if ordered:
+                yield pending.popleft().result()
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                yield future.result()
+
+    for args in args_iter:
+        future = executor.submit(fn, *args)
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+        yield from drain(max_pending - 1)
+    yield from drain(0)
+
+
 class Slug:
+    # Slugs are hydrated by the hundred thousand, so no per-instance __dict__.
+    # Subclasses declare their own __slots__ (or get a __dict__ back if they don't).
+    __slots__ = (
+        "name",
+        "command_segments",
+        "single_flight",
+        "observers",
+        "token_cache",
+    )
+
+    # Executor `map` spins up when none is handed in.  Threads suit I/O-bound slugs.
+    map_executor_class: type[Executor] = ThreadPoolExecutor
+    # False for backends whose `process_tokens` must run fresh on every call.
+    cache_processed_tokens = True
+    # False for backends whose calls act on the world, so two identical calls are two
+    # actions and `single_flight` must never fold them into one.
+    coalesce_calls = True
+
     def __init__(
         self,
         name,
         command: Optional[str] = None,
         slug_kwargs: Optional[dict[str, Any]] = None,
-        base_command_segments: Optional[List[CommandSegment]] = None,
+        base_command_segments: Optional[Iterable[CommandSegment]] = None,
     ):
-        self.name = name
-        self.command_segments = base_command_segments or []
+        # Interned: the same name also keys the registry, token cache and flights.
+        self.name = sys.intern(name)
+        # Opt-in de-duplication of concurrent identical calls, handed down by `branch()`.
+        self.single_flight: Optional[SingleFlight] = None
+        # Phase hooks (see `add_observer`); empty means the call path skips them.
+        self.observers: tuple[SlugObserver, ...] = ()
+        # Opt-in memo of assembled tokens per (name, command, kwargs), shared likewise.
+        self.token_cache: Optional[TokenCache] = None
+        self.command_segments = SegmentChain.of(base_command_segments)
 
         self.command_segments = self.add_command(
             command=command, slug_kwargs=slug_kwargs
@@ -54,18 +255,37 @@ class Slug:
         """Creates a new instance with an additional command-flag segment."""
         new_name = f"{self.name}.{branch_name}"
         if replace_kwargs:
-            return self.__class__(
+            return self._inherit(
+                self.__class__(
+                    name=new_name,
+                    command=command,
+                    slug_kwargs=slug_kwargs,
+                )
+            )
+        return self._inherit(
+            self.__class__(
                 name=new_name,
                 command=command,
                 slug_kwargs=slug_kwargs,
+                base_command_segments=self.command_segments,
             )
-        return self.__class__(
-            name=new_name,
-            command=command,
-            slug_kwargs=slug_kwargs,
-            base_command_segments=copy.deepcopy(self.command_segments),
         )
 
+    def _inherit(self, child: "Slug") -> "Slug":
+        """Hands tree-wide collaborators down to a freshly built branch."""
+        child.single_flight = self.single_flight
+        child.observers = self.observers
+        child.token_cache = self.token_cache
+        return child
+
+    def add_observer(self, observer: SlugObserver) -> "Slug":
+        """
+        Attaches phase start/end hooks to this slug and every branch made from it
+        afterwards.  Returns the slug so roots can be declared in one expression.
+        """
+        self.observers = (*self.observers, observer)
+        return self
+
     def format_commands(self, command: Optional[str] = None) -> Any:
         """Placeholder default formatter. Does Nothing"""
         return command
@@ -78,32 +298,21 @@ class Slug:
         self,
         command: Optional[str] = None,
         slug_kwargs: Optional[dict] = None,
-    ) -> list[CommandSegment]:
-        new_command_segments = (
-            copy.deepcopy(self.command_segments) if self.command_segments else []
-        )
+    ) -> SegmentChain:
+        """Returns this slug's chain plus one segment; the chain itself is never copied."""
+        chain = self.command_segments
 
         if not command and not slug_kwargs:
-            return new_command_segments
+            return chain
 
         if slug_kwargs and not command:
-            if new_command_segments:
-                # Case A: Append to existing context
-                print("Appending kwargs to last command segment")
-                new_command_segments[-1].kwargs.update(slug_kwargs)
-            else:
-                # Case B: No history yet, create a "Commandless" segment for these flags
-                print("Creating a commandless segment for orphaned kwargs")
-                new_command_segments.append(
-                    CommandSegment(command=None, kwargs=slug_kwargs)
-                )
-            return new_command_segments
-
-        if not slug_kwargs:
-            slug_kwargs = {}
+            # Case A: merge into the last segment.  Case B: no history yet, so this
+            # starts a "Commandless" segment for the flags.
+            return chain.merge_last(slug_kwargs)
 
-        new_command_segments.append(CommandSegment(command=command, kwargs=slug_kwargs))
-        return new_command_segments
+        return chain.append(
+            CommandSegment(command=command, kwargs=shared_frozen(slug_kwargs))
+        )
 
     def test_print(
         self,
@@ -126,7 +335,7 @@ class Slug:
         task_kwargs: Optional[dict[str, Any]] = None,
     ):
         task_commands = self.add_command(command=command, slug_kwargs=task_kwargs)
-        if isinstance(self.command_segments, list):
+        if isinstance(task_commands, SegmentChain):
             tokens = [
                 (self.format_commands(str(x.command)), self.format_kwargs(x.kwargs))
                 for x in task_commands
@@ -161,9 +370,6 @@ class Slug:
         tokens: list[Any],
         processed_tokens: Optional[Any | None] = None,
     ) -> Any:
-        print(
-            "You didn't instantiate this with a usable command.  Its just a sad useless Slug"
-        )
         if not processed_tokens:
             processed_tokens = tokens
         return SlugResult(
@@ -173,24 +379,104 @@ class Slug:
             tokens=tokens,
         )
 
-    def __call__(
+    async def aexecute(
         self,
-        command: Optional[str] = None,
-        task_kwargs: Optional[dict[str, Any]] = None,
-        test=False,
-    ) -> SlugResult:
-        tokens = self.assemble_tokens(command=command, task_kwargs=task_kwargs)
+        tokens: list[Any],
+        processed_tokens: Optional[Any | None] = None,
+    ) -> Any:
+        """Fallback async path: runs the blocking `execute` in a worker thread."""
+        return await asyncio.to_thread(self.execute, tokens, processed_tokens)
+
+    def _dry_run(self, tokens: list[Any], processed_tokens: Any) -> SlugResult:
+        print(f"\n--- DRY RUN: {self.name} ---")
+        print_output = self.test_print(tokens, processed_tokens)
+        return SlugResult(
+            ok=True,
+            status=200,
+            output=print_output,
+            error="Dont Think So",
+            tokens=tokens,
+        )
+
+    def flight_key(self, tokens: list[Any]) -> Any:
+        """
+        Identical keys mean interchangeable calls under `single_flight`; None means the
+        call is never shared.  A streamed result is a one-shot iterator, so it is not.
+        """
+        if not self.coalesce_calls or getattr(self, "stream", None):
+            return None
+        return (type(self).__name__, freeze(tokens))
+
+    def _tokens(
+        self, command: Optional[str], task_kwargs: Optional[dict[str, Any]]
+    ) -> tuple[Any, Any]:
+        """Assembled and processed tokens, from the token cache when one is attached."""
+        cache = self.token_cache
+        if cache is None:
+            tokens = self.assemble_tokens(command=command, task_kwargs=task_kwargs)
+            return tokens, self.process_tokens(tokens)
+
+        key = (self.name, id(self), command, freeze(task_kwargs or {}))
+        entry = cache.get(key)
+        if entry is not None:
+            tokens, processed_tokens = entry
+            if not self.cache_processed_tokens:
+                processed_tokens = self.process_tokens(tokens)
+            return tokens, processed_tokens
+
+        tokens = freeze_tokens(
+            self.assemble_tokens(command=command, task_kwargs=task_kwargs)
+        )
         processed_tokens = self.process_tokens(tokens)
-        if test:
-            print(f"\n--- DRY RUN: {self.name} ---")
-            print_output = self.test_print(tokens, processed_tokens)
-            return SlugResult(
-                ok=True,
-                status=200,
-                output=print_output,
-                error="Dont Think So",
-                tokens=tokens,
-            )
+        if not self.cache_processed_tokens:
+            cache.put(key, tokens, None, self)
+        elif processed_tokens is tokens:
+            cache.put(key, tokens, tokens, self)
+        else:
+            cache.put(key, tokens, freeze_tokens(processed_tokens), self)
+        return tokens, processed_tokens
+
+    def _phase_start(self, phase: str) -> PhaseEvent:
+        event = PhaseEvent(self.name, type(self).__name__, phase, time.perf_counter())
+        for observer in self.observers:
+            observer.phase_start(event)
+        return event
+
+    def _phase_end(
+        self, event: PhaseEvent, result: Any = None, error: Any = None
+    ) -> None:
+        event.ended = time.perf_counter()
+        event.error = error
+        if isinstance(result, SlugResult):
+            event.status, event.ok = result.status, result.ok
+        elif hasattr(result, "status_code"):  # a raw HTTP response
+            event.status = result.status_code
+            event.ok = result.status_code < 400
+        for observer in self.observers:
+            observer.phase_end(event)
+
+    def _phase(self, phase: str, fn, *args) -> Any:
+        """Runs one pipeline phase between `phase_start` and `phase_end` hooks."""
+        event = self._phase_start(phase)
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._phase_end(event, error=e)
+            raise
+        self._phase_end(event, result)
+        return result
+
+    async def _aphase(self, phase: str, fn, *args) -> Any:
+        event = self._phase_start(phase)
+        try:
+            result = await fn(*args)
+        except BaseException as e:
+            self._phase_end(event, error=e)
+            raise
+        self._phase_end(event, result)
+        return result
+
+    def _run(self, tokens: list[Any], processed_tokens: Any) -> SlugResult:
         response = self.execute(
             tokens=tokens,
             processed_tokens=processed_tokens,
@@ -198,3 +484,148 @@ class Slug:
         if isinstance(response, SlugResult):
             return response
         return self.handle_response(response, tokens)
+
+    async def _arun(self, tokens: list[Any], processed_tokens: Any) -> SlugResult:
+        response = await self.aexecute(
+            tokens=tokens,
+            processed_tokens=processed_tokens,
+        )
+        if isinstance(response, SlugResult):
+            return response
+        return self.handle_response(response, tokens)
+
+    def _observed_run(self, tokens: list[Any], processed_tokens: Any) -> SlugResult:
+        response = self._phase("execute", self.execute, tokens, processed_tokens)
+        if isinstance(response, SlugResult):
+            return response
+        return self._phase("handle_response", self.handle_response, response, tokens)
+
+    async def _observed_arun(
+        self, tokens: list[Any], processed_tokens: Any
+    ) -> SlugResult:
+        response = await self._aphase(
+            "execute", self.aexecute, tokens, processed_tokens
+        )
+        if isinstance(response, SlugResult):
+            return response
+        return self._phase("handle_response", self.handle_response, response, tokens)
+
+    def _observed_tokens(
+        self, command: Optional[str], task_kwargs: Optional[dict[str, Any]]
+    ) -> tuple[Any, Any]:
+        if self.token_cache is not None:  # a hit skips both phases, so report one
+            return self._phase("assemble_tokens", self._tokens, command, task_kwargs)
+        tokens = self._phase(
+            "assemble_tokens", self.assemble_tokens, command, task_kwargs
+        )
+        return tokens, self._phase("process_tokens", self.process_tokens, tokens)
+
+    def _observed_call(
+        self, command: Optional[str], task_kwargs: Optional[dict[str, Any]], test: bool
+    ) -> SlugResult:
+        """`__call__` with every phase reported; only taken when observers are attached."""
+        tokens, processed_tokens = self._observed_tokens(command, task_kwargs)
+        if test:
+            return self._dry_run(tokens, processed_tokens)
+        if self.single_flight is not None:
+            return self.single_flight.do(
+                self.flight_key(tokens),
+                lambda: self._observed_run(tokens, processed_tokens),
+            )
+        return self._observed_run(tokens, processed_tokens)
+
+    async def _observed_acall(
+        self, command: Optional[str], task_kwargs: Optional[dict[str, Any]], test: bool
+    ) -> SlugResult:
+        tokens, processed_tokens = self._observed_tokens(command, task_kwargs)
+        if test:
+            return self._dry_run(tokens, processed_tokens)
+        if self.single_flight is not None:
+            return await self.single_flight.ado(
+                self.flight_key(tokens),
+                lambda: self._observed_arun(tokens, processed_tokens),
+            )
+        return await self._observed_arun(tokens, processed_tokens)
+
+    def __call__(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+        test=False,
+    ) -> SlugResult:
+        if self.observers:
+            return self._phase("call", self._observed_call, command, task_kwargs, test)
+        tokens, processed_tokens = self._tokens(command, task_kwargs)
+        if test:
+            return self._dry_run(tokens, processed_tokens)
+        if self.single_flight is not None:
+            return self.single_flight.do(
+                self.flight_key(tokens), lambda: self._run(tokens, processed_tokens)
+            )
+        return self._run(tokens, processed_tokens)
+
+    async def acall(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+        test=False,
+    ) -> SlugResult:
+        """Same pipeline as `__call__`, awaiting the backend's non-blocking `aexecute`."""
+        if self.observers:
+            return await self._aphase(
+                "call", self._observed_acall, command, task_kwargs, test
+            )
+        tokens, processed_tokens = self._tokens(command, task_kwargs)
+        if test:
+            return self._dry_run(tokens, processed_tokens)
+        if self.single_flight is not None:
+            return await self.single_flight.ado(
+                self.flight_key(tokens), lambda: self._arun(tokens, processed_tokens)
+            )
+        return await self._arun(tokens, processed_tokens)
+
+    def map(
+        self,
+        task_kwargs_iter: Iterable[Optional[dict[str, Any]]],
+        command: Optional[str] = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[SlugResult]:
+        """
+        Runs this slug once per task_kwargs, `max_workers` at a time.
+
+        The input is pulled lazily and at most `2 * max_workers` calls are in flight,
+        so a huge (or endless) iterator never piles up in memory.  Results come back in
+        input order, or as they finish with `ordered=False`.
+        """
+        own_executor = executor is None
+        if own_executor:
+            executor = self.map_executor_class(max_workers=max_workers)
+        try:
+            yield from bounded_map(
+                executor,
+                self,
+                ((command, task_kwargs) for task_kwargs in task_kwargs_iter),
+                max_pending=max(1, 2 * max_workers),
+                ordered=ordered,
+            )
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def imap_unordered(
+        self,
+        task_kwargs_iter: Iterable[Optional[dict[str, Any]]],
+        command: Optional[str] = None,
+        max_workers: int = 8,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[SlugResult]:
+        """`map` that yields each SlugResult as soon as it is ready."""
+        return self.map(
+            task_kwargs_iter,
+            command=command,
+            max_workers=max_workers,
+            ordered=False,
+            executor=executor,
+        )
@@ -1,31 +1,187 @@
+import asyncio
 import copy
+import locale
+import os
+import re
 import shlex
+import signal
 import subprocess
-from typing import Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import IO, Any, Iterable, Iterator, Optional
 
-from slug_farm.base import CommandSegment, Slug, SlugResult
+from slug_farm.base import (
+    CommandSegment,
+    SegmentChain,
+    Slug,
+    SlugResult,
+    bounded_map,
+)
+from slug_farm.launchers import Launcher, resolve_launcher
+from slug_farm.process_pool import ProcessPool, active_pool, tree_of
+from slug_farm.streams import STDERR_LIMIT, STREAM_MODES, PipeTail, ProcessStream
+
+
+Token = tuple[Optional[str], list[str]]
+
+
+@lru_cache(maxsize=4096)
+def split_command(command: str) -> tuple[str, ...]:
+    """`shlex.split`, memoized: the same command strings come back on every call."""
+    return tuple(shlex.split(command))
+
+
+@dataclass(slots=True)
+class CompiledArgv:
+    """
+    A branch's inherited segments, formatted and split once instead of on every call.
+    Everything but the last segment is fixed; the last may still absorb task kwargs.
+    """
+
+    chain: SegmentChain
+    prefix_tokens: tuple[Token, ...]
+    argv_prefix: tuple[str, ...]
+    last: Optional[CommandSegment]
+    last_token: Optional[Token]
+
+
+class BashTokens(list):
+    """
+    Assembled (command, flags) tokens that know how many leading entries the slug's
+    precompiled argv prefix already covers, so `process_tokens` only splits the rest.
+    Shared entries are read-only.
+    """
+
+    __slots__ = ("argv_prefix", "prefix_len")
+
+
+BatchItem = str | list[str] | tuple[str, ...] | dict[str, Any]
+
+# Linux and macOS charge each argv/env string its bytes, a NUL and a pointer.
+_ARG_OVERHEAD = 1 + 8
+# Like xargs, leave room for whatever the kernel or libc add on top.
+_ARG_HEADROOM = 2048
+
+
+def arg_budget() -> int:
+    """Bytes of argv a child may get: ARG_MAX less our own environment and headroom."""
+    try:
+        limit = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        limit = 128 * 1024
+    environ = getattr(os, "environb", None) or {
+        k.encode(): v.encode() for k, v in os.environ.items()
+    }
+    used = sum(len(k) + len(v) + 1 + _ARG_OVERHEAD for k, v in environ.items())
+    return max(4096, limit - used - _ARG_HEADROOM)
+
+
+# An operand as error messages print it: 'x', "x", ‘x’, `x', or `x:` after a space.
+_OPERAND = r"""(?:['"‘`]{0}['"’`]|(?:^|\s){0}:)"""
+
+
+def arg_cost(argv: Iterable[str]) -> int:
+    return sum(len(os.fsencode(arg)) + _ARG_OVERHEAD for arg in argv)
+
+
+@dataclass
+class BatchResult(SlugResult):
+    """
+    One batched invocation.  `item_ok[i]` is True or False when the outcome of
+    `items[i]` is known, and None when a failed batch could not be pinned on it.
+    """
+
+    items: list[Any] = field(default_factory=list)
+    item_ok: list[Optional[bool]] = field(default_factory=list)
+
+    @property
+    def failed_items(self) -> list[Any]:
+        return [item for item, ok in zip(self.items, self.item_ok) if ok is False]
+
+
+@dataclass
+class PipeResult(SlugResult):
+    """A BashPipe's result, plus one SlugResult per stage (status, stderr, argv)."""
+
+    stages: list[SlugResult] = field(default_factory=list)
 
 
 class BashSlug(Slug):
+    __slots__ = (
+        "stream",
+        "encoding",
+        "tee",
+        "stderr_limit",
+        "process_pool",
+        "launcher",
+        "read_only",
+        "_argv",
+    )
+
     def __init__(
         self,
         name: str,
         command: Optional[str] = None,
         slug_kwargs: Optional[dict[str, Any]] = None,
-        base_command_segments: Optional[List[CommandSegment]] = None,
+        base_command_segments: Optional[Iterable[CommandSegment]] = None,
+        stream: Optional[str] = None,
+        encoding: Optional[str] = "utf-8",
+        tee: Optional[str | os.PathLike | IO[bytes]] = None,
+        stderr_limit: int = STDERR_LIMIT,
+        process_pool: Optional[ProcessPool] = None,
+        launcher: Optional[str | Launcher] = None,
+        read_only: bool = False,
     ):
+        """
+        `stream` ("chunks", "lines", "ndjson" or "json_array") makes `SlugResult.output`
+        a ProcessStream fed from the pipe while the command runs, instead of the whole
+        stdout.  `ok`/`status` then only say the process started; the exit code and the
+        last `stderr_limit` bytes of stderr are on the stream once it is drained.
+
+        `encoding=None` keeps streamed lines as bytes, and `tee` (a path or binary file)
+        receives a copy of everything the command prints to stdout.
+
+        `process_pool` routes `acall` through a ProcessPool (shared by every branch),
+        which caps concurrency and kills the process group on timeout.
+
+        `launcher` ("spawn", "forkserver" or a Launcher) replaces `subprocess.run` for
+        buffered calls and batches: "spawn" uses posix_spawn directly, "forkserver"
+        has a small helper process start the children, so spawning never touches a
+        big scheduler's address space.
+
+        `read_only` says the command only reads, so identical concurrent calls may
+        share one run under `single_flight`.  Without it every call runs: a command
+        may write, and two writes are not one.  Branches inherit it unless they say
+        otherwise.
+        """
+        if stream is not None and stream not in STREAM_MODES:
+            raise ValueError(
+                f"Unknown stream mode {stream!r}, expected one of {STREAM_MODES}"
+            )
         super().__init__(
             name=name,
             command=command,
             slug_kwargs=slug_kwargs,
             base_command_segments=base_command_segments,
         )
+        self.stream = stream
+        self.encoding = encoding
+        self.tee = tee
+        self.stderr_limit = stderr_limit
+        self.process_pool = process_pool
+        self.launcher = resolve_launcher(launcher)
+        self.read_only = read_only
+        self._argv: Optional[CompiledArgv] = None
 
     def branch(
         self,
         branch_name: str,
         command: Optional[str] = None,
         slug_kwargs: Optional[dict[str, Any]] = None,
+        stream: Optional[str] = None,
+        tee: Optional[str | os.PathLike | IO[bytes]] = None,
+        read_only: Optional[bool] = None,
     ) -> "BashSlug":
         """
         Create a child BashSlug.
@@ -36,13 +192,33 @@ class BashSlug(Slug):
         In `slug_kwargs`, keys starting with '-' (e.g. {"-name": "*.csv"}) to bypass auto-prefixing.
         """
 
-        return self.__class__(
-            f"{self.name}.{branch_name}",
-            command,
-            slug_kwargs,
-            base_command_segments=self.command_segments,
+        return self._inherit(
+            self.__class__(
+                f"{self.name}.{branch_name}",
+                command,
+                slug_kwargs,
+                base_command_segments=self.command_segments,
+                stream=stream or self.stream,
+                encoding=self.encoding,
+                tee=tee or self.tee,
+                stderr_limit=self.stderr_limit,
+                process_pool=self.process_pool,
+                launcher=self.launcher,
+                read_only=self.read_only if read_only is None else read_only,
+            )
         )
 
+    def __or__(self, other: "BashSlug | BashPipe") -> "BashPipe":
+        """`find | grep` without a shell: stdout feeds the next stage over an OS pipe."""
+        if not isinstance(other, (BashSlug, BashPipe)):
+            return NotImplemented
+        return BashPipe((self,)) | other
+
+    def flight_key(self, tokens: list[Any]) -> Any:
+        if not self.read_only:
+            return None
+        return super().flight_key(tokens)
+
     def format_kwargs(self, kwargs: dict[str, Any] | None = None) -> list[str]:
         formatted = []
         if kwargs:
@@ -74,11 +250,9 @@ class BashSlug(Slug):
         print(f"Command: {command_string}")
         return command_string
 
-    def execute(
-        self,
-        tokens: list[tuple[Optional[str], list[str]]],
-        processed_tokens: Optional[Any] = None,
-    ):
+    def flatten_tokens(
+        self, tokens: list[tuple[Optional[str], list[str]]]
+    ) -> list[str]:
         """
         Flattens the tuples into a single list of strings for subprocess.
         tokens looks like: [('git', []), ('commit', ['-m', 'msg']), (None, ['--force'])]
@@ -87,11 +261,97 @@ class BashSlug(Slug):
 
         for cmd, flags in tokens:
             if cmd:
-                final_flag_list.extend(shlex.split(cmd))
+                final_flag_list.extend(split_command(cmd))
 
             if flags:
                 final_flag_list.extend(flags)
+        return final_flag_list
+
+    def _token(self, segment: CommandSegment) -> Token:
+        return (
+            self.format_commands(str(segment.command)),
+            self.format_kwargs(segment.kwargs),
+        )
+
+    def compile_argv(self) -> CompiledArgv:
+        """Formats and splits every inherited segment but the last, once."""
+        segments = list(self.command_segments)
+        prefix_tokens = tuple(self._token(seg) for seg in segments[:-1])
+        return CompiledArgv(
+            chain=self.command_segments,
+            prefix_tokens=prefix_tokens,
+            argv_prefix=tuple(self.flatten_tokens(prefix_tokens)),
+            last=segments[-1] if segments else None,
+            last_token=self._token(segments[-1]) if segments else None,
+        )
+
+    @property
+    def compiled_argv(self) -> CompiledArgv:
+        """
+        Compiled on first call rather than in `branch()`, so declaring a deep tree stays
+        cheap, and again only if `command_segments` is replaced.
+        """
+        if self._argv is None or self._argv.chain is not self.command_segments:
+            self._argv = self.compile_argv()
+        return self._argv
+
+    def assemble_tokens(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+    ) -> BashTokens:
+        """
+        Same tokens as walking every segment, but only the per-task part is formatted:
+        a command appends a segment, bare task kwargs merge into the last one.
+        """
+        compiled = self.compiled_argv
+        tokens = BashTokens(compiled.prefix_tokens)
+        tokens.argv_prefix = compiled.argv_prefix
+        tokens.prefix_len = len(compiled.prefix_tokens)
+
+        if task_kwargs and not command:
+            if compiled.last is None:
+                tokens.append(
+                    (self.format_commands("None"), self.format_kwargs(task_kwargs))
+                )
+            else:
+                merged = {**compiled.last.kwargs, **task_kwargs}
+                tokens.append((compiled.last_token[0], self.format_kwargs(merged)))
+            return tokens
 
+        if compiled.last_token is not None:
+            tokens.append(compiled.last_token)
+        if command:
+            tokens.append(
+                (self.format_commands(str(command)), self.format_kwargs(task_kwargs))
+            )
+        return tokens
+
+    def process_tokens(self, tokens: list[Token]) -> list[str]:
+        """The final argv: the precompiled prefix plus the per-task tokens, split."""
+        argv_prefix = getattr(tokens, "argv_prefix", None)
+        if argv_prefix is None:
+            return self.flatten_tokens(tokens)
+        return [*argv_prefix, *self.flatten_tokens(tokens[tokens.prefix_len :])]
+
+    def _final_argv(self, tokens: list[Token], processed_tokens: Any) -> list[str]:
+        if processed_tokens is None:
+            return self.process_tokens(tokens)
+        return list(processed_tokens)
+
+    def execute(
+        self,
+        tokens: list[tuple[Optional[str], list[str]]],
+        processed_tokens: Optional[Any] = None,
+    ):
+        final_flag_list = self._final_argv(tokens, processed_tokens)
+        if self.stream is not None:
+            return self._execute_stream(final_flag_list)
+        return self._run_argv(final_flag_list)
+
+    def _run_argv(self, final_flag_list: list[str]) -> SlugResult:
+        if self.launcher is not None:
+            return self._launch(final_flag_list)
         try:
             cp = subprocess.run(
                 final_flag_list, capture_output=True, text=True, check=True
@@ -115,3 +375,331 @@ class BashSlug(Slug):
             return SlugResult(
                 ok=False, status=1, output="", error=str(e), tokens=final_flag_list
             )
+
+    def _launch(self, final_flag_list: list[str]) -> SlugResult:
+        """Same result shape as `subprocess.run(..., text=True)`, via `self.launcher`."""
+        encoding = locale.getpreferredencoding(False)
+        try:
+            returncode, stdout, stderr = self.launcher.run(final_flag_list)
+            output, error = (
+                data.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+                for data in (stdout, stderr)
+            )
+        except Exception as e:
+            return SlugResult(
+                ok=False, status=1, output="", error=str(e), tokens=final_flag_list
+            )
+        return SlugResult(
+            ok=returncode == 0,
+            status=returncode,
+            output=output,
+            error=error,
+            tokens=final_flag_list,
+        )
+
+    def _item_args(self, item: BatchItem) -> list[str]:
+        if isinstance(item, dict):
+            return self.format_kwargs(item)
+        if isinstance(item, (list, tuple)):
+            return [str(arg) for arg in item]
+        return [str(item)]
+
+    def _pack(
+        self,
+        items: Iterable[BatchItem],
+        base_cost: int,
+        budget: int,
+        max_items: Optional[int],
+    ) -> Iterator[tuple[list[BatchItem], list[list[str]]]]:
+        batch: list[BatchItem] = []
+        fragments: list[list[str]] = []
+        cost = base_cost
+        for item in items:
+            args = self._item_args(item)
+            item_cost = arg_cost(args)
+            full = max_items is not None and len(batch) >= max_items
+            if batch and (full or cost + item_cost > budget):
+                yield batch, fragments
+                batch, fragments, cost = [], [], base_cost
+            batch.append(item)
+            fragments.append(args)
+            cost += item_cost
+        if batch:
+            yield batch, fragments
+
+    def _blame(
+        self, result: SlugResult, fragments: list[list[str]]
+    ) -> list[Optional[bool]]:
+        """Maps a batch's exit status back onto its items as far as it honestly can."""
+        if result.ok:
+            return [True] * len(fragments)
+        if len(fragments) == 1:
+            return [False]
+        # Tools like gzip, rm or ls name the operand they choke on and carry on.
+        # Only a whole, quoted or colon-terminated mention counts: `log` is not
+        # named by "cannot access 'log.1'".
+        stderr = result.error or ""
+        return [
+            False
+            if any(
+                re.search(_OPERAND.format(re.escape(arg)), stderr, re.MULTILINE)
+                for arg in args
+                if not arg.startswith("-")
+            )
+            else None
+            for args in fragments
+        ]
+
+    def _run_batch(
+        self,
+        base_argv: list[str],
+        items: list[BatchItem],
+        fragments: list[list[str]],
+        isolate_failures: bool,
+    ) -> BatchResult:
+        argv = list(base_argv)
+        for args in fragments:
+            argv.extend(args)
+        result = self._run_argv(argv)
+        item_ok = self._blame(result, fragments)
+        if isolate_failures and None in item_ok:
+            for i, ok in enumerate(item_ok):
+                if ok is None:
+                    item_ok[i] = self._run_argv(base_argv + fragments[i]).ok
+        return BatchResult(
+            ok=result.ok,
+            status=result.status,
+            output=result.output,
+            error=result.error,
+            tokens=argv,
+            items=items,
+            item_ok=item_ok,
+        )
+
+    def batch(
+        self,
+        items: Iterable[BatchItem],
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+        max_workers: int = 4,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ordered: bool = True,
+        isolate_failures: bool = False,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        xargs for slugs: appends as many items as fit in one argv (`max_bytes`, by
+        default what ARG_MAX leaves, and at most `max_items`) to this slug's command,
+        and runs the batches `max_workers` processes at a time.
+
+        An item is a positional argument, a list of them, or a kwargs dict formatted
+        like `slug_kwargs`.  `items` is pulled lazily.  Each BatchResult maps success
+        back to its items.  A batch that exits non-zero blames only the items its
+        stderr names.  `isolate_failures=True` re-runs every other item of a failed
+        batch on its own to find out, which is only safe for idempotent commands.
+        """
+        base_argv = self.process_tokens(self.assemble_tokens(command, task_kwargs))
+        budget = arg_budget() if max_bytes is None else max_bytes
+        batches = self._pack(items, arg_cost(base_argv), budget, max_items)
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            yield from bounded_map(
+                executor,
+                self._run_batch,
+                (
+                    (base_argv, batch, fragments, isolate_failures)
+                    for batch, fragments in batches
+                ),
+                max_pending=max(1, 2 * max_workers),
+                ordered=ordered,
+            )
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _execute_stream(self, final_flag_list: list[str]) -> SlugResult:
+        try:
+            proc = subprocess.Popen(
+                final_flag_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            stream = ProcessStream(
+                proc,
+                mode=self.stream,
+                encoding=self.encoding,
+                tee=self.tee,
+                stderr_limit=self.stderr_limit,
+            )
+        except Exception as e:
+            return SlugResult(
+                ok=False, status=1, output="", error=str(e), tokens=final_flag_list
+            )
+        return SlugResult(
+            ok=True, status=0, output=stream, error="", tokens=final_flag_list
+        )
+
+    async def aexecute(
+        self,
+        tokens: list[tuple[Optional[str], list[str]]],
+        processed_tokens: Optional[Any] = None,
+    ) -> SlugResult:
+        """
+        Non-blocking twin of `execute` built on asyncio's subprocess support.
+        Streaming slugs only start the process here, so they share `execute`'s path.
+        """
+        final_flag_list = self._final_argv(tokens, processed_tokens)
+        if self.stream is not None:
+            return self._execute_stream(final_flag_list)
+        pool = self.process_pool or active_pool.get()
+        if pool is not None:
+            return await pool.run_argv(final_flag_list, tree=tree_of(self.name))
+        if self.launcher is not None:
+            return await asyncio.to_thread(self._launch, final_flag_list)
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *final_flag_list,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+            return SlugResult(
+                ok=proc.returncode == 0,
+                status=proc.returncode,
+                output=stdout.decode(errors="replace"),
+                error=stderr.decode(errors="replace"),
+                tokens=final_flag_list,
+            )
+        except Exception as e:
+            return SlugResult(
+                ok=False, status=1, output="", error=str(e), tokens=final_flag_list
+            )
+
+
+class BashPipe(Slug):
+    """
+    BashSlugs wired stdout-to-stdin with real OS pipes, built with `|`:
+
+        errors = (journal | grep.branch("errors", command="ERROR") | wc)(task_kwargs=...)
+
+    Bytes flow between the processes directly, never through Python.  The call's
+    `command` and `task_kwargs` go to the first stage; bake the others in with
+    `branch()`.  The result's output is the last stage's stdout, and `stages` holds a
+    SlugResult per stage.  `ok` needs every stage to succeed (like `set -o pipefail`),
+    except that an upstream stage killed by SIGPIPE, because a later one stopped
+    reading, is not a failure.  Each stage keeps only the last `stderr_limit` bytes of
+    its stderr.
+    """
+
+    __slots__ = ("stages", "stderr_limit")
+
+    def __init__(
+        self,
+        stages: Iterable[BashSlug],
+        name: Optional[str] = None,
+        stderr_limit: int = STDERR_LIMIT,
+    ):
+        self.stages = tuple(stages)
+        if not self.stages:
+            raise ValueError("A BashPipe needs at least one stage")
+        super().__init__(name or "|".join(stage.name for stage in self.stages))
+        self.stderr_limit = stderr_limit
+
+    def __or__(self, other: "BashSlug | BashPipe") -> "BashPipe":
+        if isinstance(other, BashSlug):
+            added = (other,)
+        elif isinstance(other, BashPipe):
+            added = other.stages
+        else:
+            return NotImplemented
+        return self._inherit(
+            BashPipe(self.stages + added, stderr_limit=self.stderr_limit)
+        )
+
+    def assemble_tokens(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+    ) -> list[list[str]]:
+        """One argv per stage."""
+        first, *rest = self.stages
+        argvs = [first.process_tokens(first.assemble_tokens(command, task_kwargs))]
+        argvs.extend(stage.process_tokens(stage.assemble_tokens()) for stage in rest)
+        return argvs
+
+    def flight_key(self, tokens: list[list[str]]) -> Any:
+        """Shared only when every stage is `read_only`."""
+        if not all(stage.read_only for stage in self.stages):
+            return None
+        return super().flight_key(tokens)
+
+    def test_print(
+        self, tokens: list[list[str]], processed_tokens: Optional[Any] = None
+    ):
+        command_string = " | ".join(shlex.join(argv) for argv in tokens)
+        print(f"Command: {command_string}")
+        return command_string
+
+    def _stage_ok(self, index: int, returncode: int) -> bool:
+        if returncode == 0:
+            return True
+        return index < len(self.stages) - 1 and returncode == -signal.SIGPIPE
+
+    def execute(
+        self, tokens: list[list[str]], processed_tokens: Optional[Any] = None
+    ) -> PipeResult:
+        argvs = [list(argv) for argv in tokens]
+        procs: list[subprocess.Popen] = []
+        tails: list[PipeTail] = []
+        upstream = None
+        try:
+            for argv in argvs:
+                proc = subprocess.Popen(
+                    argv, stdin=upstream, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                if upstream is not None:
+                    # Only the next stage holds the read end now, so EOF and SIGPIPE
+                    # propagate the way they do in a shell.
+                    upstream.close()
+                upstream = proc.stdout
+                procs.append(proc)
+                tails.append(PipeTail(proc.stderr, self.stderr_limit))
+        except Exception as e:
+            if upstream is not None:
+                upstream.close()
+            for proc in procs:
+                proc.kill()
+                proc.wait()
+            return PipeResult(ok=False, status=1, output="", error=str(e), tokens=argvs)
+
+        stdout = procs[-1].stdout.read()
+        procs[-1].stdout.close()
+
+        stages = []
+        for index, (proc, tail, argv) in enumerate(zip(procs, tails, argvs)):
+            returncode = proc.wait()
+            stderr = tail.join()
+            proc.stderr.close()
+            stages.append(
+                SlugResult(
+                    ok=self._stage_ok(index, returncode),
+                    status=returncode,
+                    output="",
+                    error=stderr.decode(errors="replace"),
+                    tokens=argv,
+                )
+            )
+        stages[-1].output = stdout.decode(errors="replace")
+
+        failed = [stage for stage in stages if not stage.ok]
+        return PipeResult(
+            ok=not failed,
+            status=failed[-1].status if failed else 0,
+            output=stages[-1].output,
+            error="".join(stage.error for stage in stages),
+            tokens=argvs,
+            stages=stages,
+        )
@@ -0,0 +1,213 @@
+import math
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Optional
+
+
+class BurstHandle(Future):
+    """
+    A scheduled burst.  Resolves once its last packet is sent, or the first send fails.
+    `sent_at` holds the monotonic time of every send.  `cancel()` drops the packets
+    not sent yet.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.sent_at: list[float] = []
+
+
+class _Burst:
+    __slots__ = ("send", "remaining", "delay", "due", "handle", "finish")
+
+    def __init__(self, send, count, delay, start, handle, finish):
+        self.send = send
+        self.remaining = count
+        self.delay = delay
+        self.due = start  # next deadline; advanced by `delay` from start, so no drift
+        self.handle = handle
+        self.finish = finish
+
+
+class BurstScheduler:
+    """
+    Runs the timed sends of any number of bursts from one thread, on a hashed timer
+    wheel of `slots` buckets, `tick` seconds each.  `submit` returns a BurstHandle at
+    once; nobody sleeps between packets.  Packet i of a burst is due `i * delay` after
+    submission and goes out on the first tick at or after that.
+
+        scheduler = default_burst_scheduler()
+        handles = [scheduler.submit(send, count=5, delay=0.05) for send in senders]
+    """
+
+    def __init__(self, tick: float = 0.001, slots: int = 1024):
+        self.tick = tick
+        self.slots = slots
+        self.fired = 0
+        self._wheel: list[list[_Burst]] = [[] for _ in range(slots)]
+        self._pending = 0
+        self._cursor = math.floor(time.monotonic() / tick)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _insert(self, burst: _Burst) -> None:
+        # Callers hold the condition.  A bucket keeps bursts for later rounds too;
+        # each is checked against its own deadline when the wheel passes by.
+        slot = max(math.ceil(burst.due / self.tick), self._cursor + 1)
+        self._wheel[slot % self.slots].append(burst)
+        self._pending += 1
+
+    def submit(
+        self,
+        send: Callable[[], Any],
+        count: int,
+        delay: float,
+        finish: Optional[Callable[[Optional[BaseException]], Any]] = None,
+    ) -> BurstHandle:
+        """
+        Calls `send` `count` times, `delay` seconds apart.  The handle's result is
+        `finish(error)`, error being None or the exception that stopped the burst.
+        Without `finish`, an error is raised from the handle and success gives None.
+        """
+        handle = BurstHandle()
+        burst = _Burst(send, count, delay, time.monotonic(), handle, finish)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BurstScheduler is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slug-burst-scheduler", daemon=True
+                )
+                self._thread.start()
+            self._insert(burst)
+            self._cond.notify()
+        return handle
+
+    def _next_tick(self) -> int:
+        """The next non-empty bucket, so an idle stretch costs one wakeup, not one per tick."""
+        for tick in range(self._cursor + 1, self._cursor + self.slots + 1):
+            if self._wheel[tick % self.slots]:
+                return tick
+        return self._cursor + self.slots
+
+    def _due(self, now: float, now_tick: int) -> list[_Burst]:
+        due, early = [], []
+        horizon = (now_tick + 1) * self.tick
+        # After a long stall, one lap of the wheel covers every bucket.
+        first = max(self._cursor + 1, now_tick - self.slots + 1)
+        for tick in range(first, now_tick + 1):
+            bucket = self._wheel[tick % self.slots]
+            if not bucket:
+                continue
+            # Bursts past the horizon belong to later laps and stay put.
+            this_lap = [burst for burst in bucket if burst.due <= horizon]
+            if this_lap:
+                self._wheel[tick % self.slots] = [
+                    burst for burst in bucket if burst.due > horizon
+                ]
+                for burst in this_lap:
+                    (due if burst.due <= now else early).append(burst)
+        self._cursor = now_tick
+        self._pending -= len(due) + len(early)
+        # Never before the deadline: a burst a hair early waits for the next tick.
+        for burst in early:
+            self._insert(burst)
+        return due
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                now = time.monotonic()
+                now_tick = math.floor(now / self.tick)
+                if now_tick <= self._cursor:
+                    self._cond.wait(self._next_tick() * self.tick - now)
+                    continue
+                due = self._due(now, now_tick)
+
+            requeue = [burst for burst in due if self._fire(burst)]
+            if requeue:
+                with self._cond:
+                    if not self._closed:
+                        for burst in requeue:
+                            self._insert(burst)
+                        continue
+                for burst in requeue:
+                    burst.handle.cancel()
+                    self._settle(burst, None)
+
+    def _fire(self, burst: _Burst) -> bool:
+        """Sends one packet; True when the burst has more to send."""
+        if burst.handle.cancelled():
+            self._settle(burst, None)
+            return False
+        try:
+            burst.send()
+        except Exception as e:
+            self._settle(burst, e)
+            return False
+        self.fired += 1
+        burst.handle.sent_at.append(time.monotonic())
+        burst.remaining -= 1
+        if burst.remaining <= 0:
+            self._settle(burst, None)
+            return False
+        burst.due += burst.delay
+        return True
+
+    def _settle(self, burst: _Burst, error: Optional[BaseException]) -> None:
+        result = None
+        if burst.finish is not None:
+            try:
+                result, error = burst.finish(error), None
+            except Exception as e:
+                error = e
+        try:
+            if error is None:
+                burst.handle.set_result(result)
+            else:
+                burst.handle.set_exception(error)
+        except InvalidStateError:
+            pass  # cancelled by the caller
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {"pending": self._pending, "fired": self.fired}
+
+    def close(self) -> None:
+        """Stops the thread; bursts still queued are cancelled."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            leftover = [burst for bucket in self._wheel for burst in bucket]
+            self._wheel = [[] for _ in range(self.slots)]
+            self._pending = 0
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        for burst in leftover:
+            burst.handle.cancel()
+            self._settle(burst, None)
+
+    def __enter__(self) -> "BurstScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_default_scheduler: Optional[BurstScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_burst_scheduler() -> BurstScheduler:
+    """One scheduler thread shared by every UDP_Slug that does not bring its own."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = BurstScheduler()
+        return _default_scheduler
@@ -0,0 +1,49 @@
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: pip install "slug_farm[fast]"
+    orjson = None
+
+Decoder = Callable[[bytes | str], Any]
+
+
+def resolve_decoder(decoder: Optional[str | Decoder] = None) -> Decoder:
+    """'json' (stdlib), 'orjson', or any callable taking bytes/str -> decoded value."""
+    if decoder is None or decoder == "json":
+        return json.loads
+    if decoder == "orjson":
+        if orjson is None:
+            raise ImportError(
+                'decoder="orjson" requires orjson: pip install "slug_farm[fast]"'
+            )
+        return orjson.loads
+    if callable(decoder):
+        return decoder
+    raise ValueError(
+        f"Unknown decoder {decoder!r}, expected 'json', 'orjson' or a callable"
+    )
+
+
+def is_json_content(content_type: str) -> bool:
+    """application/json, application/problem+json, application/x-ndjson, ..."""
+    return "json" in content_type.lower()
+
+
+def decode_body(
+    body: bytes,
+    content_type: str,
+    loads: Decoder = json.loads,
+    encoding: Optional[str] = None,
+) -> Any:
+    """
+    Decodes by Content-Type rather than by trial: JSON types go through `loads`, the
+    rest come back as text.  Only a body with no Content-Type at all is tried as JSON.
+    """
+    if not content_type or is_json_content(content_type):
+        try:
+            return loads(body)
+        except ValueError:  # json.JSONDecodeError, orjson.JSONDecodeError
+            pass
+    return body.decode(encoding or "utf-8", errors="replace")
@@ -0,0 +1,210 @@
+import builtins
+import os
+import pickle
+import selectors
+import struct
+import subprocess
+import sys
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Optional
+
+# Launchers return raw (returncode, stdout, stderr); BashSlug turns them into results.
+Completed = tuple[int, bytes, bytes]
+
+_HEADER = struct.Struct("!I")
+
+
+class Launcher(ABC):
+    """How a BashSlug turns an argv into a finished process.  Override `run`."""
+
+    @abstractmethod
+    def run(self, argv: list[str]) -> Completed:
+        """Runs `argv` to completion."""
+
+    def close(self) -> None:
+        pass
+
+
+def _read_all(fds: dict[int, bytearray]) -> None:
+    """Drains several pipes from one thread, so neither can fill up and stall the child."""
+    with selectors.DefaultSelector() as selector:
+        for fd in fds:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    fds[key.fd] += chunk
+                else:
+                    selector.unregister(key.fd)
+
+
+class SpawnLauncher(Launcher):
+    """
+    `os.posix_spawnp` with the pipes wired by file actions: no Popen bookkeeping and,
+    where libc implements it with vfork/clone, no copy of the parent's page tables.
+    """
+
+    def run(self, argv: list[str]) -> Completed:
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            pid = os.posix_spawnp(
+                argv[0],
+                argv,
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, out_w, 1),
+                    (os.POSIX_SPAWN_DUP2, err_w, 2),
+                    (os.POSIX_SPAWN_CLOSE, out_r),
+                    (os.POSIX_SPAWN_CLOSE, err_r),
+                ],
+            )
+        except BaseException:
+            for fd in (out_r, out_w, err_r, err_w):
+                os.close(fd)
+            raise
+        os.close(out_w)
+        os.close(err_w)
+        buffers = {out_r: bytearray(), err_r: bytearray()}
+        try:
+            _read_all(buffers)
+        finally:
+            os.close(out_r)
+            os.close(err_r)
+        _, status = os.waitpid(pid, 0)
+        return (
+            os.waitstatus_to_exitcode(status),
+            bytes(buffers[out_r]),
+            bytes(buffers[err_r]),
+        )
+
+
+# Runs in the launcher process: a bare interpreter (-I -S) that reads
+# length-prefixed (request id, argv, cwd, env) frames and answers each from its own
+# thread.  cwd and env are the caller's at call time, as they would be for a spawn.
+_SERVER_SOURCE = r"""
+import pickle, struct, subprocess, sys, threading
+header, lock = struct.Struct("!I"), threading.Lock()
+inbox, outbox = sys.stdin.buffer, sys.stdout.buffer
+
+def reply(message):
+    data = pickle.dumps(message)
+    with lock:
+        outbox.write(header.pack(len(data)) + data)
+        outbox.flush()
+
+def serve(request_id, argv, cwd, env):
+    try:
+        # stdin is the request pipe: a child must never read (or block on) it.
+        cp = subprocess.run(
+            argv, stdin=subprocess.DEVNULL, capture_output=True, cwd=cwd, env=env
+        )
+        reply((request_id, cp.returncode, cp.stdout, cp.stderr, None))
+    except Exception as e:
+        reply((request_id, None, b"", b"", (type(e).__name__, str(e))))
+
+while True:
+    size = inbox.read(header.size)
+    if len(size) < header.size:
+        break
+    request = pickle.loads(inbox.read(header.unpack(size)[0]))
+    threading.Thread(target=serve, args=request, daemon=True).start()
+"""
+
+
+class ForkServerLauncher(Launcher):
+    """
+    Hands argvs to a small launcher process that spawns the children, so nothing is
+    ever forked from the (large) scheduler itself.  The launcher is a fresh, bare
+    interpreter started on first use, or eagerly with `start()`; output comes back
+    over its pipe.
+    """
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._pending: dict[int, Future] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> "ForkServerLauncher":
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._proc = subprocess.Popen(
+                    [sys.executable, "-I", "-S", "-c", _SERVER_SOURCE],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+                threading.Thread(
+                    target=self._read_replies, args=(self._proc,), daemon=True
+                ).start()
+        return self
+
+    def _read_replies(self, proc: subprocess.Popen) -> None:
+        read = proc.stdout.read
+        while len(size := read(_HEADER.size)) == _HEADER.size:
+            request_id, code, stdout, stderr, error = pickle.loads(
+                read(_HEADER.unpack(size)[0])
+            )
+            with self._lock:
+                future = self._pending.pop(request_id)
+            if error is None:
+                future.set_result((code, stdout, stderr))
+            else:
+                name, message = error
+                exc_type = getattr(builtins, name, None)
+                if not (isinstance(exc_type, type) and issubclass(exc_type, Exception)):
+                    exc_type = OSError
+                future.set_exception(exc_type(message))
+        with self._lock:
+            orphans, self._pending = self._pending, {}
+        for future in orphans.values():
+            future.set_exception(RuntimeError("launcher process exited"))
+
+    def run(self, argv: list[str]) -> Completed:
+        self.start()
+        future: Future = Future()
+        with self._lock:
+            request_id = self._next_id
+            self._next_id += 1
+            self._pending[request_id] = future
+            data = pickle.dumps((request_id, list(argv), os.getcwd(), dict(os.environ)))
+            self._proc.stdin.write(_HEADER.pack(len(data)) + data)
+            self._proc.stdin.flush()
+        return future.result()
+
+    def close(self) -> None:
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is not None:
+            proc.stdin.close()
+            proc.wait()
+            proc.stdout.close()
+
+
+_default_forkserver: Optional[ForkServerLauncher] = None
+
+
+def default_forkserver() -> ForkServerLauncher:
+    """One launcher process shared by every BashSlug that asks for "forkserver"."""
+    global _default_forkserver
+    if _default_forkserver is None:
+        _default_forkserver = ForkServerLauncher()
+    return _default_forkserver
+
+
+def resolve_launcher(launcher: Optional[str | Launcher]) -> Optional[Launcher]:
+    """None (plain subprocess), 'spawn', 'forkserver', or a Launcher instance."""
+    if launcher is None or isinstance(launcher, Launcher):
+        return launcher
+    if launcher == "spawn":
+        if not hasattr(os, "posix_spawnp"):
+            raise ValueError('launcher="spawn" needs os.posix_spawnp (POSIX only)')
+        return SpawnLauncher()
+    if launcher == "forkserver":
+        return default_forkserver()
+    raise ValueError(
+        f"Unknown launcher {launcher!r}, expected 'spawn', 'forkserver' or a Launcher"
+    )
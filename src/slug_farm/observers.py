@@ -0,0 +1,81 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Order in which a call moves through a slug.  "call" spans the other four.
+PHASES = ("call", "assemble_tokens", "process_tokens", "execute", "handle_response")
+
+
+@dataclass(slots=True)
+class PhaseEvent:
+    """
+    One phase of one call.  `started`/`ended` are `time.perf_counter()` readings, which
+    are monotonic; `status`/`ok` are filled in when the phase produced a result.
+    """
+
+    slug: str
+    backend: str
+    phase: str
+    started: float
+    ended: Optional[float] = None
+    status: Optional[int] = None
+    ok: Optional[bool] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.ended is None else self.ended - self.started
+
+
+class SlugObserver:
+    """
+    Hook surface for `Slug.add_observer`.  Override either method; both are called
+    synchronously on the calling thread (or event loop), so keep them cheap.
+    """
+
+    def phase_start(self, event: PhaseEvent) -> None:
+        pass
+
+    def phase_end(self, event: PhaseEvent) -> None:
+        pass
+
+
+class PhaseTimer(SlugObserver):
+    """Aggregates count/total/max seconds per (slug, phase), and not-ok results."""
+
+    def __init__(self):
+        self.timings: dict[tuple[str, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def phase_end(self, event: PhaseEvent) -> None:
+        duration = event.duration or 0.0
+        with self._lock:
+            stat = self.timings.get((event.slug, event.phase))
+            if stat is None:
+                stat = {
+                    "backend": event.backend,
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "failures": 0,
+                }
+                self.timings[(event.slug, event.phase)] = stat
+            stat["count"] += 1
+            stat["total"] += duration
+            stat["max"] = max(stat["max"], duration)
+            if event.error is not None or event.ok is False:
+                stat["failures"] += 1
+
+    def slowest(self, n: int = 10, phase: Optional[str] = None) -> list[tuple]:
+        """[(slug, phase, total_seconds), ...] ordered by where the time went."""
+        with self._lock:
+            rows = [
+                (slug, ph, stat["total"])
+                for (slug, ph), stat in self.timings.items()
+                if phase is None or ph == phase
+            ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:n]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.timings.clear()
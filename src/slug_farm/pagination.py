@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from dataclasses import replace
+from typing import Any, Mapping, Optional
+
+from requests.utils import parse_header_links
+from yarl import URL
+
+from slug_farm.base import SlugResult
+
+
+class PaginationError(Exception):
+    """A page came back not-ok.  The failing SlugResult rides along as `.result`."""
+
+    def __init__(self, result: SlugResult):
+        super().__init__(f"Page request failed ({result.status}): {result.error}")
+        self.result = result
+
+
+def dig(data: Any, path: Optional[str]) -> Any:
+    """Follows a dotted path ('data.items') into a decoded JSON body."""
+    if not path:
+        return data
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class Paginator(ABC):
+    """
+    Strategy attached to a RequestSlug at `branch()` time and inherited down the tree.
+    Subclass IndexedPaginator or ChainedPaginator rather than this class.
+
+    `independent` strategies can address any page up front (offset, page number), so
+    several pages may be in flight at once.  Dependent ones (cursor, Link) only learn the
+    next request from the page before it.
+    """
+
+    independent = False
+
+    def __init__(self, items_key: Optional[str] = None):
+        self.items_key = items_key
+
+    def items(self, output: Any) -> list:
+        found = dig(output, self.items_key)
+        return found if isinstance(found, list) else []
+
+
+class IndexedPaginator(Paginator):
+    """Pages addressed by index; the end is spotted from a page's items."""
+
+    independent = True
+
+    @abstractmethod
+    def page(self, pkg, index: int):
+        """Request for page `index`."""
+
+    def is_last(self, items: list) -> bool:
+        return not items
+
+
+class ChainedPaginator(Paginator):
+    """Each page names the next one."""
+
+    @abstractmethod
+    def next_page(self, pkg, output: Any, headers: Mapping[str, str]):
+        """Request following `pkg`, or None when this was the last page."""
+
+
+class OffsetPagination(IndexedPaginator):
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_param: str = "limit",
+        offset_param: str = "offset",
+        start: int = 0,
+        items_key: Optional[str] = None,
+    ):
+        super().__init__(items_key)
+        self.limit = limit
+        self.limit_param = limit_param
+        self.offset_param = offset_param
+        self.start = start
+
+    def page(self, pkg, index: int):
+        params = {
+            **pkg.params,
+            self.limit_param: self.limit,
+            self.offset_param: self.start + index * self.limit,
+        }
+        return replace(pkg, params=params)
+
+    def is_last(self, items: list) -> bool:
+        return len(items) < self.limit
+
+
+class PagePagination(IndexedPaginator):
+    def __init__(
+        self,
+        page_param: str = "page",
+        first_page: int = 1,
+        size: Optional[int] = None,
+        size_param: str = "per_page",
+        items_key: Optional[str] = None,
+    ):
+        super().__init__(items_key)
+        self.page_param = page_param
+        self.first_page = first_page
+        self.size = size
+        self.size_param = size_param
+
+    def page(self, pkg, index: int):
+        params = {**pkg.params, self.page_param: self.first_page + index}
+        if self.size is not None:
+            params[self.size_param] = self.size
+        return replace(pkg, params=params)
+
+    def is_last(self, items: list) -> bool:
+        return not items or (self.size is not None and len(items) < self.size)
+
+
+class CursorPagination(ChainedPaginator):
+    def __init__(
+        self,
+        cursor_path: str = "next_cursor",
+        cursor_param: str = "cursor",
+        items_key: Optional[str] = "items",
+    ):
+        super().__init__(items_key)
+        self.cursor_path = cursor_path
+        self.cursor_param = cursor_param
+
+    def next_page(self, pkg, output: Any, headers: Mapping[str, str]):
+        cursor = dig(output, self.cursor_path)
+        if cursor in (None, ""):
+            return None
+        return replace(pkg, params={**pkg.params, self.cursor_param: cursor})
+
+
+class LinkHeaderPagination(ChainedPaginator):
+    """RFC 5988 `Link: <...>; rel="next"`.  The next URL already carries its query."""
+
+    def next_page(self, pkg, output: Any, headers: Mapping[str, str]):
+        link_header = headers.get("link") or headers.get("Link")
+        if not link_header:
+            return None
+        for link in parse_header_links(link_header):
+            if link.get("rel") == "next" and link.get("url"):
+                next_url = str(URL(pkg.url).join(URL(link["url"])))
+                return replace(pkg, url=next_url, params={})
+        return None
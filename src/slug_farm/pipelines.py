@@ -0,0 +1,235 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+from slug_farm.base import Slug, SlugResult
+from slug_farm.pagination import dig
+from slug_farm.registries import SlugRegistry
+from slug_farm.single_flight import freeze
+
+# Source name under which a node's `inputs` can read the pipeline call's own task_kwargs.
+PIPELINE_INPUT = "input"
+
+Inputs = Mapping[str, str] | Callable[[dict[str, Any]], dict[str, Any]]
+
+
+@dataclass(slots=True)
+class PipelineNode:
+    name: str
+    slug: str | Slug
+    command: Optional[str] = None
+    task_kwargs: dict = field(default_factory=dict)
+    after: tuple[str, ...] = ()
+    inputs: Optional[Inputs] = None
+
+
+@dataclass(slots=True)
+class NodeRun:
+    """
+    What happened to one node: "ok", "failed", "blocked" (an upstream node did not
+    succeed) or "reused" (succeeded in an earlier run with the same input).
+    """
+
+    node: str
+    state: str
+    result: Optional[SlugResult] = None
+    started: float = 0.0
+    ended: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.state in ("ok", "reused")
+
+    @property
+    def duration(self) -> float:
+        return self.ended - self.started
+
+    @property
+    def output(self) -> Any:
+        return None if self.result is None else self.result.output
+
+
+class SlugPipeline(Slug):
+    """
+    A DAG of slugs that is itself a slug, so it registers, schedules and dry-runs like
+    any other.  Nodes whose upstreams have all succeeded run concurrently on one
+    executor; `inputs` maps upstream outputs onto a node's task_kwargs:
+
+        pipe = SlugPipeline("nightly", registry=registry)
+        pipe.add("export", "pg.dump", task_kwargs={"table": "crops"})
+        pipe.add("post", "api.upload", inputs={"body": "export"})
+        pipe.add("ping", "udp.notify", inputs={"rows": "post.rows"})
+        result = pipe(task_kwargs={...})
+
+    A mapping value is "<node>" or "<node>.<dotted.path>" (`"input"` names the pipeline
+    call's own task_kwargs), or pass a callable taking {source: output}.  The result's
+    `output` is {node: NodeRun}.  Calling again with the same task_kwargs only re-runs
+    nodes that failed or were blocked last time; `reset()` forgets earlier successes.
+    """
+
+    __slots__ = ("registry", "executor", "max_workers", "nodes", "_done", "_lock")
+
+    def __init__(
+        self,
+        name: str,
+        registry: Optional[SlugRegistry] = None,
+        executor: Optional[Executor] = None,
+        max_workers: int = 8,
+    ):
+        super().__init__(name)
+        self.registry = registry
+        self.executor = executor
+        self.max_workers = max_workers
+        self.nodes: dict[str, PipelineNode] = {}
+        self._done: tuple[Hashable, dict[str, NodeRun]] = (None, {})
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        node_name: str,
+        slug: str | Slug,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+        after: tuple[str, ...] | list[str] = (),
+        inputs: Optional[Inputs] = None,
+    ) -> "SlugPipeline":
+        """
+        Adds a node.  Upstreams must already exist, which keeps the graph acyclic;
+        sources named in an `inputs` mapping are added to `after` automatically.
+        """
+        if node_name in self.nodes or node_name == PIPELINE_INPUT:
+            raise ValueError(f"Node name {node_name!r} is already taken")
+        if isinstance(slug, str) and self.registry is None:
+            raise ValueError(f"Node {node_name!r} names slug {slug!r} but no registry")
+
+        upstream = list(after)
+        if isinstance(inputs, Mapping):
+            for source in inputs.values():
+                root = source.split(".", 1)[0]
+                if root != PIPELINE_INPUT and root not in upstream:
+                    upstream.append(root)
+        unknown = [name for name in upstream if name not in self.nodes]
+        if unknown:
+            raise ValueError(f"Node {node_name!r} depends on unknown nodes {unknown}")
+
+        self.nodes[node_name] = PipelineNode(
+            name=node_name,
+            slug=slug,
+            command=command,
+            task_kwargs=dict(task_kwargs or {}),
+            after=tuple(upstream),
+            inputs=inputs,
+        )
+        return self
+
+    def reset(self) -> None:
+        with self._lock:
+            self._done = (None, {})
+
+    def assemble_tokens(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+    ):
+        return [task_kwargs or {}]
+
+    def test_print(self, tokens: list[Any], processed_tokens: Optional[Any] = None):
+        plan = []
+        for node in self.nodes.values():
+            slug_name = node.slug if isinstance(node.slug, str) else node.slug.name
+            after = f" <- {', '.join(node.after)}" if node.after else ""
+            plan.append(f"{node.name}: {slug_name}{after}")
+        print("\n".join(plan))
+        return plan
+
+    def _resolve(self, node: PipelineNode) -> Slug:
+        return self.registry.get(node.slug) if isinstance(node.slug, str) else node.slug
+
+    def _node_kwargs(
+        self, node: PipelineNode, runs: dict[str, NodeRun], pipeline_input: dict
+    ) -> dict[str, Any]:
+        sources = {name: runs[name].output for name in node.after}
+        sources[PIPELINE_INPUT] = pipeline_input
+        if node.inputs is None:
+            return dict(node.task_kwargs)
+        if callable(node.inputs):
+            return {**node.task_kwargs, **node.inputs(sources)}
+        mapped = {}
+        for key, source in node.inputs.items():
+            root, _, path = source.partition(".")
+            mapped[key] = dig(sources[root], path)
+        return {**node.task_kwargs, **mapped}
+
+    def _run_node(self, node: PipelineNode, task_kwargs: dict[str, Any]) -> NodeRun:
+        started = time.perf_counter()
+        try:
+            result = self._resolve(node)(command=node.command, task_kwargs=task_kwargs)
+        except Exception as e:
+            result = SlugResult(False, 500, None, error=f"{type(e).__name__}: {e}")
+        return NodeRun(
+            node=node.name,
+            state="ok" if result.ok else "failed",
+            result=result,
+            started=started,
+            ended=time.perf_counter(),
+        )
+
+    def execute(self, tokens: list[Any], processed_tokens: Any = None) -> SlugResult:
+        pipeline_input = tokens[0]
+        input_key = freeze(pipeline_input)
+        with self._lock:
+            done_key, done = self._done
+            runs = {
+                name: NodeRun(name, "reused", run.result, run.started, run.ended)
+                for name, run in (done.items() if done_key == input_key else ())
+                if name in self.nodes
+            }
+
+        pending = [name for name in self.nodes if name not in runs]
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight: dict[Any, str] = {}
+        try:
+            while pending or in_flight:
+                # `pending` is in insertion order, which is already topological, so
+                # one sweep cascades "blocked" all the way down.
+                for name in list(pending):
+                    node = self.nodes[name]
+                    upstream = [runs.get(u) for u in node.after]
+                    if any(run is not None and not run.succeeded for run in upstream):
+                        runs[name] = NodeRun(name, "blocked")
+                        pending.remove(name)
+                    elif all(run is not None for run in upstream):
+                        task_kwargs = self._node_kwargs(node, runs, pipeline_input)
+                        future = executor.submit(self._run_node, node, task_kwargs)
+                        in_flight[future] = name
+                        pending.remove(name)
+                if not in_flight:
+                    continue
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    runs[in_flight.pop(future)] = future.result()
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=True)
+
+        ordered = {name: runs[name] for name in self.nodes}
+        with self._lock:
+            self._done = (
+                input_key,
+                {name: run for name, run in ordered.items() if run.succeeded},
+            )
+
+        problems = [
+            f"{name}: {run.result.error if run.result else run.state}"
+            for name, run in ordered.items()
+            if not run.succeeded
+        ]
+        return SlugResult(
+            ok=not problems,
+            status=200 if not problems else 500,
+            output=ordered,
+            error="; ".join(problems),
+            tokens=tokens,
+        )
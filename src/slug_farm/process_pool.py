@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import os
+import signal
+import weakref
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional
+
+from slug_farm.base import Slug, SlugResult
+
+# The pool driving the current `as_completed`, for slugs that were not built with one.
+active_pool: contextvars.ContextVar[Optional["ProcessPool"]] = contextvars.ContextVar(
+    "active_pool", default=None
+)
+
+Task = Slug | tuple[Slug, Optional[str], Optional[dict[str, Any]]]
+
+
+def tree_of(slug_name: str) -> str:
+    """A slug tree is addressed by its root name: 'git.log.oneline' -> 'git'."""
+    return slug_name.partition(".")[0]
+
+
+class _Limits:
+    """One event loop's semaphores.  asyncio primitives must not cross loops."""
+
+    def __init__(self, pool: "ProcessPool"):
+        self.pool = pool
+        self.everything = asyncio.Semaphore(pool.max_concurrency)
+        self.trees: dict[str, Optional[asyncio.Semaphore]] = {}
+
+    def tree(self, name: str) -> Optional[asyncio.Semaphore]:
+        if name not in self.trees:
+            limit = self.pool.tree_limit(name)
+            self.trees[name] = None if limit is None else asyncio.Semaphore(limit)
+        return self.trees[name]
+
+
+class ProcessPool:
+    """
+    Launches BashSlug processes through asyncio, at most `max_concurrency` at a time
+    overall and at most `per_tree` (an int, or {root name: int}) per slug tree.
+
+    Both pipes are drained concurrently while the process runs.  A task that outlives
+    `timeout` seconds has its whole process group killed, so children it spawned die
+    with it, and comes back as a failed SlugResult carrying whatever it printed.
+
+        pool = ProcessPool(max_concurrency=64, per_tree={"pg": 4}, timeout=600)
+        git = BashSlug("git", "git", process_pool=pool)   # acall goes through the pool
+        for result in pool.run_all(tasks):                # or batch any BashSlugs
+            ...
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        per_tree: Optional[int | Mapping[str, int]] = None,
+        timeout: Optional[float] = None,
+        kill_grace: float = 1.0,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.per_tree = per_tree
+        self.timeout = timeout
+        self.kill_grace = kill_grace
+        self.timeouts = 0
+        self._limits: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def tree_limit(self, tree: str) -> Optional[int]:
+        if isinstance(self.per_tree, Mapping):
+            return self.per_tree.get(tree)
+        return self.per_tree
+
+    def _loop_limits(self) -> _Limits:
+        loop = asyncio.get_running_loop()
+        limits = self._limits.get(loop)
+        if limits is None:
+            limits = self._limits[loop] = _Limits(self)
+        return limits
+
+    def _kill_group(self, proc: asyncio.subprocess.Process) -> None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    async def run_argv(
+        self,
+        argv: list[str],
+        tree: str = "",
+        timeout: Optional[float] = None,
+    ) -> SlugResult:
+        """Runs one argv under the pool's limits and returns a BashSlug-shaped result."""
+        timeout = self.timeout if timeout is None else timeout
+        limits = self._loop_limits()
+        tree_limit = limits.tree(tree)
+
+        # Tree first: a task queued behind its own tree's cap must not sit on a
+        # global slot that another tree could be using.
+        if tree_limit is not None:
+            await tree_limit.acquire()
+        try:
+            async with limits.everything:
+                return await self._run(argv, timeout)
+        finally:
+            if tree_limit is not None:
+                tree_limit.release()
+
+    async def _run(self, argv: list[str], timeout: Optional[float]) -> SlugResult:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,  # its own process group, for killpg
+            )
+        except Exception as e:
+            return SlugResult(ok=False, status=1, output="", error=str(e), tokens=argv)
+
+        communicate = asyncio.ensure_future(proc.communicate())
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                asyncio.shield(communicate), timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._kill_group(proc)
+            try:
+                # Pipes close once the group is gone; an escaped grandchild may keep
+                # them open, so don't wait on it forever.
+                stdout, stderr = await asyncio.wait_for(communicate, self.kill_grace)
+            except asyncio.TimeoutError:
+                stdout, stderr = b"", b""
+                await proc.wait()
+            return SlugResult(
+                ok=False,
+                status=proc.returncode,
+                output=stdout.decode(errors="replace"),
+                error=f"Timed out after {timeout}s\n{stderr.decode(errors='replace')}",
+                tokens=argv,
+            )
+        except asyncio.CancelledError:
+            self._kill_group(proc)
+            communicate.cancel()
+            raise
+
+        return SlugResult(
+            ok=proc.returncode == 0,
+            status=proc.returncode,
+            output=stdout.decode(errors="replace"),
+            error=stderr.decode(errors="replace"),
+            tokens=argv,
+        )
+
+    async def _pooled(
+        self, slug: Slug, command: Optional[str], task_kwargs: Optional[dict]
+    ) -> SlugResult:
+        active_pool.set(self)  # each task runs in its own copy of the context
+        return await slug.acall(command, task_kwargs)
+
+    async def as_completed(
+        self, tasks: Iterable[Task], max_pending: Optional[int] = None
+    ) -> AsyncIterator[SlugResult]:
+        """
+        Runs (slug, command, task_kwargs) tasks, or bare slugs, and yields each
+        SlugResult as soon as it finishes.  Tasks are pulled lazily, keeping at most
+        `max_pending` (default 4 x max_concurrency) scheduled at once.
+        """
+        max_pending = max_pending or 4 * self.max_concurrency
+        task_iter = iter(tasks)
+        pending: set[asyncio.Task] = set()
+        try:
+            while True:
+                for task in task_iter:
+                    slug, command, task_kwargs = (
+                        (task, None, None) if isinstance(task, Slug) else task
+                    )
+                    pending.add(
+                        asyncio.ensure_future(self._pooled(slug, command, task_kwargs))
+                    )
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for finished in done:
+                    yield finished.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def run_all(
+        self, tasks: Iterable[Task], max_pending: Optional[int] = None
+    ) -> list[SlugResult]:
+        """Blocking wrapper around `as_completed`; results are in completion order."""
+
+        async def collect():
+            return [r async for r in self.as_completed(tasks, max_pending)]
+
+        return asyncio.run(collect())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_tree": self.per_tree,
+            "timeouts": self.timeouts,
+        }
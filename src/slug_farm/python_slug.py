@@ -1,23 +1,51 @@
+import asyncio
+import inspect
 import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from typing import Any, Callable, Optional
 
 from slug_farm.base import Slug, SlugResult
 
+DEFAULT_MAX_WORKERS = 32
+_default_executor: Optional[ThreadPoolExecutor] = None
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """Bounded pool shared by every PythonSlug awaiting a sync function."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ThreadPoolExecutor(
+            max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="python_slug"
+        )
+    return _default_executor
+
 
 class PythonSlug(Slug):
     """Completely unnecessary in a vacuum,
     but if you wanted to wrap a python callable in a slug so it is accessible
     in the same structure as your other slugs, you can use this.
-    Putting in a command will do nothing and all kwargs will pass to the python func."""
+    Putting in a command will do nothing and all kwargs will pass to the python func.
+
+    `map` runs on processes, so the wrapped function needs to be importable (picklable)."""
+
+    map_executor_class = ProcessPoolExecutor
+
+    __slots__ = ("python_func", "func_name", "executor")
 
     def __init__(
         self,
         name: str,
         python_func=Callable[..., Any],
+        executor: Optional[Executor] = None,
     ):
-        self.name = name
+        super().__init__(name)
         self.python_func = staticmethod(python_func)
         self.func_name = getattr(python_func, "__name__", str(python_func))
+        self.executor = executor
+
+    def __reduce__(self):
+        return (self.__class__, (self.name, self.python_func.__func__))
 
     def assemble_tokens(
         self,
@@ -36,6 +64,20 @@ class PythonSlug(Slug):
         print(f"{self.func_name}({kwarg_string})")
         return kwargs
 
+    def _error_result(self, tokens: list[Any], e: Exception) -> SlugResult:
+        """Must be called from inside the `except` block so the traceback is live."""
+        if isinstance(e, TypeError):
+            error = f"Signature Error in {self.func_name}: {str(e)}"
+        else:
+            error = traceback.format_exc()
+        return SlugResult(
+            ok=False,
+            status=1,
+            output=None,
+            error=error,
+            tokens=tokens,
+        )
+
     def execute(
         self,
         tokens: list[Any],
@@ -54,21 +96,34 @@ class PythonSlug(Slug):
                 tokens=tokens,
             )
 
-        except TypeError as e:
-            return SlugResult(
-                ok=False,
-                status=1,
-                output=None,
-                error=f"Signature Error in {self.func_name}: {str(e)}",
-                tokens=tokens,
-            )
+        except Exception as e:
+            return self._error_result(tokens, e)
+
+    async def aexecute(
+        self,
+        tokens: list[Any],
+        processed_tokens: Optional[Any] = None,
+    ) -> SlugResult:
+        """Coroutine functions are awaited in place, sync ones go to the executor."""
+        kwargs = tokens[0] if tokens else {}
+        func = self.python_func.__func__
+
+        try:
+            if inspect.iscoroutinefunction(func):
+                result_data = await func(**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result_data = await loop.run_in_executor(
+                    self.executor or default_executor(), partial(func, **kwargs)
+                )
 
-        except Exception:
-            err_stack = traceback.format_exc()
             return SlugResult(
-                ok=False,
-                status=1,
-                output=None,
-                error=err_stack,
+                ok=True,
+                status=0,
+                output=result_data,
+                error="",
                 tokens=tokens,
             )
+
+        except Exception as e:
+            return self._error_result(tokens, e)
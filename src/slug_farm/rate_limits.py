@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from yarl import URL
+
+# X-RateLimit-Reset above this is a unix time rather than seconds-until-reset
+EPOCH_THRESHOLD = 1_000_000_000
+
+
+class TokenBucket:
+    """
+    Classic token bucket.  Callers reserve a token up front and sleep off any debt, so
+    concurrent acquirers are spaced out in arrival order instead of all waking at once.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        # Callers hold the lock.  Nothing accrues before a pause ends: `updated` is
+        # pushed to `paused_until`, so debt queued during the pause is paid after it.
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def reserve(self) -> float:
+        """Takes a token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            debt = -self.tokens if self.tokens < 0 else 0.0
+            return max(self.paused_until - now, 0.0) + debt / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Nobody gets through for `seconds` (e.g. a Retry-After)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.updated = max(self.updated, self.paused_until)
+            self.tokens = min(self.tokens, 0.0)
+
+    def set_rate(self, rate: float) -> None:
+        """Re-paces the bucket; tokens earned so far are kept at the old rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Per-host token buckets, declared on a root RequestSlug and shared by its branches.
+
+    With `adaptive=True` the limiter also listens to responses: `Retry-After` pauses the
+    host, `X-RateLimit-Remaining`/`X-RateLimit-Reset` re-pace it to what is actually left
+    in the window, and a bare 429 halves the rate.  Successful calls creep the rate back
+    up toward `rate`.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[int] = None,
+        adaptive: bool = True,
+        min_rate: float = 0.1,
+    ):
+        self.rate = float(rate)
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        url_obj = URL(url)
+        return f"{url_obj.host}:{url_obj.port}"
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        key = self.host_key(url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def acquire(self, url: str) -> None:
+        self.bucket_for(url).acquire()
+
+    async def aacquire(self, url: str) -> None:
+        await self.bucket_for(url).aacquire()
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        """Feeds one response back into the host's bucket."""
+        if not self.adaptive:
+            return
+        bucket = self.bucket_for(url)
+
+        retry_after = headers.get("retry-after")
+        if retry_after is not None and status in (429, 503):
+            seconds = _retry_after_seconds(retry_after)
+            if seconds is not None:
+                bucket.pause(seconds)
+                return
+
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None:
+            try:
+                remaining_n, reset_s = float(remaining), float(reset)
+            except ValueError:
+                remaining_n = reset_s = None
+            if remaining_n is not None:
+                if reset_s > EPOCH_THRESHOLD:
+                    reset_s -= time.time()
+                reset_s = max(reset_s, 0.0)
+                if remaining_n <= 0:
+                    bucket.pause(reset_s)
+                elif reset_s > 0:
+                    bucket.set_rate(
+                        max(self.min_rate, min(self.rate, remaining_n / reset_s))
+                    )
+                return
+
+        if status == 429:
+            bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+        elif status < 400 and bucket.rate < self.rate:
+            bucket.set_rate(min(self.rate, bucket.rate + self.rate * 0.05))
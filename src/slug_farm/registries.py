@@ -6,15 +6,21 @@ class SlugRegistry:
     def __init__(self):
         self._slugs: Dict[str, Slug] = {}
 
-    def register(self, slug: Slug):
-        """Adds a slug to the registry. Raises ValueError if ID exists."""
+    def register(self, slug: Slug, replace: bool = False):
+        """
+        Adds a slug to the registry. Raises ValueError if ID exists, unless `replace`.
+        Cached tokens for the name are dropped, so the new slug never sees stale ones.
+        """
         slug_name = slug.name
-        if slug_name in self._slugs:
-            existing = self._slugs[slug_name]
+        existing = self._slugs.get(slug_name)
+        if existing is not None and not replace:
             raise ValueError(
                 f"Redundant Assignment: Name {slug_name} is already taken which is"
                 f"({type(existing).__name__})"
             )
+        for owner in (existing, slug):
+            if owner is not None and owner.token_cache is not None:
+                owner.token_cache.invalidate(slug_name)
         self._slugs[slug_name] = slug
 
     def get(self, slug_name: str) -> Any:
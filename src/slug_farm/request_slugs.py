@@ -1,15 +1,47 @@
 import json
 import re
-from copy import deepcopy
-from dataclasses import dataclass
-from typing import Any, Iterable, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Any, Iterable, Iterator, Mapping, Optional
 
-import requests
 from yarl import URL
 
-from slug_farm.base import CommandSegment, Slug, SlugResult
+from slug_farm.base import CommandSegment, LazyPayload, Slug, SlugResult
+from slug_farm.decoders import Decoder, decode_body, resolve_decoder
+from slug_farm.pagination import PaginationError, Paginator
+from slug_farm.rate_limits import RateLimiter
+from slug_farm.response_cache import CacheEntry, ResponseCache
+from slug_farm.single_flight import SingleFlight
+from slug_farm.token_cache import TokenCache, shared_frozen
+from slug_farm.streams import STREAM_MODES, ResponseStream
+from slug_farm.transports import DEFAULT_TRANSPORT, Transport
 
 PLACEHOLDER_PATTERN = r"(\{[\s]*([^/{}]+?)[\s]*\})"
+PLACEHOLDER_RE = re.compile(PLACEHOLDER_PATTERN)
+
+
+def split_template(url: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """'/a/{ x }/b' -> literal chunks ('/a/', '/b') and placeholder slots ('x',)."""
+    pieces = PLACEHOLDER_RE.split(url)
+    return tuple(pieces[0::3]), tuple(key.strip() for key in pieces[2::3])
+
+
+def fill_template(
+    template: str, chunks: tuple[str, ...], slots: tuple[str, ...], task_kwargs: dict
+) -> str:
+    if not slots:
+        return chunks[0]
+    unmatched_keys = [key for key in slots if key not in task_kwargs]
+    if unmatched_keys:
+        raise Exception(f"Unable to place {unmatched_keys} into {template}")
+    filled = [chunks[0]]
+    for key, chunk in zip(slots, chunks[1:]):
+        filled.append(str(task_kwargs[key]))
+        filled.append(chunk)
+    return "".join(filled)
 
 
 @dataclass(slots=True)
@@ -22,9 +54,42 @@ class RequestPackage:
     json_body: dict
     headers: dict
     timeout: int
+    stream: bool = False
+
+
+@dataclass(slots=True)
+class CompiledRoute:
+    """A branch's inherited route, walked once instead of on every call."""
+
+    key: tuple
+    url_obj: URL
+    template: str
+    chunks: tuple[str, ...]
+    slots: tuple[str, ...]
+    params: dict
+    payload: dict
+    query_keys: Optional[frozenset]
 
 
 class RequestSlug(Slug):
+    __slots__ = (
+        "method",
+        "headers",
+        "params",
+        "timeout",
+        "include_params",
+        "exclude_params",
+        "transport",
+        "cache",
+        "cache_ttl",
+        "stream",
+        "paginator",
+        "rate_limiter",
+        "decoder",
+        "loads",
+        "_route",
+    )
+
     def __init__(
         self,
         name: str,
@@ -36,8 +101,28 @@ class RequestSlug(Slug):
         timeout: int = 120,
         include_params: Optional[Iterable[str]] = None,
         exclude_params: Optional[Iterable[str]] = None,
-        base_command_segments: Optional[list[CommandSegment]] = None,
+        base_command_segments: Optional[Iterable[CommandSegment]] = None,
+        transport: Optional[Transport] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None,
+        stream: Optional[str] = None,
+        paginator: Optional[Paginator] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        single_flight: Optional[SingleFlight] = None,
+        token_cache: Optional[TokenCache] = None,
+        decoder: str | Decoder = "json",
     ):
+        """
+        `stream` ("chunks", "lines", "ndjson" or "json_array") makes `SlugResult.output`
+        a lazy ResponseStream instead of the fully read body.
+
+        `decoder` ("json", "orjson" or a callable) parses JSON bodies for the whole tree.
+        Bodies are only decoded when `SlugResult.output` is first read.
+        """
+        if stream is not None and stream not in STREAM_MODES:
+            raise ValueError(
+                f"Unknown stream mode {stream!r}, expected one of {STREAM_MODES}"
+            )
         super().__init__(
             name=name,
             command=str(base_url),
@@ -46,11 +131,25 @@ class RequestSlug(Slug):
         )
 
         self.method = method.upper()
-        self.headers = headers or {}
-        self.params = params or {}
+        # Read-only and shared down the tree until a branch actually adds something.
+        self.headers = shared_frozen(headers)
+        self.params = shared_frozen(params)
         self.timeout = timeout
-        self.include_params = set(include_params) if include_params else None
-        self.exclude_params = set(exclude_params) if exclude_params else None
+        self.include_params = frozenset(include_params) if include_params else None
+        self.exclude_params = frozenset(exclude_params) if exclude_params else None
+        self.transport = transport or DEFAULT_TRANSPORT
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.stream = stream
+        self.paginator = paginator
+        self.rate_limiter = rate_limiter
+        self.decoder = decoder
+        self.loads = resolve_decoder(decoder)
+        if single_flight is not None:
+            self.single_flight = single_flight
+        if token_cache is not None:
+            self.token_cache = token_cache
+        self._route: Optional[CompiledRoute] = None
 
     def branch(
         self,
@@ -62,29 +161,39 @@ class RequestSlug(Slug):
         sub_headers: Optional[dict] = None,
         timeout: Optional[int] = None,
         replace_kwargs: bool = False,
+        cache_ttl: Optional[float] = None,
+        stream: Optional[str] = None,
+        paginator: Optional[Paginator] = None,
     ) -> "RequestSlug":
         """Creates a sub-route or specialized version of the current request."""
 
-        new_params = {**self.params, **(sub_params or {})}
-        new_headers = {**self.headers, **(sub_headers or {})}
-
-        new_command_segments = deepcopy(self.command_segments)
+        new_params = {**self.params, **sub_params} if sub_params else self.params
+        new_headers = {**self.headers, **sub_headers} if sub_headers else self.headers
 
+        new_command_segments = self.command_segments
         if replace_kwargs:
-            for seg in new_command_segments:
-                seg.kwargs = {}
-
-        return self.__class__(
-            name=f"{self.name}.{branch_name}",
-            base_url=url_segment,
-            method=method or self.method,
-            headers=new_headers,
-            params=new_params,
-            payload_data=sub_payload,
-            timeout=timeout or self.timeout,
-            include_params=self.include_params,
-            exclude_params=self.exclude_params,
-            base_command_segments=new_command_segments,
+            new_command_segments = new_command_segments.without_kwargs()
+
+        return self._inherit(
+            self.__class__(
+                name=f"{self.name}.{branch_name}",
+                base_url=url_segment,
+                method=method or self.method,
+                headers=new_headers,
+                params=new_params,
+                payload_data=sub_payload,
+                timeout=timeout or self.timeout,
+                include_params=self.include_params,
+                exclude_params=self.exclude_params,
+                base_command_segments=new_command_segments,
+                transport=self.transport,
+                cache=self.cache,
+                cache_ttl=self.cache_ttl if cache_ttl is None else cache_ttl,
+                stream=stream or self.stream,
+                paginator=paginator or self.paginator,
+                rate_limiter=self.rate_limiter,
+                decoder=self.decoder,
+            )
         )
 
     def _filter_params(self, params: dict) -> dict:
@@ -100,59 +209,93 @@ class RequestSlug(Slug):
             filtered[k] = v
         return filtered
 
-    def assemble_tokens(
-        self, command: Optional[str] = None, task_kwargs: Optional[dict] = None
-    ) -> list[RequestPackage]:
-        task_kwargs = task_kwargs or {}
-        all_segments = self.add_command(command=command, slug_kwargs=task_kwargs)
-
-        url_obj = URL(all_segments[0].command or "")
-        if (
-            command and "?" in command
-        ):  # params added in this format should be absolute and will need to update at the end
-            call_query = URL(command).query
-        else:
-            call_query = None
-        all_segments[0].command = ""
-        accumulated_params = deepcopy(self.params)
-        accumulated_payload = {}
-
-        for seg in all_segments:
+    def _route_kwargs(
+        self,
+        kwargs: dict,
+        query_keys: Optional[frozenset],
+        params: dict,
+        payload: dict,
+    ) -> None:
+        """Sends each kwarg to the query or the body. `query_keys=None` means all query."""
+        if query_keys is None:
+            params.update(kwargs)
+            return
+        for k, v in kwargs.items():
+            if k in query_keys:
+                params[k] = v
+            else:
+                payload[k] = v
+
+    def compile_route(self) -> CompiledRoute:
+        """Walks the inherited segments once into a URL template and pre-routed kwargs."""
+        segments = self.command_segments
+        url_obj = URL(segments[0].command or "") if segments else URL()
+        for seg in segments[1:]:
             if seg.command:
                 url_obj = url_obj / seg.command.lstrip("/")
 
+        query_keys = (
+            None if self.method == "GET" else frozenset(self.include_params or ())
+        )
+        params: dict = {}
+        payload: dict = {}
+        for seg in segments:
             if seg.kwargs:
-                for k, v in seg.kwargs.items():
-                    if (
-                        self.include_params and k in self.include_params
-                    ) or self.method == "GET":
-                        accumulated_params[k] = v
-                    else:
-                        accumulated_payload[k] = v
-
-        if call_query:
-            accumulated_params.update(call_query)  # And now they're updated
+                self._route_kwargs(seg.kwargs, query_keys, params, payload)
+
+        template = url_obj.with_query(None).human_repr()
+        chunks, slots = split_template(template)
+        return CompiledRoute(
+            key=(self.method, self.include_params and frozenset(self.include_params)),
+            url_obj=url_obj,
+            template=template,
+            chunks=chunks,
+            slots=slots,
+            params=params,
+            payload=payload,
+            query_keys=query_keys,
+        )
 
-        final_params = self._filter_params(accumulated_params)
+    @property
+    def route(self) -> CompiledRoute:
+        """Compiled on first use, and again only if `method` or `include_params` change."""
+        if (
+            self._route is None
+            or self._route.key[0] != self.method
+            or self._route.key[1] != self.include_params
+        ):
+            self._route = self.compile_route()
+        return self._route
 
-        url_with_placeholders = url_obj.with_query(None).human_repr()
+    def assemble_tokens(
+        self, command: Optional[str] = None, task_kwargs: Optional[dict] = None
+    ) -> list[RequestPackage]:
+        task_kwargs = task_kwargs or {}
+        route = self.route
 
-        placeholder_matches = re.findall(PLACEHOLDER_PATTERN, url_with_placeholders)
+        accumulated_params = {**self.params, **route.params}
+        accumulated_payload = dict(route.payload)
+        self._route_kwargs(
+            task_kwargs, route.query_keys, accumulated_params, accumulated_payload
+        )
 
-        if "{" in url_with_placeholders:
-            placeholder_matches = [(x, y.strip()) for x, y in placeholder_matches]
-            unmatched_keys = [y for x, y in placeholder_matches if y not in task_kwargs]
-            if unmatched_keys:
-                raise Exception(
-                    f"Unable to place {unmatched_keys} into {url_with_placeholders}"
-                )
-            for match, param_key in placeholder_matches:
-                param_match = str(task_kwargs[param_key])
-                url_with_placeholders = url_with_placeholders.replace(
-                    match, param_match
-                )
+        if command:
+            url_obj = (
+                route.url_obj / command.lstrip("/")
+                if self.command_segments
+                else URL(command)
+            )
+            template = url_obj.with_query(None).human_repr()
+            chunks, slots = split_template(template)
+            if (
+                "?" in command
+            ):  # params added in this format should be absolute and will need to update at the end
+                accumulated_params.update(URL(command).query)  # And now they're updated
+        else:
+            template, chunks, slots = route.template, route.chunks, route.slots
 
-        final_url = url_with_placeholders
+        final_params = self._filter_params(accumulated_params)
+        final_url = fill_template(template, chunks, slots, task_kwargs)
 
         return [
             RequestPackage(
@@ -160,8 +303,9 @@ class RequestSlug(Slug):
                 url=final_url,
                 params=final_params,
                 json_body=accumulated_payload if self.method != "GET" else {},
-                headers=deepcopy(self.headers),
+                headers=dict(self.headers),
                 timeout=self.timeout,
+                stream=self.stream is not None,
             )
         ]
 
@@ -209,24 +353,84 @@ class RequestSlug(Slug):
 
         return pkg
 
+    def flight_key(self, tokens: list[Any]) -> Any:
+        """Only reads are coalesced; two identical POSTs are still two requests."""
+        if self.method not in ("GET", "HEAD"):
+            return None
+        return super().flight_key(tokens)
+
+    def _check_cache(
+        self, pkg: RequestPackage, tokens: list[Any]
+    ) -> tuple[Optional[SlugResult], RequestPackage, Optional[tuple[str, CacheEntry]]]:
+        """
+        Returns (fresh hit, package to send, stale entry).
+        A stale entry with validators turns the outgoing request into a conditional one.
+        """
+        if self.cache is None or pkg.method != "GET" or pkg.stream:
+            return None, pkg, None
+        key, entry = self.cache.lookup(pkg)
+        if entry is None:
+            return None, pkg, None
+        if entry.is_fresh(time.time()):
+            return self.cache.result(entry, tokens, self.loads), pkg, None
+        conditional = replace(pkg, headers={**pkg.headers, **entry.validators()})
+        return None, conditional, (key, entry)
+
+    def _check_revalidated(
+        self,
+        response: Any,
+        stale: Optional[tuple[str, CacheEntry]],
+        tokens: list[Any],
+    ) -> Any:
+        if stale is None or response.status_code != 304:
+            return response
+        key, entry = stale
+        self.cache.revalidated(key, entry, self.cache_ttl)
+        return self.cache.result(entry, tokens, self.loads)
+
+    def _send(self, pkg: RequestPackage) -> Any:
+        if self.rate_limiter is None:
+            return self.transport.send(pkg)
+        self.rate_limiter.acquire(pkg.url)
+        response = self.transport.send(pkg)
+        self.rate_limiter.observe(pkg.url, response.status_code, response.headers)
+        return response
+
+    async def _asend(self, pkg: RequestPackage) -> Any:
+        if self.rate_limiter is None:
+            return await self.transport.asend(pkg)
+        await self.rate_limiter.aacquire(pkg.url)
+        response = await self.transport.asend(pkg)
+        self.rate_limiter.observe(pkg.url, response.status_code, response.headers)
+        return response
+
     def execute(self, tokens: list[Any], processed_tokens: Any = None) -> Any:
         if not tokens or not isinstance(tokens[0], RequestPackage):
             return SlugResult(False, 500, "Invalid tokens", tokens=tokens)
 
-        pkg: RequestPackage = tokens[0]
+        hit, pkg, stale = self._check_cache(tokens[0], tokens)
+        if hit is not None:
+            return hit
 
         try:
-            resp = requests.request(
-                method=pkg.method,
-                url=pkg.url,
-                params=pkg.params,
-                json=pkg.json_body if pkg.method in ["POST", "PUT", "PATCH"] else None,
-                headers=pkg.headers,
-                timeout=pkg.timeout,
-            )
-            return resp
+            response = self._send(pkg)
         except Exception as e:
             return SlugResult(False, 500, str(e), tokens=tokens)
+        return self._check_revalidated(response, stale, tokens)
+
+    async def aexecute(self, tokens: list[Any], processed_tokens: Any = None) -> Any:
+        if not tokens or not isinstance(tokens[0], RequestPackage):
+            return SlugResult(False, 500, "Invalid tokens", tokens=tokens)
+
+        hit, pkg, stale = self._check_cache(tokens[0], tokens)
+        if hit is not None:
+            return hit
+
+        try:
+            response = await self._asend(pkg)
+        except Exception as e:
+            return SlugResult(False, 500, str(e), tokens=tokens)
+        return self._check_revalidated(response, stale, tokens)
 
     def handle_response(
         self, response: Any, tokens: list[Any], processed_tokens: Any = None
@@ -234,15 +438,112 @@ class RequestSlug(Slug):
         if isinstance(response, SlugResult):
             return response
 
-        try:
-            data = response.json()
-        except:
-            data = response.text
+        if (
+            self.cache is not None
+            and tokens[0].method == "GET"
+            and not tokens[0].stream
+        ):
+            self.cache.store(tokens[0], response, self.cache_ttl)
+        return self._response_result(response, tokens)
+
+    def _response_result(self, response: Any, tokens: list[Any]) -> SlugResult:
+        if tokens[0].stream and response.status_code < 400:
+            return SlugResult(
+                ok=True,
+                status=response.status_code,
+                output=ResponseStream(
+                    response, mode=self.stream or "chunks", loads=self.loads
+                ),
+                error="",
+                tokens=tokens,
+            )
+
+        data = LazyPayload(
+            partial(
+                decode_body,
+                response.content,
+                response.headers.get("content-type", ""),
+                self.loads,
+                response.encoding,
+            )
+        )
 
+        ok = response.status_code < 400  # requests' `.ok`, spelled so httpx fits too
         return SlugResult(
-            ok=response.ok,
+            ok=ok,
             status=response.status_code,
             output=data,
-            error="" if response.ok else response.text,
+            error="" if ok else response.text,
             tokens=tokens,
         )
+
+    def _fetch_page(self, pkg: RequestPackage) -> tuple[SlugResult, Mapping[str, str]]:
+        """
+        Pages always go to the wire: they need live headers, not cached bodies.  So
+        they are not stored either; nothing would ever read those entries back.
+        """
+        try:
+            response = self._send(pkg)
+        except Exception as e:
+            return SlugResult(False, 500, str(e), tokens=[pkg]), {}
+        return self._response_result(response, [pkg]), response.headers
+
+    def paginate(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict] = None,
+        max_in_flight: int = 2,
+    ) -> Iterator[Any]:
+        """
+        Lazily yields every item across all pages, using the inherited `paginator`.
+
+        The next page is requested before the current one is handed out, so network
+        time overlaps with the caller's processing.  Offset/page strategies keep up to
+        `max_in_flight` pages requested at once; cursor/Link ones can only look one ahead.
+        Raises PaginationError on the first page that comes back not-ok.
+        """
+        paginator = self.paginator
+        if paginator is None:
+            raise ValueError(f"{self.name} has no paginator to paginate with")
+        base_pkg = replace(self.assemble_tokens(command, task_kwargs)[0], stream=False)
+        max_in_flight = max(1, max_in_flight)
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            pending: deque = deque()
+            next_index = 0
+
+            def submit(pkg: RequestPackage) -> None:
+                pending.append((pkg, pool.submit(self._fetch_page, pkg)))
+
+            if paginator.independent:
+                for next_index in range(max_in_flight):
+                    submit(paginator.page(base_pkg, next_index))
+                next_index += 1
+            else:
+                submit(base_pkg)
+
+            try:
+                while pending:
+                    page_pkg, future = pending.popleft()
+                    result, headers = future.result()
+                    if not result.ok:
+                        raise PaginationError(result)
+                    items = paginator.items(result.output)
+
+                    if paginator.independent:
+                        if paginator.is_last(items):
+                            for _, speculative in pending:
+                                speculative.cancel()
+                            pending.clear()
+                        else:
+                            submit(paginator.page(base_pkg, next_index))
+                            next_index += 1
+                    else:
+                        next_pkg = paginator.next_page(page_pkg, result.output, headers)
+                        if next_pkg is not None:
+                            submit(next_pkg)
+
+                    yield from items
+            finally:
+                for _, future in pending:
+                    future.cancel()
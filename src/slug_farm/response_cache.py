@@ -0,0 +1,310 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Iterable, Optional
+
+from slug_farm.base import LazyPayload, SlugResult
+from slug_farm.decoders import Decoder, decode_body
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """One stored GET response."""
+
+    status: int
+    body: bytes
+    content_type: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional-request headers that let the upstream answer 304."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def payload(self, loads: Decoder = json.loads) -> LazyPayload:
+        """
+        The body as a fresh LazyPayload, decoded with this caller's `loads`.  Hits
+        never share a decoded value, so one caller editing its output cannot change
+        what the next hit sees.
+        """
+        return LazyPayload(partial(decode_body, self.body, self.content_type, loads))
+
+
+class MemoryCacheBackend:
+    """In-process LRU bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        """Stores the entry and returns how many old entries were evicted for it."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            evicted = 0
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= dropped.size
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk LRU in a single SQLite file, so a cache survives scheduler restarts.
+    Only the raw body is stored; it is decoded again on the first hit after loading.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10_000,
+        max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER,
+                body BLOB,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL,
+                size INTEGER,
+                last_access REAL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)"
+        )
+        self._conn.commit()
+        # Running totals, so a write never scans the table to check the limits.
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, content_type, etag, last_modified, expires_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+        status, body, content_type, etag, last_modified, expires_at = row
+        return CacheEntry(status, body, content_type, etag, last_modified, expires_at)
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        with self._lock:
+            self._forget(key)
+            self._conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.status,
+                    entry.body,
+                    entry.content_type,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.expires_at,
+                    entry.size,
+                    time.time(),
+                ),
+            )
+            self._count += 1
+            self._bytes += entry.size
+            evicted = 0
+            while self._count > 1 and (
+                self._count > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = self._conn.execute(
+                    "SELECT key FROM responses ORDER BY last_access LIMIT 1"
+                ).fetchone()[0]
+                self._forget(oldest)
+                evicted += 1
+            self._conn.commit()
+            return evicted
+
+    def _forget(self, key: str) -> None:
+        # Callers hold the lock and commit.
+        row = self._conn.execute(
+            "SELECT size FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count -= 1
+            self._bytes -= row[0]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._forget(key)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class ResponseCache:
+    """
+    Opt-in cache for GET RequestSlugs, shared through `branch()` like the transport.
+
+    Entries are keyed on the final RequestPackage: method, url, sorted params and the
+    `vary_headers`.  Fresh entries skip the network entirely; stale ones carrying an
+    ETag/Last-Modified are revalidated, and a 304 reuses the stored body.  Every hit decodes its own copy.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[MemoryCacheBackend | SQLiteCacheBackend] = None,
+        default_ttl: float = 60.0,
+        vary_headers: Iterable[str] = ("Accept",),
+    ):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.default_ttl = default_ttl
+        self.vary_headers = tuple(h.lower() for h in vary_headers)
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def key_for(self, pkg) -> str:
+        headers = {k.lower(): v for k, v in pkg.headers.items()}
+        raw = json.dumps(
+            [
+                pkg.method,
+                pkg.url,
+                sorted((str(k), str(v)) for k, v in pkg.params.items()),
+                [headers.get(h) for h in self.vary_headers],
+            ]
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def lookup(self, pkg) -> tuple[str, Optional[CacheEntry]]:
+        """Returns the key and any stored entry, fresh or stale.  Counts fresh hits."""
+        key = self.key_for(pkg)
+        entry = self.backend.get(key)
+        if entry is not None and entry.is_fresh(time.time()):
+            self._count("hits")
+        elif entry is not None and not entry.validators():
+            self.backend.delete(key)
+            entry = None
+        return key, entry
+
+    def revalidated(self, key: str, entry: CacheEntry, ttl: Optional[float]) -> None:
+        """The upstream answered 304: extend the entry without touching its body."""
+        self._count("revalidations")
+        entry.expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        self._count("evictions", self.backend.set(key, entry))
+
+    def store(self, pkg, response: Any, ttl: Optional[float]) -> None:
+        self._count("misses")
+        if response.status_code != 200:
+            return
+        headers = response.headers
+        entry = CacheEntry(
+            status=response.status_code,
+            body=response.content,
+            content_type=headers.get("content-type", ""),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            expires_at=time.time() + (self.default_ttl if ttl is None else ttl),
+        )
+        self._count("evictions", self.backend.set(self.key_for(pkg), entry))
+
+    def result(
+        self, entry: CacheEntry, tokens: list[Any], loads: Decoder = json.loads
+    ) -> SlugResult:
+        return SlugResult(
+            ok=entry.status < 400,
+            status=entry.status,
+            output=entry.payload(loads),
+            error="",
+            tokens=tokens,
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "entries": len(self.backend),
+        }
+
+    def clear(self) -> None:
+        self.backend.clear()
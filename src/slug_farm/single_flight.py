@@ -0,0 +1,107 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import fields, is_dataclass
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Hashable
+
+_PLAIN = frozenset({str, int, bytes, type(None)})
+
+
+def freeze(obj: Any) -> Hashable:
+    """Turns tokens (lists, dicts, packages) into a hashable, order-stable key."""
+    if type(obj) in _PLAIN:
+        return obj
+    if isinstance(obj, dict):
+        items = [(k, freeze(v)) for k, v in obj.items()]
+        try:
+            return tuple(sorted(items, key=itemgetter(0)))  # keys are unique
+        except TypeError:  # mixed key types
+            return tuple(sorted(items, key=repr))
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(x) for x in obj)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(freeze(x) for x in obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return (type(obj).__name__,) + tuple(
+            freeze(getattr(obj, f.name)) for f in fields(obj)
+        )
+    if isinstance(obj, (bool, float)):
+        # 1, True and 1.0 hash alike but render differently (`-n 1` vs `-n`)
+        return (type(obj).__name__, obj)
+    try:
+        hash(obj)
+    except TypeError:
+        return repr(obj)
+    return obj
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one.
+
+    The first caller for a key (the leader) runs the work; anyone arriving with the same
+    key while it is in flight waits and receives the very same result, or exception.
+    Nothing is remembered once the flight lands, so this is de-duplication, not caching.
+    Sync and async callers share flights.  A key of None opts a call out: it just runs.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._flights: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.followers += 1
+                return flight, False
+            flight = Future()
+            self._flights[key] = flight
+            self.leaders += 1
+            return flight, True
+
+    def _land(self, key: Hashable) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+
+    def do(self, key: Hashable, work: Callable[[], Any]) -> Any:
+        if key is None:
+            return work()
+        flight, leader = self._join(key)
+        if not leader:
+            return flight.result()
+        try:
+            result = work()
+        except BaseException as e:
+            self._land(key)
+            flight.set_exception(e)
+            raise
+        self._land(key)
+        flight.set_result(result)
+        return result
+
+    async def ado(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        if key is None:
+            return await work()
+        flight, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(flight)
+        try:
+            result = await work()
+        except BaseException as e:
+            self._land(key)
+            flight.set_exception(e)
+            raise
+        self._land(key)
+        flight.set_result(result)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": len(self._flights),
+        }
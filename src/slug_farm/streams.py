@@ -0,0 +1,319 @@
+import codecs
+import json
+import os
+import subprocess
+import threading
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+STREAM_MODES = ("chunks", "lines", "ndjson", "json_array")
+STREAM_CHUNK_SIZE = 64 * 1024
+STDERR_LIMIT = 64 * 1024
+
+_json_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Re-cuts arbitrary byte chunks on newlines, holding at most one partial line."""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array as they arrive.
+    Only the element being parsed is buffered, never the whole array.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    chunk_iter = iter(chunks)
+    buffer = ""
+    pos = 0  # parse offset; the consumed prefix is dropped only on refill
+    exhausted = False
+
+    def refill() -> bool:
+        nonlocal buffer, pos, exhausted
+        for chunk in chunk_iter:
+            text = decoder.decode(chunk)
+            if text:
+                buffer = buffer[pos:] + text
+                pos = 0
+                return True
+        if not exhausted:
+            exhausted = True
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                buffer = buffer[pos:] + tail
+                pos = 0
+                return True
+        return False
+
+    def skip(idx: int, chars: str) -> int:
+        while idx < len(buffer) and buffer[idx] in chars:
+            idx += 1
+        return idx
+
+    while not buffer.strip(_WHITESPACE) and refill():
+        pass
+    pos = skip(0, _WHITESPACE)
+    if buffer[pos : pos + 1] != "[":
+        raise ValueError("json_array stream does not start with '['")
+    pos += 1
+
+    while True:
+        pos = skip(pos, _WHITESPACE + ",")
+        if pos == len(buffer):
+            if refill():
+                continue
+            raise ValueError("json_array stream ended before the closing ']'")
+        if buffer[pos] == "]":
+            return
+        try:
+            value, end = _json_decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if refill():
+                continue
+            raise
+        after = skip(end, _WHITESPACE)
+        if after == len(buffer) or buffer[after] not in ",]":
+            # A bare number like `23` may be `23.5` once the next chunk lands.
+            if refill():
+                continue
+            if after < len(buffer):
+                raise ValueError(f"Unexpected {buffer[after]!r} in json_array stream")
+        pos = end
+        yield value
+
+
+def iter_records(
+    chunks: Iterable[bytes],
+    mode: str,
+    encoding: Optional[str] = "utf-8",
+    loads: Callable[[Any], Any] = json.loads,
+) -> Iterator[Any]:
+    """Turns raw byte chunks into `mode` records.  `encoding=None` keeps lines as bytes."""
+    if mode == "chunks":
+        yield from chunks
+    elif mode == "lines":
+        for line in iter_lines(chunks):
+            yield line if encoding is None else line.decode(encoding, errors="replace")
+    elif mode == "ndjson":
+        for line in iter_lines(chunks):
+            if line.strip():
+                yield loads(line)
+    else:
+        yield from iter_json_array(chunks, encoding or "utf-8")
+
+
+class ResponseStream:
+    """
+    Lazy view of a streamed HTTP body: raw chunks, decoded lines, NDJSON records
+    or JSON array elements.  The connection is released as soon as the iterator is
+    exhausted or `close()`d, so use it as a context manager if you may stop early.
+    """
+
+    def __init__(
+        self,
+        response: Any,
+        mode: str = "chunks",
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        loads: Callable[[Any], Any] = json.loads,
+    ):
+        if mode not in STREAM_MODES:
+            raise ValueError(
+                f"Unknown stream mode {mode!r}, expected one of {STREAM_MODES}"
+            )
+        self.response = response
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.loads = loads
+        self.encoding = getattr(response, "encoding", None) or "utf-8"
+        self._records = self._iter_records()
+
+    def _iter_raw(self) -> Iterator[bytes]:
+        if hasattr(self.response, "iter_content"):  # requests
+            return self.response.iter_content(chunk_size=self.chunk_size)
+        return self.response.iter_bytes(chunk_size=self.chunk_size)  # httpx
+
+    def _iter_records(self) -> Iterator[Any]:
+        try:
+            yield from iter_records(
+                self._iter_raw(), self.mode, self.encoding, self.loads
+            )
+        finally:
+            self.response.close()
+
+    def __iter__(self) -> "ResponseStream":
+        return self
+
+    def __next__(self) -> Any:
+        return next(self._records)
+
+    def close(self) -> None:
+        self._records.close()
+        self.response.close()  # the generator may never have started
+
+    def __enter__(self) -> "ResponseStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PipeTail:
+    """Drains a pipe on a daemon thread, keeping only the last `limit` bytes read."""
+
+    def __init__(
+        self,
+        pipe: IO[bytes],
+        limit: int = STDERR_LIMIT,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ):
+        self.pipe = pipe
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.truncated = False
+        self._data = bytearray()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        read = self.pipe.read1
+        while chunk := read(self.chunk_size):
+            self._data += chunk
+            if len(self._data) > self.limit:
+                del self._data[: len(self._data) - self.limit]
+                self.truncated = True
+
+    def join(self) -> bytes:
+        """Waits for EOF on the pipe and returns what was kept."""
+        self._thread.join()
+        return bytes(self._data)
+
+
+class ProcessStream:
+    """
+    Lazy view of a running process's stdout, read from the pipe as it is produced:
+    raw chunks, lines, NDJSON records or JSON array elements.  Chunks are always bytes;
+    lines are bytes too when `encoding` is None.
+
+    Every raw chunk is also written to `tee` (a path or a binary file object) when set.
+    stderr is drained on a helper thread and only its last `stderr_limit` bytes are
+    kept, so neither pipe can grow memory with the size of the output.
+
+    `returncode`, `ok` and `stderr` are filled in once stdout is exhausted.  Closing
+    early (or leaving the `with` block) kills the process.
+    """
+
+    def __init__(
+        self,
+        proc: subprocess.Popen,
+        mode: str = "lines",
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        encoding: Optional[str] = "utf-8",
+        loads: Callable[[Any], Any] = json.loads,
+        tee: Optional[str | os.PathLike | IO[bytes]] = None,
+        stderr_limit: int = STDERR_LIMIT,
+    ):
+        if mode not in STREAM_MODES:
+            raise ValueError(
+                f"Unknown stream mode {mode!r}, expected one of {STREAM_MODES}"
+            )
+        self.proc = proc
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.loads = loads
+        self.stderr_limit = stderr_limit
+        self.returncode: Optional[int] = None
+        self._eof = False
+        self._stderr = b""
+        self._owns_tee = tee is not None and not hasattr(tee, "write")
+        try:
+            self._tee = open(tee, "wb") if self._owns_tee else tee
+        except BaseException:
+            # Nobody will ever read this process; don't leave it running or unreaped.
+            proc.kill()
+            proc.wait()
+            for pipe in (proc.stdout, proc.stderr):
+                if pipe is not None:
+                    pipe.close()
+            raise
+        self._stderr_tail = None
+        if proc.stderr is not None:
+            self._stderr_tail = PipeTail(proc.stderr, stderr_limit, chunk_size)
+        self._records = self._iter_records()
+
+    def _iter_raw(self) -> Iterator[bytes]:
+        read = self.proc.stdout.read1
+        while chunk := read(self.chunk_size):
+            if self._tee is not None:
+                self._tee.write(chunk)
+            yield chunk
+        self._eof = True
+
+    def _iter_records(self) -> Iterator[Any]:
+        try:
+            yield from iter_records(
+                self._iter_raw(), self.mode, self.encoding, self.loads
+            )
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        if self.returncode is not None:
+            return
+        if not self._eof and self.proc.poll() is None:
+            # Stopped before EOF: nobody will read the rest, so don't wait on the child.
+            self.proc.kill()
+        self.returncode = self.proc.wait()
+        if self._stderr_tail is not None:
+            self._stderr = self._stderr_tail.join()
+        for pipe in (self.proc.stdout, self.proc.stderr):
+            if pipe is not None:
+                pipe.close()
+        if self._owns_tee:
+            self._tee.close()
+        elif self._tee is not None:
+            self._tee.flush()
+
+    @property
+    def ok(self) -> Optional[bool]:
+        return None if self.returncode is None else self.returncode == 0
+
+    @property
+    def stderr_truncated(self) -> bool:
+        return self._stderr_tail is not None and self._stderr_tail.truncated
+
+    @property
+    def stderr(self) -> str | bytes:
+        data = self._stderr
+        return data if self.encoding is None else data.decode(self.encoding, "replace")
+
+    def wait(self) -> int:
+        """Drains whatever is left (still teed, not kept) and returns the exit code."""
+        for _ in self._records:
+            pass
+        self._finish()
+        return self.returncode
+
+    def __iter__(self) -> "ProcessStream":
+        return self
+
+    def __next__(self) -> Any:
+        return next(self._records)
+
+    def close(self) -> None:
+        self._records.close()
+        self._finish()  # the generator may never have started
+
+    def __enter__(self) -> "ProcessStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass, replace
+from typing import Any, Hashable, NoReturn, Optional
+
+
+class FrozenDict(dict):
+    """
+    A dict that refuses to change after construction.  Still a real dict, so it goes
+    straight into `json.dumps`, `requests` and `**kwargs` without conversion.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs) -> NoReturn:
+        raise TypeError(f"{type(self).__name__} is immutable; copy it with dict(...)")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+EMPTY = FrozenDict()
+
+
+def shared_frozen(mapping: Optional[dict]) -> FrozenDict:
+    """FrozenDicts are passed through as-is, so branches can share their parent's."""
+    if isinstance(mapping, FrozenDict):
+        return mapping
+    return FrozenDict(mapping) if mapping else EMPTY
+
+
+def freeze_tokens(obj: Any) -> Any:
+    """Deep, structure-preserving freeze: lists become tuples and dicts FrozenDicts."""
+    if isinstance(obj, FrozenDict):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict({k: freeze_tokens(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze_tokens(x) for x in obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return replace(
+            obj, **{f.name: freeze_tokens(getattr(obj, f.name)) for f in fields(obj)}
+        )
+    return obj
+
+
+class TokenCache:
+    """
+    Bounded LRU of assembled (and processed) tokens, keyed on (slug name, slug id,
+    command, frozen task kwargs).  Names need not be unique, so the id tells
+    same-named slugs apart; each entry keeps its slug alive so the id is not reused
+    while the entry exists.  Opt in by setting `token_cache` on a root slug before
+    branching; every branch then shares it.
+
+    Entries are frozen, so one cached value is safely handed to every caller.  A slug
+    whose attributes change after it has been called should be `invalidate`d by name;
+    `SlugRegistry.register(..., replace=True)` does this for you.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[tuple[Any, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(
+        self, key: Hashable, tokens: Any, processed_tokens: Any, owner: Any = None
+    ) -> None:
+        with self._lock:
+            self._entries[key] = (tokens, processed_tokens, owner)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, slug_name: str) -> int:
+        """Drops every entry for one slug and returns how many there were."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == slug_name]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
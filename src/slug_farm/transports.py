@@ -0,0 +1,237 @@
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from yarl import URL
+
+try:
+    import httpx
+except ImportError:  # optional: pip install "slug_farm[async]"
+    httpx = None
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Snapshot of one host pool inside a SessionPool."""
+
+    host: str
+    requests: int
+    connections_opened: int
+    open_connections: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests that rode an already-open connection."""
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.connections_opened / self.requests)
+
+
+class Transport:
+    """
+    Moves a RequestPackage over the wire and hands back the raw response.
+    The default is a one-shot `requests.request`, a fresh connection per call.
+    """
+
+    def request_kwargs(self, pkg) -> dict[str, Any]:
+        return {
+            "method": pkg.method,
+            "url": pkg.url,
+            "params": pkg.params,
+            "json": pkg.json_body if pkg.method in BODY_METHODS else None,
+            "headers": pkg.headers,
+            "timeout": pkg.timeout,
+            "stream": pkg.stream,
+        }
+
+    def send(self, pkg) -> requests.Response:
+        return requests.request(**self.request_kwargs(pkg))
+
+    async def asend(self, pkg) -> Any:
+        """Blocking transports are pushed onto a worker thread when awaited."""
+        return await asyncio.to_thread(self.send, pkg)
+
+    def close(self) -> None:
+        """Nothing held open, nothing to close."""
+
+
+DEFAULT_TRANSPORT = Transport()
+
+
+class _HostSession:
+    __slots__ = ("session", "adapter", "last_used", "users")
+
+    def __init__(self, pool_size: int, pool_block: bool):
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=pool_block
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.last_used = time.monotonic()
+        self.users = 0  # requests in flight; a session in use is never evicted
+
+    def connection_pools(self) -> list[Any]:
+        pools = self.adapter.poolmanager.pools
+        return [pools[key] for key in list(pools.keys())]
+
+
+class SessionPool(Transport):
+    """
+    Keep-alive transport shared by every branch of a RequestSlug tree.
+
+    One `requests.Session` per (scheme, host, port), so repeated calls to the same
+    upstream skip the TCP/TLS handshake.  Hosts with no request in flight for
+    `idle_timeout` seconds are closed the next time any request goes through the pool.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        idle_timeout: Optional[float] = 300.0,
+        pool_block: bool = False,
+    ):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.pool_block = pool_block
+        self.evictions = 0
+        self._hosts: dict[tuple[str, str, Optional[int]], _HostSession] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_key(url: str) -> tuple[str, str, Optional[int]]:
+        url_obj = URL(url)
+        return (url_obj.scheme, url_obj.host or "", url_obj.port)
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_timeout is None:
+            return
+        for key, host in list(self._hosts.items()):
+            if not host.users and now - host.last_used > self.idle_timeout:
+                host.session.close()
+                del self._hosts[key]
+                self.evictions += 1
+
+    @contextmanager
+    def checkout(self, url: str) -> Iterator[requests.Session]:
+        """The host's session, safe from idle eviction until the block exits."""
+        key = self.host_key(url)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            host = self._hosts.get(key)
+            if host is None:
+                host = _HostSession(self.pool_size, self.pool_block)
+                self._hosts[key] = host
+            host.users += 1
+        try:
+            yield host.session
+        finally:
+            with self._lock:
+                host.users -= 1
+                host.last_used = time.monotonic()  # idle from the end of the request
+
+    def send(self, pkg) -> requests.Response:
+        with self.checkout(pkg.url) as session:
+            return session.request(**self.request_kwargs(pkg))
+
+    def stats(self) -> dict[str, PoolStats]:
+        """Per-host request/connection counters, keyed by 'scheme://host:port'."""
+        with self._lock:
+            hosts = list(self._hosts.items())
+
+        report = {}
+        for (scheme, hostname, port), host in hosts:
+            requests_made = opened = open_now = 0
+            for conn_pool in host.connection_pools():
+                requests_made += conn_pool.num_requests
+                opened += conn_pool.num_connections
+                idle = list(conn_pool.pool.queue) if conn_pool.pool else []
+                open_now += sum(
+                    1 for c in idle if c is not None and getattr(c, "sock", None)
+                )
+            label = f"{scheme}://{hostname}:{port}"
+            report[label] = PoolStats(
+                host=label,
+                requests=requests_made,
+                connections_opened=opened,
+                open_connections=open_now,
+            )
+        return report
+
+    def close(self) -> None:
+        with self._lock:
+            for host in self._hosts.values():
+                host.session.close()
+            self._hosts.clear()
+
+    def __enter__(self) -> "SessionPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HTTPXTransport(Transport):
+    """
+    Natively async transport on top of httpx.
+    `asend` never touches a thread: one pooled `httpx.AsyncClient` is kept per event loop.
+    """
+
+    def __init__(self, max_connections: int = 100, **client_kwargs):
+        if httpx is None:
+            raise ImportError(
+                'HTTPXTransport requires httpx: pip install "slug_farm[async]"'
+            )
+        self.client_kwargs = {
+            "limits": httpx.Limits(max_connections=max_connections),
+            **client_kwargs,
+        }
+        self._client: Optional["httpx.Client"] = None
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def request_kwargs(self, pkg) -> dict[str, Any]:
+        kwargs = super().request_kwargs(pkg)
+        kwargs["params"] = {k: v for k, v in pkg.params.items() if v is not None}
+        del kwargs["stream"]
+        return kwargs
+
+    def send(self, pkg) -> "httpx.Response":
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self.client_kwargs)
+        if pkg.stream:
+            request = self._client.build_request(**self.request_kwargs(pkg))
+            return self._client.send(request, stream=True)
+        return self._client.request(**self.request_kwargs(pkg))
+
+    async def asend(self, pkg) -> "httpx.Response":
+        if pkg.stream:
+            # ResponseStream iterates synchronously, so streamed bodies use the sync client.
+            return await asyncio.to_thread(self.send, pkg)
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**self.client_kwargs)
+            self._async_clients[loop] = client
+        return await client.request(**self.request_kwargs(pkg))
+
+    async def aclose(self) -> None:
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
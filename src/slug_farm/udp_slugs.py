@@ -1,14 +1,28 @@
+import asyncio
 import copy
 import json
-from dataclasses import dataclass
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from functools import partial
 from socket import AF_INET, SOCK_DGRAM, AddressFamily, SocketKind, socket
 from time import sleep
-from typing import Any, List, Optional
+from typing import Any, Iterable, Optional
 from uuid import uuid4
 
 from yarl import URL
 
 from slug_farm.base import CommandSegment, Slug, SlugResult
+from slug_farm.burst_scheduler import (
+    BurstHandle,
+    BurstScheduler,
+    default_burst_scheduler,
+)
+from slug_farm.udp_sockets import (
+    Delivery,
+    PooledSocket,
+    UDPSocketPool,
+    send_datagrams,
+)
 
 
 @dataclass(slots=True)
@@ -19,7 +33,45 @@ class UDP_Package:
     body: dict
 
 
+@dataclass
+class BulkResult(SlugResult):
+    """
+    One `send_bulk`.  `output` holds the UDP_Package of every datagram; `sent[i]` is the
+    bytes the kernel took for datagram i (0 when it failed, see `errors[i]`), and
+    `syscalls` how many sends that took.
+    """
+
+    sent: list[int] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    syscalls: int = 0
+
+    @property
+    def delivered(self) -> int:
+        return sum(1 for error in self.errors if not error)
+
+    @property
+    def failed(self) -> list[int]:
+        return [i for i, error in enumerate(self.errors) if error]
+
+
 class UDP_Slug(Slug):
+    # Every call stamps a fresh udp_id in `process_tokens`, so only assembly is cached.
+    cache_processed_tokens = False
+    # Every call is a send; identical ones still put their own burst on the wire.
+    coalesce_calls = False
+
+    __slots__ = (
+        "url",
+        "port",
+        "burst_size",
+        "burst_delay",
+        "encoding",
+        "sock_family",
+        "sock_type",
+        "socket_pool",
+        "burst_scheduler",
+    )
+
     def __init__(
         self,
         name: str,
@@ -27,12 +79,14 @@ class UDP_Slug(Slug):
         port: int,
         command: Optional[str] = None,
         slug_kwargs: Optional[dict[str, Any]] = None,
-        base_command_segments: Optional[List[CommandSegment]] = None,
+        base_command_segments: Optional[Iterable[CommandSegment]] = None,
         burst_size: int = 1,
         burst_delay_ms: int = 20,
         encoding: str = "utf-8",
         sock_family: AddressFamily = AF_INET,
         sock_type: SocketKind = SOCK_DGRAM,
+        socket_pool: Optional[UDPSocketPool] = None,
+        burst_scheduler: Optional[BurstScheduler] = None,
     ):
         super().__init__(
             name=name,
@@ -48,6 +102,8 @@ class UDP_Slug(Slug):
         self.encoding = encoding
         self.sock_family = sock_family
         self.sock_type = sock_type
+        self.socket_pool = socket_pool
+        self.burst_scheduler = burst_scheduler
 
     def branch(
         self,
@@ -70,18 +126,22 @@ class UDP_Slug(Slug):
         else:
             new_url = self.url
 
-        return self.__class__(
-            name=f"{self.name}.{branch_name}",
-            url=new_url,
-            port=new_port or self.port,
-            command=None,
-            slug_kwargs=None,
-            base_command_segments=new_segments,
-            burst_size=burst_size or self.burst_size,
-            burst_delay_ms=burst_delay_ms or int(self.burst_delay * 1000),
-            encoding=encoding or self.encoding,
-            sock_family=sock_family or self.sock_family,
-            sock_type=sock_type or self.sock_type,
+        return self._inherit(
+            self.__class__(
+                name=f"{self.name}.{branch_name}",
+                url=new_url,
+                port=new_port or self.port,
+                command=None,
+                slug_kwargs=None,
+                base_command_segments=new_segments,
+                burst_size=burst_size or self.burst_size,
+                burst_delay_ms=burst_delay_ms or int(self.burst_delay * 1000),
+                encoding=encoding or self.encoding,
+                sock_family=sock_family or self.sock_family,
+                sock_type=sock_type or self.sock_type,
+                socket_pool=self.socket_pool,
+                burst_scheduler=self.burst_scheduler,
+            )
         )
 
     def test_print(
@@ -116,6 +176,132 @@ class UDP_Slug(Slug):
         merged["udp_id"] = str(uuid4())
         return UDP_Package(target=f"{self.url}:{self.port}", body=merged)
 
+    def _checkout(self) -> AbstractContextManager[PooledSocket]:
+        return self.socket_pool.checkout(
+            self.sock_family, self.sock_type, self.url, self.port
+        )
+
+    def _send_many(self, messages: list[bytes]) -> Delivery:
+        if self.socket_pool is not None:
+            with self._checkout() as pooled:
+                return pooled.send_many(messages)
+        with socket(self.sock_family, self.sock_type) as sock:
+            return send_datagrams(sock, messages, (self.url, self.port))
+
+    def send_bulk(
+        self,
+        payloads: Optional[Iterable[Optional[dict[str, Any]]]] = None,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+        repeat: Optional[int] = None,
+    ) -> BulkResult:
+        """
+        Sends many datagrams back to back, in as few syscalls as the kernel allows.
+
+        Each of `payloads` is merged over `task_kwargs` and becomes its own message,
+        with its own udp_id.  Without payloads, one message is sent `repeat` times
+        (default `burst_size`): a burst with no delay, sharing one udp_id.
+        """
+        if payloads is None:
+            tokens, package = self._tokens(command, task_kwargs)
+            packages = [package] * (self.burst_size if repeat is None else repeat)
+            messages = [json.dumps(package.body).encode(self.encoding)] * len(packages)
+        else:
+            tokens, packages = [], []
+            for payload in payloads:
+                merged = {**(task_kwargs or {}), **(payload or {})}
+                payload_tokens, package = self._tokens(command, merged)
+                tokens.append(payload_tokens)
+                packages.append(package)
+            messages = [json.dumps(p.body).encode(self.encoding) for p in packages]
+
+        try:
+            delivery = self._send_many(messages)
+        except Exception as e:
+            return BulkResult(
+                ok=False,
+                status=500,
+                output=packages,
+                error=str(e),
+                tokens=tokens,
+                sent=[0] * len(packages),
+                errors=[str(e)] * len(packages),
+            )
+
+        failed = [error for error in delivery.errors if error]
+        return BulkResult(
+            ok=not failed,
+            status=500 if failed else 200,
+            output=packages,
+            error=f"{len(failed)}/{len(packages)} failed: {failed[0]}"
+            if failed
+            else "",
+            tokens=tokens,
+            sent=delivery.sent,
+            errors=delivery.errors,
+            syscalls=delivery.syscalls,
+        )
+
+    def _schedule(
+        self, tokens: list[tuple[Any, dict]], processed_tokens: UDP_Package
+    ) -> BurstHandle:
+        message = json.dumps(processed_tokens.body).encode(self.encoding)
+        scheduler = self.burst_scheduler or default_burst_scheduler()
+        close = None
+        try:
+            if self.socket_pool is not None:
+                # Held for the whole burst, so an idle sweep cannot close it mid-way.
+                pooled = self.socket_pool.acquire(
+                    self.sock_family, self.sock_type, self.url, self.port
+                )
+                close = partial(self.socket_pool.release, pooled)
+                send = partial(pooled.send, message)
+            else:
+                sock = socket(self.sock_family, self.sock_type)
+                close = sock.close
+                send = partial(sock.sendto, message, (self.url, self.port))
+        except Exception as e:
+            handle = BurstHandle()
+            handle.set_result(
+                SlugResult(
+                    ok=False,
+                    status=500,
+                    output=processed_tokens,
+                    error=str(e),
+                    tokens=tokens,
+                )
+            )
+            return handle
+
+        def finish(error: Optional[BaseException]) -> SlugResult:
+            if close is not None:
+                close()
+            return SlugResult(
+                ok=error is None,
+                status=200 if error is None else 500,
+                output=processed_tokens,
+                error="" if error is None else str(error),
+                tokens=tokens,
+            )
+
+        try:
+            return scheduler.submit(send, self.burst_size, self.burst_delay, finish)
+        except BaseException:
+            if close is not None:
+                close()
+            raise
+
+    def schedule(
+        self,
+        command: Optional[str] = None,
+        task_kwargs: Optional[dict[str, Any]] = None,
+    ) -> BurstHandle:
+        """
+        Queues this slug's burst on the burst scheduler and returns at once.  The
+        handle resolves to the SlugResult when the last packet is out.
+        """
+        return self._schedule(*self._tokens(command, task_kwargs))
+
     def execute(
         self,
         tokens: list[tuple[Any, dict]],
@@ -125,11 +311,76 @@ class UDP_Slug(Slug):
 
         critical_i = self.burst_size - 1
         try:
-            with socket(self.sock_family, self.sock_type) as sock:
+            if self.burst_delay == 0 and critical_i:
+                # No gaps to keep, so the whole burst can go out in batched syscalls.
+                delivery = self._send_many([message] * self.burst_size)
+                failed = [error for error in delivery.errors if error]
+                if failed:
+                    raise OSError(failed[0])
+            elif self.burst_scheduler is not None and critical_i:
+                return self._schedule(tokens, processed_tokens).result()
+            elif self.socket_pool is not None:
+                with self._checkout() as pooled:
+                    for i in range(self.burst_size):
+                        pooled.send(message)
+                        if i < critical_i:
+                            sleep(self.burst_delay)
+            else:
+                with socket(self.sock_family, self.sock_type) as sock:
+                    for i in range(self.burst_size):
+                        sock.sendto(message, (self.url, self.port))
+                        if i < critical_i:
+                            sleep(self.burst_delay)
+
+            return SlugResult(
+                ok=True, status=200, output=processed_tokens, tokens=tokens
+            )
+        except Exception as e:
+            return SlugResult(
+                ok=False,
+                status=500,
+                output=processed_tokens,
+                error=str(e),
+                tokens=tokens,
+            )
+
+    async def aexecute(
+        self,
+        tokens: list[tuple[Any, dict]],
+        processed_tokens: UDP_Package,
+    ) -> SlugResult:
+        """Non-blocking burst over an asyncio datagram endpoint."""
+        message = json.dumps(processed_tokens.body).encode(self.encoding)
+
+        critical_i = self.burst_size - 1
+        if self.burst_scheduler is not None and critical_i:
+            return await asyncio.wrap_future(self._schedule(tokens, processed_tokens))
+        try:
+            if self.socket_pool is not None:
+                # A datagram send never waits on the peer, so the pooled socket is
+                # used as is; only the gaps between packets are awaited.
+                with self._checkout() as pooled:
+                    for i in range(self.burst_size):
+                        pooled.send(message)
+                        if i < critical_i:
+                            await asyncio.sleep(self.burst_delay)
+                return SlugResult(
+                    ok=True, status=200, output=processed_tokens, tokens=tokens
+                )
+
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol,
+                family=self.sock_family,
+                remote_addr=(self.url, self.port),
+            )
+            try:
                 for i in range(self.burst_size):
-                    sock.sendto(message, (self.url, self.port))
+                    transport.sendto(message)
                     if i < critical_i:
-                        sleep(self.burst_delay)
+                        await asyncio.sleep(self.burst_delay)
+            finally:
+                transport.close()
 
             return SlugResult(
                 ok=True, status=200, output=processed_tokens, tokens=tokens
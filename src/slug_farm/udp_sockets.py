@@ -0,0 +1,225 @@
+import errno
+import socket
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Sequence
+
+SocketKey = tuple[int, int, str, int]
+
+# Linux UDP GSO: one sendmsg carries up to 64 equal-sized datagrams, which the kernel
+# (or the NIC) splits.  Python has no sendmmsg, so this is the batching syscall.
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+GSO_MAX_SEGMENTS = 64
+GSO_MAX_BYTES = 65507
+_GSO_UNSUPPORTED = {errno.ENOPROTOOPT, errno.EOPNOTSUPP, errno.EIO}
+_segmentation: dict[int, bool] = {}  # family -> GSO works; missing means untried
+
+
+@dataclass(slots=True)
+class Delivery:
+    """Per-datagram outcome of `send_datagrams`: bytes sent, or 0 and an error."""
+
+    sent: list[int] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    syscalls: int = 0
+
+
+def _send_one(sock: socket.socket, message: bytes, address: Any) -> int:
+    if address is None:
+        try:
+            return sock.send(message)
+        except ConnectionRefusedError:
+            # A connected UDP socket reports an earlier datagram's ICMP "port
+            # unreachable" on the next send; that datagram is gone, this one is not.
+            return sock.send(message)
+    return sock.sendto(message, address)
+
+
+def _runs(messages: Sequence[bytes]):
+    """Splits messages into runs of equal length that fit one segmented send."""
+    start = 0
+    while start < len(messages):
+        size = len(messages[start])
+        limit = min(GSO_MAX_SEGMENTS, GSO_MAX_BYTES // size if size else 1)
+        end = start + 1
+        while end < len(messages) and end - start < limit:
+            if len(messages[end]) != size:
+                break
+            end += 1
+        yield messages[start:end], size
+        start = end
+
+
+def send_datagrams(
+    sock: socket.socket,
+    messages: Sequence[bytes],
+    address: Any = None,
+    segment: bool = True,
+) -> Delivery:
+    """
+    Sends each message as its own datagram, to `address` or, when None, to the peer the
+    socket is connected to.  Runs of equal-sized messages go out as one segmented
+    `sendmsg` where the kernel supports it; everything else, and any run the kernel
+    rejects, falls back to one send per message.  A failed message does not stop the
+    rest.
+    """
+    delivery = Delivery()
+    segment = (
+        segment
+        and sys.platform.startswith("linux")
+        and _segmentation.get(sock.family, True)
+    )
+    for run, size in _runs(messages):
+        if segment and len(run) > 1:
+            ancillary = [(socket.SOL_UDP, UDP_SEGMENT, struct.pack("H", size))]
+            try:
+                delivery.syscalls += 1
+                if address is None:
+                    sock.sendmsg(run, ancillary)
+                else:
+                    sock.sendmsg(run, ancillary, 0, address)
+            except OSError as e:
+                if e.errno in _GSO_UNSUPPORTED:
+                    _segmentation[sock.family] = segment = False
+            else:
+                _segmentation[sock.family] = True
+                delivery.sent.extend([size] * len(run))
+                delivery.errors.extend([""] * len(run))
+                continue
+
+        for message in run:
+            delivery.syscalls += 1
+            try:
+                delivery.sent.append(_send_one(sock, message, address))
+                delivery.errors.append("")
+            except OSError as e:
+                delivery.sent.append(0)
+                delivery.errors.append(str(e))
+    return delivery
+
+
+@dataclass(slots=True)
+class PooledSocket:
+    """One open datagram socket, its resolved destination and some counters."""
+
+    sock: socket.socket
+    address: Any
+    connected: bool
+    last_used: float
+    sends: int = 0
+    users: int = 0  # checkouts in progress; a socket in use is never evicted
+
+    def send(self, message: bytes) -> int:
+        self.sends += 1
+        return _send_one(self.sock, message, None if self.connected else self.address)
+
+    def send_many(self, messages: Sequence[bytes]) -> Delivery:
+        self.sends += len(messages)
+        return send_datagrams(
+            self.sock, messages, None if self.connected else self.address
+        )
+
+
+class UDPSocketPool:
+    """
+    Datagram sockets shared by every branch of a UDP_Slug tree, one per
+    (family, type, host, port).  The destination is resolved once when the socket is
+    opened.  With `connect=True` the socket is `connect()`ed, so each send skips the
+    per-datagram address lookup and route check.  Sockets nobody has checked out for
+    `idle_timeout` seconds are closed the next time anything goes through the pool.
+
+    Sending on a shared socket is thread-safe: each datagram is a single syscall.
+    """
+
+    def __init__(self, connect: bool = True, idle_timeout: Optional[float] = 300.0):
+        self.connect = connect
+        self.idle_timeout = idle_timeout
+        self.opened = 0
+        self.evictions = 0
+        self._sockets: dict[SocketKey, PooledSocket] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_timeout is None or now < self._next_sweep:
+            return
+        self._next_sweep = now + min(self.idle_timeout, 1.0)
+        for key, pooled in list(self._sockets.items()):
+            if not pooled.users and now - pooled.last_used > self.idle_timeout:
+                pooled.sock.close()
+                del self._sockets[key]
+                self.evictions += 1
+
+    def _open(self, family: int, sock_type: int, host: str, port: int) -> PooledSocket:
+        family, sock_type, proto, _, address = socket.getaddrinfo(
+            host, port, family, sock_type
+        )[0]
+        sock = socket.socket(family, sock_type, proto)
+        try:
+            if self.connect:
+                sock.connect(address)
+        except BaseException:
+            sock.close()
+            raise
+        self.opened += 1
+        return PooledSocket(sock, address, self.connect, time.monotonic())
+
+    def acquire(
+        self, family: int, sock_type: int, host: str, port: int
+    ) -> PooledSocket:
+        """Checks a socket out; hand it back with `release` (or use `checkout`)."""
+        key = (family, sock_type, host, port)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            pooled = self._sockets.get(key)
+            if pooled is None:
+                pooled = self._open(family, sock_type, host, port)
+                self._sockets[key] = pooled
+            pooled.users += 1
+            pooled.last_used = now
+        return pooled
+
+    def release(self, pooled: PooledSocket) -> None:
+        with self._lock:
+            pooled.users -= 1
+            pooled.last_used = time.monotonic()
+
+    @contextmanager
+    def checkout(
+        self, family: int, sock_type: int, host: str, port: int
+    ) -> Iterator[PooledSocket]:
+        pooled = self.acquire(family, sock_type, host, port)
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            sockets = {
+                f"{host}:{port}": {"sends": pooled.sends, "connected": pooled.connected}
+                for (_, _, host, port), pooled in self._sockets.items()
+            }
+        return {
+            "open": len(sockets),
+            "opened": self.opened,
+            "evictions": self.evictions,
+            "sockets": sockets,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for pooled in self._sockets.values():
+                pooled.sock.close()
+            self._sockets.clear()
+
+    def __enter__(self) -> "UDPSocketPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,8 +1,24 @@
+import asyncio
 import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
 
 import pytest
-
-from slug_farm import BashSlug
+from conftest import _COMPARE_STATS
+
+from slug_farm import (
+    BashSlug,
+    ForkServerLauncher,
+    Launcher,
+    ProcessPool,
+    RequestSlug,
+    Slug,
+)
+from slug_farm.streams import ProcessStream
 
 # --- Fixtures ---
 
@@ -189,3 +205,672 @@ def test_piping_workaround(file_system_farm):
 
     assert "grain.txt" in result.output
     assert "wheat" in result.output
+
+
+def test_bash_pipe_uses_os_pipes(file_system_farm):
+    """`ls | grep grain` for real: stages are wired stdout to stdin, no shell."""
+    lister = BashSlug("lister", "ls")
+    grain = BashSlug("grepper", "grep").branch("grain", command="grain")
+    pipe = lister | grain
+    assert pipe.name == "lister|grepper.grain"
+
+    assert pipe(command=str(file_system_farm), test=True).output == (
+        f"ls {file_system_farm} | grep grain"
+    )
+    result = pipe(command=str(file_system_farm))
+    assert result.ok is True
+    assert result.output == "grain.txt\n"
+    assert [stage.status for stage in result.stages] == [0, 0]
+    assert result.tokens == [["ls", str(file_system_farm)], ["grep", "grain"]]
+
+    counted = (pipe | BashSlug("wc", "wc", slug_kwargs={"l": True}))(
+        command=str(file_system_farm)
+    )
+    assert counted.output.strip() == "1" and len(counted.stages) == 3
+
+
+def test_bash_pipe_keeps_per_stage_status_and_stderr(file_system_farm):
+    cat = BashSlug("cat", "cat")
+    rye = BashSlug("grep", "grep").branch("rye", command="rye")
+    result = (cat | rye)(command=f"{file_system_farm}/grain.txt /not/here.txt")
+
+    assert result.ok is False
+    assert result.output == "rye\n"  # downstream still saw what cat could read
+    first, second = result.stages
+    assert first.ok is False and first.status == 1
+    assert "No such file or directory" in first.error
+    assert second.ok is True and second.error == ""
+    assert result.status == 1 and "here.txt" in result.error
+
+    # an upstream stage cut off by SIGPIPE is not a failure
+    endless = (
+        BashSlug("yes", "yes") | BashSlug("head", "head", slug_kwargs={"n": 3})
+    )()
+    assert endless.ok is True
+    assert endless.output == "y\ny\ny\n"
+
+
+def test_async_call_matches_sync(file_system_farm):
+    """acall runs the same pipeline without blocking the event loop."""
+    grepper = BashSlug("grepper", "grep").branch("recursive", slug_kwargs={"r": True})
+
+    sync_result = grepper(command=f"wheat {file_system_farm}")
+    async_result = asyncio.run(grepper.acall(command=f"wheat {file_system_farm}"))
+
+    assert async_result.ok is True
+    assert async_result.output == sync_result.output
+    assert async_result.tokens == sync_result.tokens
+
+    missing = asyncio.run(BashSlug("lister", "ls").acall(command="/tmp/not_real_12345"))
+    assert missing.ok is False
+    assert "No such file or directory" in missing.error
+
+
+def test_async_calls_overlap():
+    sleeper = BashSlug("sleeper", "sleep")
+
+    async def run_all():
+        return await asyncio.gather(*(sleeper.acall(command="0.3") for _ in range(5)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert all(r.ok for r in results)
+    assert elapsed < 1.0, f"5 x 0.3s sleeps took {elapsed:.2f}s, calls did not overlap"
+
+
+def test_map_streams_with_backpressure(file_system_farm):
+    """map pulls inputs lazily and never runs far ahead of the consumer."""
+    pulled = []
+
+    def endless_inputs():
+        n = 0
+        while True:
+            pulled.append(n)
+            yield {"-name": f"*{n}*"}
+            n += 1
+
+    finder = BashSlug("finder", "find").branch("farm", command=str(file_system_farm))
+    results = finder.map(endless_inputs(), max_workers=2)
+
+    first = next(results)
+    assert first.ok is True
+    assert len(pulled) <= 2 * 2 + 1
+
+    for _ in range(10):
+        next(results)
+    assert len(pulled) <= 11 + 2 * 2
+    results.close()
+
+
+def test_map_unordered_overlaps():
+    sleeper = BashSlug("sleeper", "sleep")
+    start = time.perf_counter()
+    results = list(sleeper.imap_unordered([None] * 6, command="0.2", max_workers=6))
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 6
+    assert all(r.ok for r in results)
+    assert elapsed < 0.8
+
+
+def test_branches_share_parent_segments(git_tree):
+    """Branches point at their parent's segments; per-call kwargs never leak back."""
+    git, remote, verbose = git_tree["git"], git_tree["remote"], git_tree["verbose"]
+    assert verbose.command_segments.parent is remote.command_segments.parent
+    assert remote.command_segments.parent is git.command_segments
+    assert [seg.command for seg in verbose.command_segments] == ["git", "remote"]
+    assert verbose.command_segments[-1].kwargs == {"v": True}
+    assert remote.command_segments[-1].kwargs == {}
+
+    tokens = verbose.assemble_tokens(task_kwargs={"n": True})
+    assert tokens[-1] == ("remote", ["-n", "-v"])
+    assert verbose.command_segments[-1].kwargs == {"v": True}
+
+    api = RequestSlug("api", base_url="https://api.example.com", payload_data={"a": 1})
+    bare = api.branch("bare", "/crops", replace_kwargs=True)
+    assert [seg.kwargs for seg in bare.command_segments] == [{}, {}]
+    assert api.command_segments[0].kwargs == {"a": 1}
+
+
+def build_tree(shape, size):
+    root = BashSlug("root", "echo")
+    if shape == "wide":
+        return [root] + [root.branch("c", f"c{i}") for i in range(size)]
+    nodes = [root]
+    for i in range(size):
+        nodes.append(nodes[-1].branch("c", f"c{i}"))
+    return nodes
+
+
+def test_segment_chain_tree_memory():
+    """
+    Benchmark: a deep tree costs about the same memory per node as an equally wide one.
+    Dotted names legitimately grow with depth, so they are left out of the count.
+    """
+    sizes = {}
+    for shape in ("wide", "deep"):
+        tracemalloc.start()
+        tree = build_tree(shape, 2000)
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        names = sum(map(sys.getsizeof, {slug.name for slug in tree}))  # interned
+        sizes[shape] = (traced - names) / len(tree)
+        del tree
+
+    _COMPARE_STATS.append(
+        {
+            "name": "Slug tree bytes/node wide vs deep",
+            "baseline": sizes["wide"],
+            "candidate": sizes["deep"],
+            "ok": sizes["deep"] < sizes["wide"] * 1.5,
+            "unit": "B",
+        }
+    )
+    assert sizes["deep"] < sizes["wide"] * 2
+
+
+def test_segment_chain_construction_linear():
+    """Benchmark: per-node build cost does not grow with the depth of the tree."""
+
+    def per_node(size):
+        start = time.perf_counter()
+        build_tree("deep", size)
+        return (time.perf_counter() - start) / size
+
+    shallow = min(per_node(100) for _ in range(3))
+    deep = min(per_node(3000) for _ in range(3))
+
+    _COMPARE_STATS.append(
+        {
+            "name": "Slug build per node depth 100 vs 3000",
+            "baseline": shallow,
+            "candidate": deep,
+            "ok": deep < shallow * 2,
+        }
+    )
+    assert deep < shallow * 4
+
+
+def test_streaming_lines_tee_and_stderr_cap(tmp_path):
+    script = (
+        "import sys\n"
+        "for i in range(5000):\n"
+        "    print(f'row {i}')\n"
+        "    sys.stderr.write('warning ' * 10 + '\\n')\n"
+    )
+    tee_path = tmp_path / "rows.txt"
+    py = BashSlug("py", sys.executable, stream="lines", stderr_limit=1024)
+    rows = py.branch("rows", slug_kwargs={"-c": script}, tee=tee_path)
+
+    result = rows()
+    assert result.ok is True
+    with result.output as stream:
+        lines = list(stream)
+
+    assert lines[0] == "row 0" and lines[-1] == "row 4999" and len(lines) == 5000
+    assert stream.returncode == 0 and stream.ok is True
+    assert tee_path.read_text().splitlines() == lines
+    assert len(stream.stderr) == 1024 and stream.stderr_truncated is True
+    assert stream.stderr.endswith("warning \n")
+
+
+def test_streaming_unwritable_tee(tmp_path):
+    tee_path = tmp_path / "missing" / "rows.txt"
+    yes = BashSlug("yes", "yes", stream="lines", tee=tee_path)
+
+    result = yes(command="hay")
+    assert result.ok is False and result.status == 1
+    assert "No such file or directory" in result.error
+
+    proc = subprocess.Popen(["yes"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with pytest.raises(FileNotFoundError):
+        ProcessStream(proc, tee=tee_path)
+    assert proc.returncode is not None  # killed and reaped, not left running
+    assert proc.stdout.closed and proc.stderr.closed
+
+
+def test_streaming_binary_and_early_close():
+    raw = BashSlug(
+        "raw",
+        sys.executable,
+        slug_kwargs={"-c": "import sys; sys.stdout.buffer.write(bytes(range(256)))"},
+        stream="chunks",
+    )
+    stream = raw().output
+    assert b"".join(stream) == bytes(range(256))
+    assert stream.returncode == 0
+
+    as_bytes = BashSlug("yes", "yes", stream="lines", encoding=None)
+    stream = as_bytes(command="hay").output
+    assert [next(stream) for _ in range(3)] == [b"hay"] * 3
+    stream.close()
+    assert stream.returncode != 0  # killed, not left running
+
+
+def test_streaming_peak_memory_is_bounded():
+    """Benchmark: peak Python memory while consuming ~16 MB of stdout."""
+    script = "import sys\nline = 'x' * 99 + '\\n'\nfor _ in range(160_000): sys.stdout.write(line)"
+    buffered = BashSlug("dump", sys.executable, slug_kwargs={"-c": script})
+    streamed = BashSlug(
+        "dump", sys.executable, slug_kwargs={"-c": script}, stream="lines"
+    )
+
+    def peak(call):
+        tracemalloc.start()
+        try:
+            total = call()
+            return total, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    buffered_total, buffered_peak = peak(lambda: len(buffered().output))
+    streamed_total, streamed_peak = peak(
+        lambda: sum(len(line) + 1 for line in streamed().output)
+    )
+
+    assert buffered_total == streamed_total == 16_000_000
+    _COMPARE_STATS.append(
+        {
+            "name": "BashSlug peak memory buffered vs stream",
+            "baseline": buffered_peak,
+            "candidate": streamed_peak,
+            "ok": streamed_peak < 1_000_000,
+            "unit": "B",
+        }
+    )
+    assert streamed_peak < 1_000_000
+
+
+def test_process_pool_limits_and_completion_order():
+    pool = ProcessPool(max_concurrency=4, per_tree={"slow": 1})
+    fast = BashSlug("fast", "sleep")
+    slow = BashSlug("slow", "sleep")
+    tasks = [(slow, "0.2", None)] * 3 + [(fast, "0.1", None)] * 8
+
+    start = time.perf_counter()
+    results = pool.run_all(tasks)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 11 and all(r.ok for r in results)
+    # "slow" runs one at a time; "fast" fills the other three slots alongside it
+    assert 0.6 <= elapsed < 0.9
+    assert results[-1].tokens == ["sleep", "0.2"]
+    assert results[0].tokens == ["sleep", "0.1"]
+
+
+def test_process_pool_saturated_tree_does_not_delay_others():
+    pool = ProcessPool(max_concurrency=8, per_tree={"pg": 1})
+    pg = BashSlug("pg", "sleep")
+    other = BashSlug("other", "sleep")
+    tasks = [(pg, "0.15", None)] * 8 + [(other, "0.14", None)] * 8
+
+    async def finish_times():
+        start = time.perf_counter()
+        return [
+            (r.tokens[-1], time.perf_counter() - start)
+            async for r in pool.as_completed(tasks)
+        ]
+
+    finished = asyncio.run(finish_times())
+    assert len(finished) == 16
+    # Queued "pg" tasks wait on their tree's cap without holding global slots, so
+    # the other tree gets seven of the eight slots and is done in two rounds.
+    other_done = max(t for duration, t in finished if duration == "0.14")
+    assert other_done < 0.6, f"other tree finished at {other_done:.2f}s"
+    assert max(t for _, t in finished) >= 8 * 0.15
+
+
+def test_process_pool_timeout_kills_process_group():
+    pool = ProcessPool(timeout=0.3)
+    shell = BashSlug("sh", "sh", process_pool=pool).branch(
+        "spawner", slug_kwargs={"-c": "sleep 30 & echo $!; wait"}
+    )
+
+    start = time.perf_counter()
+    result = asyncio.run(shell.acall())
+    assert time.perf_counter() - start < 2
+
+    assert result.ok is False
+    assert result.error.startswith("Timed out after 0.3s")
+    assert pool.stats()["timeouts"] == 1
+
+    grandchild = int(result.output.strip())
+    try:
+        with open(f"/proc/{grandchild}/stat") as f:
+            assert f.read().split(")")[1].split()[0] == "Z"  # dead, not yet reaped
+    except FileNotFoundError:
+        pass
+
+
+def test_process_pool_bounded_by_slowest_task():
+    """Benchmark: 20 x 50 ms tasks, one blocking call after another vs the pool."""
+    sleeper = BashSlug("sleeper", "sleep")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        sleeper(command="0.05")
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = ProcessPool(max_concurrency=20).run_all([(sleeper, "0.05", None)] * 20)
+    pooled = time.perf_counter() - start
+
+    assert all(r.ok for r in results)
+    _COMPARE_STATS.append(
+        {
+            "name": "BashSlug 20 tasks sequential vs pool",
+            "baseline": sequential,
+            "candidate": pooled,
+            "ok": pooled < sequential / 4,
+        }
+    )
+    assert pooled < sequential / 4
+
+
+def reference_argv(slug, command=None, task_kwargs=None):
+    """The walk-every-segment assembly BashSlug used before compiling its prefix."""
+    tokens = Slug.assemble_tokens(slug, command, task_kwargs)
+    argv = []
+    for cmd, flags in tokens:
+        if cmd:
+            argv.extend(shlex.split(cmd))
+        argv.extend(flags)
+    return tokens, argv
+
+
+def test_compiled_argv_matches_segment_walk(capsys):
+    wrapper = BashSlug("timer", slug_kwargs={"-time": True})
+    sed = BashSlug("editor", "sed", slug_kwargs={"i": True})
+    quoted = sed.branch("quoted", command="-e 's/old value/new value/g'")
+    git = BashSlug("git", "git", slug_kwargs={"C": "/srv/repo"})
+    log = git.branch("log", "log --oneline").branch("graph", slug_kwargs={"graph": 1})
+    calls = [
+        (None, None),
+        ("ls", {"-la": True}),
+        (None, {"n": True, "zz": "two words"}),
+        ("file.txt", {"a": False, "b": None, "verbose": True}),
+        (None, {"graph": False, "max-count": 3}),
+    ]
+
+    for slug in (wrapper, sed, quoted, git, log):
+        for command, task_kwargs in calls:
+            tokens, argv = reference_argv(slug, command, task_kwargs)
+            assert slug.assemble_tokens(command, task_kwargs) == tokens
+            assert (
+                slug.process_tokens(slug.assemble_tokens(command, task_kwargs)) == argv
+            )
+            assert slug.flatten_tokens(tokens) == argv
+
+            expected = slug.test_print(tokens)
+            capsys.readouterr()
+            assert slug(command, task_kwargs, test=True).output == expected
+
+    assert log.compiled_argv.argv_prefix == ("git", "-C", "/srv/repo")
+    assert log.compiled_argv is log.compiled_argv
+
+
+def test_compiled_argv_call_cost_flat_with_depth():
+    """Benchmark: assembling a call's argv costs about the same at depth 5 and 100."""
+
+    def chain(depth):
+        slug = BashSlug("tool", "tool", slug_kwargs={"config": "/etc/tool.conf"})
+        for i in range(depth - 1):
+            slug = slug.branch(f"s{i}", f"sub{i} --flag", slug_kwargs={f"opt{i}": i})
+        return slug
+
+    task_kwargs = {"name": "*.csv", "type": "f"}
+
+    def per_call(fn, calls=2000):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            best = min(best, (time.perf_counter() - start) / calls)
+        return best
+
+    shallow, deep = chain(5), chain(100)
+    compiled = {
+        depth: per_call(
+            lambda s=slug: s.process_tokens(s.assemble_tokens(None, task_kwargs))
+        )
+        for depth, slug in ((5, shallow), (100, deep))
+    }
+    walked = per_call(lambda: reference_argv(deep, None, task_kwargs), calls=200)
+    assert (
+        deep.process_tokens(deep.assemble_tokens(None, task_kwargs))
+        == (reference_argv(deep, None, task_kwargs)[1])
+    )
+
+    _COMPARE_STATS.append(
+        {
+            "name": "BashSlug argv depth 100 walk vs compiled",
+            "baseline": walked,
+            "candidate": compiled[100],
+            "ok": compiled[100] < walked / 10,
+        }
+    )
+    _COMPARE_STATS.append(
+        {
+            "name": "BashSlug argv depth 5 vs 100 compiled",
+            "baseline": compiled[5],
+            "candidate": compiled[100],
+            "ok": compiled[100] < compiled[5] * 2,
+        }
+    )
+    assert compiled[100] < compiled[5] * 4
+    assert compiled[100] < walked / 10
+
+
+def test_bash_pipe_throughput_matches_shell():
+    """Benchmark: 64 MB through `head | wc`, shell pipeline vs BashPipe."""
+    size = 64 * 1024 * 1024
+    head = BashSlug("head", "head", slug_kwargs={"c": size})
+    wc = BashSlug("wc", "wc", slug_kwargs={"c": True})
+    pipe = head | wc
+    shell = BashSlug(
+        "sh", "sh", slug_kwargs={"-c": f"head -c {size} /dev/zero | wc -c"}
+    )
+
+    def best(fn, rounds=3):
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+            assert result.ok and result.output.strip() == str(size)
+        return min(times)
+
+    shell_time = best(shell)
+    pipe_time = best(lambda: pipe(command="/dev/zero"))
+
+    _COMPARE_STATS.append(
+        {
+            "name": "64MB pipe shell vs BashPipe",
+            "baseline": shell_time,
+            "candidate": pipe_time,
+            "ok": pipe_time < shell_time * 1.25,
+        }
+    )
+    assert pipe_time < shell_time * 2 + 0.05
+
+
+def test_batch_packs_items_up_to_arg_limit():
+    pulled = []
+
+    def numbers():
+        for i in range(20_000):
+            pulled.append(i)
+            yield str(i)
+
+    echo = BashSlug("echo", "echo")
+    batches = echo.batch(numbers(), max_bytes=16_384, max_workers=2)
+    first = next(batches)
+    assert len(pulled) < 20_000  # the input is pulled lazily
+
+    results = [first, *batches]
+    assert all(r.ok for r in results) and all(all(r.item_ok) for r in results)
+    assert [int(n) for r in results for n in r.output.split()] == list(range(20_000))
+    assert all(len(" ".join(r.tokens)) < 16_384 for r in results)
+    assert len(results) < 20
+
+    capped = list(echo.batch(["a", ["b", "c"], {"n": True}], max_items=2))
+    assert [r.tokens for r in capped] == [["echo", "a", "b", "c"], ["echo", "-n"]]
+
+
+def test_batch_maps_failures_back_to_items(file_system_farm):
+    lister = BashSlug("ls", "ls", slug_kwargs={"d": True})
+    items = [str(file_system_farm / "grain.txt"), "/no/such/crop", "/no/such/field"]
+
+    (result,) = lister.batch(items)
+    assert result.ok is False
+    assert result.item_ok == [None, False, False]
+    assert result.failed_items == ["/no/such/crop", "/no/such/field"]
+
+    (isolated,) = lister.batch(items, isolate_failures=True)
+    assert isolated.item_ok == [True, False, False]
+
+
+def test_batch_blames_whole_operands_only(tmp_path):
+    (tmp_path / "log").write_text("kept")
+    lister = BashSlug("ls", "ls", slug_kwargs={"d": True})
+    log, rotated = str(tmp_path / "log"), str(tmp_path / "log.1")
+
+    (result,) = lister.batch([log, rotated])
+    assert result.ok is False
+    assert result.item_ok == [None, False]
+
+    # `tool: operand: reason`, the other common shape ($0 is the first item).
+    fake = BashSlug(
+        "fake", "sh", slug_kwargs={"c": 'echo "fake: $1: gone" >&2; exit 1'}
+    )
+    (colon,) = fake.batch(["zero", "field", "field.old"])
+    assert colon.item_ok == [None, False, None]
+
+    singles = list(BashSlug("echo", "echo").batch(["a", "b", "c"], max_bytes=0))
+    assert [r.tokens for r in singles] == [["echo", "a"], ["echo", "b"], ["echo", "c"]]
+
+
+def test_batch_vs_one_process_per_item(tmp_path):
+    """Benchmark: touching 500 files, one process each vs packed batches."""
+    paths = [str(tmp_path / f"f{i}") for i in range(500)]
+    touch = BashSlug("touch", "touch")
+
+    start = time.perf_counter()
+    for path in paths:
+        touch(command=path)
+    per_item = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = list(touch.batch(paths, max_workers=4))
+    batched = time.perf_counter() - start
+
+    assert all(all(r.item_ok) for r in results)
+    _COMPARE_STATS.append(
+        {
+            "name": "touch 500 files per-item vs batch",
+            "baseline": per_item,
+            "candidate": batched,
+            "ok": batched < per_item / 10,
+        }
+    )
+    assert batched < per_item / 5
+
+
+@pytest.mark.parametrize("launcher", ["spawn", "forkserver"])
+def test_launchers_return_same_results(launcher, file_system_farm):
+    plain = BashSlug("grepper", "grep", slug_kwargs={"r": True})
+    launched = BashSlug("grepper", "grep", slug_kwargs={"r": True}, launcher=launcher)
+    assert launched.branch("i", slug_kwargs={"i": True}).launcher is launched.launcher
+
+    for command in (f"wheat {file_system_farm}", f"wheat {file_system_farm}/nope"):
+        expected, result = plain(command=command), launched(command=command)
+        assert (
+            result.ok,
+            result.status,
+            result.output,
+            result.error,
+            result.tokens,
+        ) == (
+            expected.ok,
+            expected.status,
+            expected.output,
+            expected.error,
+            expected.tokens,
+        )
+
+    class NoRun(Launcher):
+        pass
+
+    with pytest.raises(TypeError):
+        NoRun()
+
+    missing = BashSlug("ghost", "no_such_command_here", launcher=launcher)()
+    assert missing.ok is False and "No such file or directory" in missing.error
+    assert asyncio.run(launched.acall(command=f"barley {file_system_farm}")).ok is True
+
+
+def test_forkserver_child_does_not_read_request_pipe():
+    launcher = ForkServerLauncher()
+    cat = BashSlug("cat", "cat", launcher=launcher)
+    echo = BashSlug("echo", "echo", launcher=launcher)
+    try:
+        results = []
+        worker = threading.Thread(target=lambda: results.append(cat()), daemon=True)
+        worker.start()
+        worker.join(timeout=10)
+        assert results, "a stdin-reading child hung on the launcher's request pipe"
+        assert results[0].ok is True and results[0].output == ""
+        assert echo(command="still talking").output.strip() == "still talking"
+    finally:
+        launcher.close()
+
+
+@pytest.mark.parametrize("launcher", ["spawn", "forkserver"])
+def test_launchers_follow_callers_cwd_and_env(launcher, tmp_path, monkeypatch):
+    pwd = BashSlug("pwd", "pwd", launcher=launcher)
+    printenv = BashSlug("printenv", "printenv", launcher=launcher)
+    pwd()  # the forkserver starts here, before the caller moves
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SLUG_FARM_LAUNCHER_TEST", launcher)
+    assert (
+        pwd().output.strip() == os.getcwd() == BashSlug("pwd", "pwd")().output.strip()
+    )
+    assert printenv(command="SLUG_FARM_LAUNCHER_TEST").output.strip() == launcher
+
+
+def test_launcher_spawn_latency_ignores_parent_rss():
+    """Benchmark: per-spawn latency with a small heap vs ~256 MB of touched heap."""
+    launchers = {
+        "spawn": BashSlug("true", "true", launcher="spawn"),
+        "forkserver": BashSlug("true", "true", launcher="forkserver"),
+    }
+
+    def latency(slug, calls=40):
+        slug()  # warm up (starts the forkserver)
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(calls):
+                slug()
+            best = min(best, (time.perf_counter() - start) / calls)
+        return best
+
+    small = {name: latency(slug) for name, slug in launchers.items()}
+    ballast = bytearray(b"x") * (256 * 1024 * 1024)
+    big = {name: latency(slug) for name, slug in launchers.items()}
+    del ballast
+
+    for name in launchers:
+        _COMPARE_STATS.append(
+            {
+                "name": f"launcher={name} small vs 256MB heap",
+                "baseline": small[name],
+                "candidate": big[name],
+                "ok": big[name] < small[name] * 1.25,
+            }
+        )
+        assert big[name] < small[name] * 2 + 0.0005
@@ -1,9 +1,29 @@
+import asyncio
+import gc
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 import pytest
+from conftest import _COMPARE_STATS
+
+from slug_farm import (
+    BashSlug,
+    PhaseTimer,
+    PythonSlug,
+    SingleFlight,
+    SlugObserver,
+    SlugPipeline,
+    SlugRegistry,
+    TokenCache,
+)
+
+
+def square(number: int):
+    return number * number
 
-from slug_farm import BashSlug, PythonSlug, SlugRegistry
 
 # --- Structural & Logic Tests (Dry Runs) ---
 
@@ -46,3 +66,396 @@ def test_registry_rejection():
     with pytest.raises(ValueError):
         test_registry.register(six_slug)
     assert test_registry["four"]().output == 4
+
+
+def test_async_function_calling():
+    async def add_async(number: int):
+        await asyncio.sleep(0)
+        return number + 4
+
+    def add_sync(number: int):
+        return number + 4
+
+    async_slug = PythonSlug(name="add_async", python_func=add_async)
+    sync_slug = PythonSlug(name="add_sync", python_func=add_sync)
+
+    async def run_all():
+        return await asyncio.gather(
+            async_slug.acall(task_kwargs={"number": 4}),
+            sync_slug.acall(task_kwargs={"number": 5}),
+            sync_slug.acall(task_kwargs={"wrong": 5}),
+        )
+
+    async_result, sync_result, bad_result = asyncio.run(run_all())
+    assert async_result.output == 8
+    assert sync_result.output == 9
+    assert bad_result.ok is False
+    assert "Signature Error" in bad_result.error
+
+
+def test_map_over_processes():
+    square_slug = PythonSlug(name="square", python_func=square)
+
+    ordered = list(square_slug.map(({"number": n} for n in range(20)), max_workers=2))
+    assert [r.output for r in ordered] == [n * n for n in range(20)]
+
+    unordered = square_slug.imap_unordered(
+        ({"number": n} for n in range(20)), max_workers=2
+    )
+    assert sorted(r.output for r in unordered) == [n * n for n in range(20)]
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    executions = []
+
+    def slow_lookup(crop: str):
+        executions.append(crop)
+        time.sleep(0.2)
+        return {"crop": crop, "tons": 100}
+
+    lookup = PythonSlug(name="lookup", python_func=slow_lookup)
+    lookup.single_flight = SingleFlight()
+    start_line = threading.Barrier(8)
+
+    def call(crop):
+        start_line.wait()
+        return lookup(task_kwargs={"crop": crop})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(call, ["wheat"] * 6 + ["rye"] * 2))
+
+    assert sorted(executions) == ["rye", "wheat"]
+    assert all(r is results[0] for r in results[:6])
+    assert results[-1].output["crop"] == "rye"
+    assert lookup.single_flight.stats() == {
+        "leaders": 2,
+        "followers": 6,
+        "in_flight": 0,
+    }
+
+    async def run_all():
+        return await asyncio.gather(
+            *(lookup.acall(task_kwargs={"crop": "oats"}) for _ in range(5))
+        )
+
+    async_results = asyncio.run(run_all())
+    assert executions.count("oats") == 1
+    assert all(r is async_results[0] for r in async_results)
+
+
+def test_single_flight_inherited_by_branches():
+    flights = SingleFlight()
+    echo = BashSlug("echo", "echo", read_only=True)
+    echo.single_flight = flights
+    loud = echo.branch("loud", slug_kwargs={"e": True})
+
+    assert loud.single_flight is flights
+    assert loud(command="hi").ok is True
+    assert flights.stats()["leaders"] == 1
+
+
+def test_single_flight_never_shares_streams():
+    flights = SingleFlight()
+    seq = BashSlug("seq", "seq", stream="lines", read_only=True)
+    seq.single_flight = flights
+    start_line = threading.Barrier(4)
+
+    def call(_):
+        start_line.wait()
+        return list(seq(command="50").output)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outputs = list(pool.map(call, range(4)))
+
+    assert all(len(lines) == 50 for lines in outputs)
+    assert flights.stats()["leaders"] == flights.stats()["followers"] == 0
+
+
+def test_single_flight_runs_every_write(tmp_path):
+    flights = SingleFlight()
+    log = tmp_path / "log"
+    append = BashSlug("sh", "sh").branch(
+        "append", slug_kwargs={"-c": f"sleep 0.1; echo hit >> {log}"}
+    )
+    append.single_flight = flights
+    piped = append | BashSlug("cat", "cat", read_only=True)
+    start_line = threading.Barrier(8)
+
+    def call(slug):
+        start_line.wait()
+        return slug()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(call, [append] * 4 + [piped] * 4))
+
+    assert all(r.ok for r in results)
+    assert log.read_text().count("hit") == 8
+    assert flights.stats()["leaders"] == flights.stats()["followers"] == 0
+
+    reader = append.branch("reader", read_only=True)
+    assert reader.read_only and not reader.branch("again", read_only=False).read_only
+
+
+class RecordingObserver(SlugObserver):
+    def __init__(self):
+        self.events = []
+
+    def phase_start(self, event):
+        self.events.append(("start", event.phase))
+
+    def phase_end(self, event):
+        self.events.append(("end", event.phase, event.slug, event.backend, event))
+
+
+def test_observers_see_every_phase(capsys):
+    recorder, timer = RecordingObserver(), PhaseTimer()
+    echo = BashSlug("echo", "echo").add_observer(recorder).add_observer(timer)
+    loud = echo.branch("loud", slug_kwargs={"e": True})
+    assert loud.observers == (recorder, timer)
+
+    assert loud(command="hi", task_kwargs={"n": True}).ok is True
+    assert capsys.readouterr().out == ""  # no stray prints on the call path
+
+    phases = [e[:2] for e in recorder.events]
+    assert phases == [
+        ("start", "call"),
+        ("start", "assemble_tokens"),
+        ("end", "assemble_tokens"),
+        ("start", "process_tokens"),
+        ("end", "process_tokens"),
+        ("start", "execute"),
+        ("end", "execute"),
+        ("end", "call"),
+    ]
+    call_end = recorder.events[-1]
+    assert call_end[2:4] == ("echo.loud", "BashSlug")
+    assert call_end[4].status == 0 and call_end[4].ok is True
+    assert call_end[4].duration >= recorder.events[-2][4].duration > 0
+    assert timer.timings[("echo.loud", "execute")]["count"] == 1
+    assert timer.slowest(1)[0][:2] == ("echo.loud", "call")
+
+    def boom():
+        raise RuntimeError("no harvest")
+
+    failing = PythonSlug("boom", boom).add_observer(timer)
+    assert asyncio.run(failing.acall()).ok is False
+    assert timer.timings[("boom", "call")]["failures"] == 1
+
+
+def test_observers_cost_nothing_when_absent():
+    """Benchmark: an unobserved call costs about the same as running its phases by hand."""
+    slug = PythonSlug("square", square)
+    task_kwargs = {"number": 3}
+
+    def by_hand(calls=10000):
+        start = time.perf_counter()
+        for _ in range(calls):
+            tokens = slug.assemble_tokens(command=None, task_kwargs=task_kwargs)
+            slug._run(tokens, slug.process_tokens(tokens))
+        return (time.perf_counter() - start) / calls
+
+    def via_call(calls=10000):
+        start = time.perf_counter()
+        for _ in range(calls):
+            slug(task_kwargs=task_kwargs)
+        return (time.perf_counter() - start) / calls
+
+    gc.collect()
+    rounds = [(by_hand(), via_call()) for _ in range(7)]
+    hand_cost = min(hand for hand, _ in rounds)
+    call_cost = min(call for _, call in rounds)
+
+    _COMPARE_STATS.append(
+        {
+            "name": "Slug phases by hand vs unobserved call",
+            "baseline": hand_cost,
+            "candidate": call_cost,
+            "ok": call_cost < hand_cost * 1.5,
+        }
+    )
+    assert call_cost < hand_cost * 2.5
+
+
+def test_token_cache_hits_and_freezes():
+    cache = TokenCache(max_entries=2)
+    ls = BashSlug("ls", "ls")
+    ls.token_cache = cache
+    long_ls = ls.branch("long", slug_kwargs={"l": True})
+    assert long_ls.token_cache is cache
+
+    first = long_ls(test=True, task_kwargs={"a": True})
+    again = long_ls(test=True, task_kwargs={"a": True})
+    assert first.output == again.output == "ls -a -l"
+    assert first.tokens is again.tokens
+    assert first.tokens == (("ls", ("-a", "-l")),)  # frozen to tuples
+
+    # True and 1 hash alike but assemble differently
+    assert long_ls(test=True, task_kwargs={"a": 1}).output == "ls -a 1 -l"
+    assert long_ls(command="/tmp", task_kwargs={"a": True}).ok is True
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 2,
+        "hit_rate": 0.25,
+    }
+
+
+def test_token_cache_same_named_siblings():
+    root = BashSlug("root", "echo")
+    root.token_cache = TokenCache()
+    alpha = root.branch("x", "alpha")
+    beta = root.branch("x", "beta")
+    assert alpha.name == beta.name
+
+    for _ in range(2):
+        assert alpha().output.strip() == "alpha"
+        assert beta().output.strip() == "beta"
+    assert root.token_cache.stats()["hits"] == 2
+
+
+def test_token_cache_invalidated_on_reregister():
+    cache = TokenCache()
+    registry = SlugRegistry()
+
+    echo = BashSlug("echo", "echo", slug_kwargs={"n": True})
+    echo.token_cache = cache
+    registry.register(echo)
+    assert registry["echo"](test=True).output == "echo -n"
+
+    louder = BashSlug("echo", "echo", slug_kwargs={"e": True})
+    louder.token_cache = cache
+    with pytest.raises(ValueError):
+        registry.register(louder)
+    registry.register(louder, replace=True)
+    assert cache.stats()["entries"] == 0
+    assert registry["echo"](test=True).output == "echo -e"
+
+
+def test_token_cache_skips_repeat_assembly():
+    """Benchmark: a repeated (slug, command, kwargs) call skips assembly entirely."""
+    root = BashSlug("find", "find")
+    uncached = root
+    for i in range(10):
+        uncached = uncached.branch(f"d{i}", command=f"dir{i}", slug_kwargs={"depth": i})
+    cached = BashSlug("find", "find")
+    cached.token_cache = TokenCache()
+    for i in range(10):
+        cached = cached.branch(f"d{i}", command=f"dir{i}", slug_kwargs={"depth": i})
+
+    task_kwargs = {"name": "*.csv", "type": "f", "maxdepth": 3}
+    expected = uncached.flatten_tokens(uncached._tokens(None, task_kwargs)[0])
+    assert cached.flatten_tokens(cached._tokens(None, task_kwargs)[0]) == expected
+
+    def per_call(slug, calls=5000):
+        start = time.perf_counter()
+        for _ in range(calls):
+            slug._tokens(None, task_kwargs)
+        return (time.perf_counter() - start) / calls
+
+    rounds = [(per_call(uncached), per_call(cached)) for _ in range(3)]
+    uncached_cost = min(u for u, _ in rounds)
+    cached_cost = min(c for _, c in rounds)
+
+    _COMPARE_STATS.append(
+        {
+            "name": "BashSlug assemble uncached vs cached",
+            "baseline": uncached_cost,
+            "candidate": cached_cost,
+            "ok": cached_cost < uncached_cost,
+        }
+    )
+    assert cached.token_cache.stats()["hit_rate"] > 0.99
+    assert cached_cost < uncached_cost
+
+
+def test_pipeline_runs_independent_nodes_concurrently():
+    registry = SlugRegistry()
+
+    def harvest(field: str):
+        time.sleep(0.2)
+        return {"field": field, "tons": 40}
+
+    def total(north: int, south: int, season: int):
+        return {"tons": north + south, "season": season}
+
+    registry.register(PythonSlug(name="harvest", python_func=harvest))
+    registry.register(PythonSlug(name="total", python_func=total))
+    registry.register(BashSlug("echo", "echo"))
+
+    pipe = SlugPipeline("farm", registry=registry)
+    pipe.add("north", "harvest", task_kwargs={"field": "north"})
+    pipe.add("south", "harvest", task_kwargs={"field": "south"})
+    pipe.add(
+        "total",
+        "total",
+        inputs={"north": "north.tons", "south": "south.tons", "season": "input.season"},
+    )
+    pipe.add(
+        "report",
+        "echo",
+        after=["total"],
+        inputs=lambda out: {"n": out["total"]["tons"]},
+    )
+    registry.register(pipe)
+    assert pipe.nodes["total"].after == ("north", "south")
+
+    start = time.perf_counter()
+    result = registry["farm"](task_kwargs={"season": 2026})
+    elapsed = time.perf_counter() - start
+
+    assert result.ok is True, result.error
+    assert result.output["total"].output == {"tons": 80, "season": 2026}
+    assert result.output["report"].output == "80"
+    assert result.output["north"].duration >= 0.2
+    # north and south overlap, so the whole DAG takes about one harvest
+    assert elapsed < 0.35
+
+
+def test_pipeline_rerun_skips_succeeded_nodes():
+    calls = []
+
+    def step(label: str):
+        calls.append(label)
+        if label == "upload" and calls.count("upload") == 1:
+            raise ConnectionError("upstream went away")
+        return label
+
+    pipe = SlugPipeline("nightly", max_workers=2)
+    for label, after in (
+        ("export", ()),
+        ("stats", ()),
+        ("upload", ("export",)),
+        ("notify", ("upload",)),
+    ):
+        pipe.add(
+            label, PythonSlug(label, step), task_kwargs={"label": label}, after=after
+        )
+
+    first = pipe()
+    assert first.ok is False
+    assert {n: r.state for n, r in first.output.items()} == {
+        "export": "ok",
+        "stats": "ok",
+        "upload": "failed",
+        "notify": "blocked",
+    }
+    assert "upload: " in first.error and "notify: blocked" in first.error
+
+    second = pipe()
+    assert second.ok is True
+    assert [second.output[n].state for n in pipe.nodes] == [
+        "reused",
+        "reused",
+        "ok",
+        "ok",
+    ]
+    assert sorted(calls) == ["export", "notify", "stats", "upload", "upload"]
+
+    # different pipeline input, or reset(), starts from scratch
+    pipe.reset()
+    assert all(r.state == "ok" for r in pipe().output.values())
+    assert len(calls) == 9
+
+    with pytest.raises(ValueError):
+        pipe.add("orphan", PythonSlug("orphan", step), after=("missing",))
@@ -1,12 +1,44 @@
 import threading
 import time
 
+import asyncio
+import json
+import statistics
+
+import pickle
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import requests
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from conftest import _COMPARE_STATS
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from yarl import URL
 
-from slug_farm import RequestPackage, RequestSlug
+from slug_farm.response_cache import CacheEntry
+from slug_farm.streams import iter_json_array
+from slug_farm import (
+    ChainedPaginator,
+    CursorPagination,
+    HTTPXTransport,
+    LinkHeaderPagination,
+    OffsetPagination,
+    PagePagination,
+    PaginationError,
+    RateLimiter,
+    TokenBucket,
+    MemoryCacheBackend,
+    RequestPackage,
+    RequestSlug,
+    ResponseCache,
+    SessionPool,
+    SingleFlight,
+    SQLiteCacheBackend,
+    SlugResult,
+    TokenCache,
+)
 
 
 @pytest.fixture(scope="module")
@@ -42,6 +74,80 @@ def farm_server():
         database["crops"][name].update(payload)
         return database["crops"][name]
 
+    almanac_hits = {"full": 0, "not_modified": 0}
+
+    @app.get("/almanac/{season}")
+    def almanac(season: str, request: Request, response: Response):
+        etag = f'"{season}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            almanac_hits["not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        almanac_hits["full"] += 1
+        response.headers["ETag"] = etag
+        return {"season": season, "plant": ["wheat", "rye"]}
+
+    @app.get("/almanac_hits")
+    def get_almanac_hits():
+        return almanac_hits
+
+    @app.get("/export/ndjson")
+    def export_ndjson(rows: int = 1000):
+        def lines():
+            for i in range(rows):
+                yield json.dumps({"row": i, "crop": "wheat"}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/export/array")
+    def export_array(rows: int = 1000):
+        def elements():
+            yield "["
+            for i in range(rows):
+                yield ("," if i else "") + json.dumps(
+                    {"row": i, "note": "a ] { tricky"}
+                )
+            yield "]"
+
+        return StreamingResponse(elements(), media_type="application/json")
+
+    fields = [f"field_{i}" for i in range(23)]
+
+    @app.get("/fields/offset")
+    def fields_by_offset(offset: int = 0, limit: int = 10, delay: float = 0.0):
+        time.sleep(delay)
+        return fields[offset : offset + limit]
+
+    @app.get("/fields/page")
+    def fields_by_page(page: int = 1, per_page: int = 5):
+        start = (page - 1) * per_page
+        return {"data": {"items": fields[start : start + per_page]}}
+
+    @app.get("/fields/cursor")
+    def fields_by_cursor(cursor: int = 0):
+        following = cursor + 5
+        return {
+            "items": fields[cursor:following],
+            "next_cursor": following if following < len(fields) else None,
+        }
+
+    @app.get("/fields/linked")
+    def fields_by_link(response: Response, page: int = 1):
+        start = (page - 1) * 5
+        if start + 5 < len(fields):
+            response.headers["Link"] = f'</fields/linked?page={page + 1}>; rel="next"'
+        return fields[start : start + 5]
+
+    throttle_calls = {"count": 0}
+
+    @app.get("/throttled")
+    def throttled(response: Response):
+        throttle_calls["count"] += 1
+        if throttle_calls["count"] == 1:
+            return Response(status_code=429, headers={"Retry-After": "0.3"})
+        response.headers["X-RateLimit-Remaining"] = "50"
+        response.headers["X-RateLimit-Reset"] = "10"
+        return {"calls": throttle_calls["count"]}
+
     # --- NEW ENDPOINT FOR PLACEHOLDERS ---
     @app.delete("/crops/{name}")
     def delete_crop(name: str):
@@ -242,3 +348,706 @@ def test_placeholder_live_execution(farm_server):
 
     check = RequestSlug("check", base_url=f"{farm_server}/crops")()
     assert "wheat" not in check.output
+
+
+def test_session_pool_inherited_and_reused(farm_server):
+    """Every branch of one tree rides the same keep-alive connection."""
+    with SessionPool(pool_size=2) as pool:
+        api = RequestSlug("farm", base_url=farm_server, transport=pool)
+        crops = api.branch("crops", url_segment="/crops")
+        deeper = crops.branch("filtered", sub_params={"limit": 5})
+
+        assert crops.transport is pool
+        assert deeper.transport is pool
+
+        for _ in range(5):
+            assert crops().ok is True
+            assert deeper().ok is True
+
+        stats = pool.stats()
+        assert len(stats) == 1
+        host_stats = next(iter(stats.values()))
+        assert host_stats.requests == 10
+        assert host_stats.connections_opened == 1
+        assert host_stats.open_connections == 1
+        assert host_stats.reuse_ratio == pytest.approx(0.9)
+
+
+def test_session_pool_idle_eviction(farm_server):
+    pool = SessionPool(idle_timeout=0.0)
+    api = RequestSlug("farm", base_url=farm_server, transport=pool)
+    other_host = RequestSlug(
+        "farm_by_name",
+        base_url=farm_server.replace("127.0.0.1", "localhost"),
+        transport=pool,
+    )
+
+    assert api.branch("crops", url_segment="/crops")().ok is True
+    time.sleep(0.01)
+    assert other_host.branch("crops", url_segment="/crops")().ok is True
+
+    assert pool.evictions == 1
+    assert len(pool.stats()) == 1
+    pool.close()
+
+
+def test_session_pool_keeps_sessions_in_use(farm_server):
+    pool = SessionPool(idle_timeout=0.05)
+    slow = RequestSlug("farm", base_url=farm_server, transport=pool).branch(
+        "slow", "/fields/offset", sub_params={"delay": 0.3}
+    )
+    other_host = RequestSlug(
+        "farm_by_name",
+        base_url=farm_server.replace("127.0.0.1", "localhost"),
+        transport=pool,
+    ).branch("crops", url_segment="/crops")
+
+    with ThreadPoolExecutor(max_workers=1) as worker:
+        in_flight = worker.submit(slow)
+        time.sleep(0.15)
+        # Sweeps the pool while the slow request has been out longer than idle_timeout.
+        assert other_host().ok is True
+        assert pool.evictions == 0 and len(pool.stats()) == 2
+        assert in_flight.result().ok is True
+
+    time.sleep(0.1)
+    assert other_host().ok is True
+    assert pool.evictions == 2  # both idle now, measured from their last response
+    pool.close()
+
+
+def test_session_pool_handshake_savings(farm_server):
+    """Benchmark: pooled keep-alive against a fresh connection per call."""
+    calls = 40
+
+    def per_call(slug):
+        timings = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            assert slug().ok is True
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    direct = RequestSlug("farm", base_url=farm_server).branch("crops", "/crops")
+    with SessionPool() as pool:
+        pooled = RequestSlug("farm", base_url=farm_server, transport=pool).branch(
+            "crops", "/crops"
+        )
+        direct_med = per_call(direct)
+        pooled_med = per_call(pooled)
+        reuse = next(iter(pool.stats().values())).reuse_ratio
+
+    assert reuse > 0.9
+    _COMPARE_STATS.append(
+        {
+            "name": "RequestSlug direct vs pooled",
+            "baseline": direct_med,
+            "candidate": pooled_med,
+            "ok": pooled_med <= direct_med,
+        }
+    )
+
+
+def test_async_call_default_transport(farm_server):
+    crops = RequestSlug("farm", base_url=farm_server).branch("crops", "/crops")
+
+    async def run_all():
+        return await asyncio.gather(*(crops.acall() for _ in range(5)))
+
+    results = asyncio.run(run_all())
+    assert all(r.ok for r in results)
+    assert all("corn" in r.output for r in results)
+
+
+def test_async_call_httpx_transport(farm_server):
+    pytest.importorskip("httpx")
+    transport = HTTPXTransport()
+    api = RequestSlug("farm", base_url=farm_server, transport=transport)
+    crops = api.branch("crops", "/crops")
+    missing = api.branch("missing", "/crops/{name}", method="PATCH")
+
+    async def run_all():
+        results = await asyncio.gather(
+            *(crops.acall() for _ in range(5)),
+            missing.acall(task_kwargs={"name": "kale", "tons": 1}),
+        )
+        await transport.aclose()
+        return results
+
+    *listed, not_found = asyncio.run(run_all())
+    assert all(r.ok and "corn" in r.output for r in listed)
+    assert not_found.ok is False
+    assert not_found.status == 404
+
+    assert crops().ok is True
+    transport.close()
+
+
+def test_compiled_route_flat_with_depth():
+    """Benchmark: assembling a deep branch costs about the same as a shallow one."""
+
+    def build(depth):
+        slug = RequestSlug("api", base_url="https://api.example.com/v1")
+        for i in range(depth):
+            slug = slug.branch(f"level_{i}", url_segment=f"level_{i}")
+        return slug.branch("item", url_segment="{item_id}")
+
+    def per_call(slug, calls=2000):
+        task_kwargs = {"item_id": 7, "limit": 25}
+        slug.assemble_tokens(task_kwargs=task_kwargs)  # first call compiles the route
+        start = time.perf_counter()
+        for _ in range(calls):
+            slug.assemble_tokens(task_kwargs=task_kwargs)
+        return (time.perf_counter() - start) / calls
+
+    shallow, deep = build(2), build(40)
+    assert deep.assemble_tokens(task_kwargs={"item_id": 7})[0].url.endswith(
+        "/level_39/7"
+    )
+
+    shallow_cost = min(per_call(shallow) for _ in range(3))
+    deep_cost = min(per_call(deep) for _ in range(3))
+
+    _COMPARE_STATS.append(
+        {
+            "name": "RequestSlug assemble depth 2 vs 40",
+            "baseline": shallow_cost,
+            "candidate": deep_cost,
+            "ok": deep_cost < shallow_cost * 2,
+        }
+    )
+    assert deep_cost < shallow_cost * 3
+
+
+def test_response_cache_hits_and_revalidation(farm_server):
+    cache = ResponseCache(default_ttl=60)
+    api = RequestSlug("farm", base_url=farm_server, cache=cache)
+    almanac = api.branch("almanac", url_segment="/almanac/{season}")
+    short_lived = api.branch("almanac_short", "/almanac/{season}", cache_ttl=0.0)
+    hit_counter = RequestSlug("hits", base_url=f"{farm_server}/almanac_hits")
+
+    assert almanac.cache is cache
+    assert short_lived.cache_ttl == 0.0
+
+    first = almanac(task_kwargs={"season": "spring"})
+    second = almanac(task_kwargs={"season": "spring"})
+    assert (
+        first.output == second.output == {"season": "spring", "plant": ["wheat", "rye"]}
+    )
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    short_lived(task_kwargs={"season": "autumn"})
+    revalidated = short_lived(task_kwargs={"season": "autumn"})
+    assert revalidated.ok is True
+    assert revalidated.status == 200
+    assert revalidated.output["season"] == "autumn"
+    assert cache.stats()["revalidations"] == 1
+
+    server_side = hit_counter().output
+    assert server_side["not_modified"] == 1
+
+
+def test_response_cache_hits_do_not_share_outputs(farm_server):
+    cache = ResponseCache(default_ttl=60)
+    api = RequestSlug("farm", base_url=farm_server, cache=cache)
+    almanac = api.branch("almanac", url_segment="/almanac/{season}")
+    tagged = api.branch("tagged", url_segment="/almanac/{season}")
+    tagged.loads = lambda body: {**json.loads(body), "decoder": "tagged"}
+
+    miss = almanac(task_kwargs={"season": "winter"})
+    miss.output["plant"].append("weeds")
+    hit = almanac(task_kwargs={"season": "winter"})
+    assert hit.output["plant"] == ["wheat", "rye"]
+    hit.output["plant"].clear()
+    assert almanac(task_kwargs={"season": "winter"}).output["plant"] == ["wheat", "rye"]
+
+    assert tagged(task_kwargs={"season": "winter"}).output["decoder"] == "tagged"
+    assert cache.stats()["hits"] == 3
+
+
+def test_response_cache_lru_eviction(farm_server):
+    cache = ResponseCache(backend=MemoryCacheBackend(max_entries=2))
+    almanac = RequestSlug("farm", base_url=farm_server, cache=cache).branch(
+        "almanac", "/almanac/{season}"
+    )
+    for season in ["spring", "summer", "autumn", "spring"]:
+        assert almanac(task_kwargs={"season": season}).ok is True
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 2
+    assert stats["misses"] == 4
+
+
+def test_response_cache_sqlite_backend(farm_server, tmp_path):
+    db_path = tmp_path / "cache.db"
+    first_cache = ResponseCache(backend=SQLiteCacheBackend(db_path))
+    almanac = RequestSlug("farm", base_url=farm_server, cache=first_cache).branch(
+        "almanac", "/almanac/{season}"
+    )
+    assert almanac(task_kwargs={"season": "winter"}).ok is True
+    first_cache.backend.close()
+
+    reloaded = ResponseCache(backend=SQLiteCacheBackend(db_path))
+    almanac = RequestSlug("farm", base_url=farm_server, cache=reloaded).branch(
+        "almanac", "/almanac/{season}"
+    )
+    result = almanac(task_kwargs={"season": "winter"})
+    assert result.output == {"season": "winter", "plant": ["wheat", "rye"]}
+    assert reloaded.stats()["hits"] == 1
+    reloaded.backend.close()
+
+
+def test_sqlite_cache_backend_limits(tmp_path):
+    def entry(body: bytes) -> CacheEntry:
+        return CacheEntry(200, body, "application/json", None, None, time.time() + 60)
+
+    db_path = tmp_path / "cache.db"
+    backend = SQLiteCacheBackend(db_path, max_entries=3, max_bytes=100)
+    assert [backend.set(key, entry(b"x" * 20)) for key in "abc"] == [0, 0, 0]
+    assert backend.set("a", entry(b"x" * 30)) == 0  # a replacement is not a new entry
+    assert backend.get("b") is not None  # b is now fresher than c
+    assert backend.set("d", entry(b"x" * 20)) == 1
+    assert backend.get("c") is None and len(backend) == 3
+
+    assert backend.set("e", entry(b"x" * 61)) == 2  # over max_bytes: a, then b, go
+    assert backend.get("d") is not None and len(backend) == 2
+    backend.delete("d")
+    backend.close()
+
+    reopened = SQLiteCacheBackend(db_path, max_entries=3, max_bytes=100)
+    assert len(reopened) == 1
+    assert reopened.set("f", entry(b"x" * 39)) == 0
+    assert reopened.set("g", entry(b"x" * 1)) == 1
+    reopened.clear()
+    assert len(reopened) == 0
+    assert reopened.set("h", entry(b"x" * 500)) == 0  # the newest entry always stays
+    reopened.close()
+
+
+def test_iter_json_array_tiny_chunks():
+    body = json.dumps(
+        [1, 23.5, "br]ack{et", {"nested": [1, 2, {"x": None}]}, True, 456]
+    )
+    one_byte_chunks = (body[i : i + 1].encode() for i in range(len(body)))
+    assert list(iter_json_array(one_byte_chunks)) == json.loads(body)
+    assert list(iter_json_array([b"  [ ]"])) == []
+
+    with pytest.raises(ValueError):
+        list(iter_json_array([b"[1, 2"]))
+
+
+def test_iter_json_array_large_buffer_cost():
+    """Benchmark: streaming a big array must stay linear, close to one json.loads."""
+    body = json.dumps([{"row": i, "crop": "wheat"} for i in range(200_000)]).encode()
+    chunks = [body[i : i + 65536] for i in range(0, len(body), 65536)]
+
+    start = time.perf_counter()
+    loaded = json.loads(body)
+    loads_cost = time.perf_counter() - start
+    start = time.perf_counter()
+    streamed = list(iter_json_array(chunks))
+    stream_cost = time.perf_counter() - start
+
+    assert streamed == loaded
+    _COMPARE_STATS.append(
+        {
+            "name": "json.loads vs iter_json_array 200k",
+            "baseline": loads_cost,
+            "candidate": stream_cost,
+            "ok": stream_cost < loads_cost * 6,
+        }
+    )
+    assert stream_cost < loads_cost * 8
+
+
+def test_streaming_modes(farm_server):
+    with SessionPool() as pool:
+        api = RequestSlug("farm", base_url=farm_server, transport=pool)
+        ndjson = api.branch("ndjson", "/export/ndjson", stream="ndjson")
+        lines = ndjson.branch("lines", stream="lines")
+        array = api.branch("array", "/export/array", stream="json_array")
+        chunks = api.branch("chunks", "/export/array", stream="chunks")
+
+        records = ndjson(task_kwargs={"rows": 500}).output
+        assert not isinstance(records, list)
+        assert [r["row"] for r in records] == list(range(500))
+
+        with lines(task_kwargs={"rows": 3}).output as line_stream:
+            first_line = next(line_stream)
+        assert json.loads(first_line) == {"row": 0, "crop": "wheat"}
+
+        elements = list(array(task_kwargs={"rows": 800}).output)
+        assert len(elements) == 800
+        assert elements[-1] == {"row": 799, "note": "a ] { tricky"}
+
+        raw = b"".join(chunks(task_kwargs={"rows": 5}).output)
+        assert len(json.loads(raw)) == 5
+
+        stats = next(iter(pool.stats().values()))
+        assert stats.connections_opened == 1, "a stream held its connection open"
+
+
+def test_streaming_close_releases_connection(farm_server):
+    with SessionPool() as pool:
+        api = RequestSlug("farm", base_url=farm_server, transport=pool)
+        ndjson = api.branch("ndjson", "/export/ndjson", stream="ndjson")
+
+        with ndjson(task_kwargs={"rows": 100_000}).output as records:
+            assert next(records)["row"] == 0
+
+        assert ndjson(task_kwargs={"rows": 2}).ok is True
+        assert next(iter(pool.stats().values())).requests == 2
+
+    with pytest.raises(ValueError):
+        api.branch("bad", stream="xml")
+
+
+def test_pagination_strategies(farm_server):
+    all_fields = [f"field_{i}" for i in range(23)]
+    api = RequestSlug("farm", base_url=farm_server)
+    fields = api.branch("fields", "/fields")
+
+    by_offset = fields.branch("offset", "offset", paginator=OffsetPagination(limit=4))
+    by_page = fields.branch(
+        "page", "page", paginator=PagePagination(size=5, items_key="data.items")
+    )
+    by_cursor = fields.branch("cursor", "cursor", paginator=CursorPagination())
+    by_link = fields.branch("linked", "linked", paginator=LinkHeaderPagination())
+
+    assert list(by_offset.paginate(max_in_flight=3)) == all_fields
+    assert list(by_page.paginate()) == all_fields
+    assert list(by_cursor.paginate()) == all_fields
+    assert list(by_link.paginate()) == all_fields
+
+    inherited = by_cursor.branch("inherited")
+    assert inherited.paginator is by_cursor.paginator
+
+    with pytest.raises(ValueError):
+        next(fields.paginate())
+
+    broken = api.branch("broken", "/not_here", paginator=PagePagination())
+    with pytest.raises(PaginationError):
+        list(broken.paginate())
+
+
+def test_pagination_pages_skip_the_cache(farm_server):
+    cache = ResponseCache(default_ttl=60)
+    fields = RequestSlug("farm", base_url=farm_server, cache=cache).branch(
+        "fields", "/fields"
+    )
+    by_offset = fields.branch("offset", "offset", paginator=OffsetPagination(limit=4))
+    by_cursor = fields.branch("cursor", "cursor", paginator=CursorPagination())
+
+    for _ in range(2):
+        assert len(list(by_offset.paginate(max_in_flight=3))) == 23
+        assert len(list(by_cursor.paginate())) == 23
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 0,
+        "revalidations": 0,
+        "evictions": 0,
+        "entries": 0,
+    }
+
+    class NoNextPage(ChainedPaginator):
+        pass
+
+    with pytest.raises(TypeError):
+        NoNextPage()
+
+
+def test_pagination_prefetch_overlaps(farm_server):
+    """The next page is already on the wire while the caller works on this one."""
+    slow_pages = RequestSlug("farm", base_url=farm_server).branch(
+        "slow",
+        "/fields/offset",
+        sub_params={"delay": 0.1},
+        paginator=OffsetPagination(limit=5),
+    )
+
+    start = time.perf_counter()
+    seen = []
+    for item in slow_pages.paginate(max_in_flight=2):
+        if item.endswith(("0", "5")):
+            time.sleep(0.1)  # per-page processing
+        seen.append(item)
+    elapsed = time.perf_counter() - start
+
+    assert len(seen) == 23
+    serial = 5 * 0.1 + 5 * 0.1
+    assert elapsed < serial * 0.85, (
+        f"{elapsed:.2f}s: fetch and processing did not overlap"
+    )
+
+
+def test_token_bucket_pacing():
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.perf_counter()
+    for _ in range(12):
+        bucket.acquire()
+    elapsed = time.perf_counter() - start
+    assert 0.18 <= elapsed <= 0.35, f"10 paced tokens at 50/s took {elapsed:.3f}s"
+
+    async def run_all():
+        await asyncio.gather(*(bucket.aacquire() for _ in range(10)))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    assert 0.15 <= time.perf_counter() - start <= 0.35
+
+
+def test_token_bucket_pause_does_not_bank_tokens():
+    """Callers queued behind a Retry-After are paced after it, not released at once."""
+    bucket = TokenBucket(rate=20, burst=1)
+    bucket.pause(1.0)
+    waits = [bucket.reserve() for _ in range(20)]
+    gaps = [later - earlier for earlier, later in zip(waits, waits[1:])]
+    assert waits[0] == pytest.approx(1.05, abs=0.01)
+    assert all(gap == pytest.approx(0.05, abs=0.005) for gap in gaps)
+
+
+def test_rate_limiter_adapts_to_headers():
+    limiter = RateLimiter(rate=100, burst=1)
+    url = "http://upstream.example:8000/things"
+    bucket = limiter.bucket_for(url)
+    assert limiter.bucket_for("http://upstream.example:8000/other") is bucket
+    assert limiter.bucket_for("http://elsewhere.example/") is not bucket
+
+    limiter.observe(url, 200, {"x-ratelimit-remaining": "20", "x-ratelimit-reset": "4"})
+    assert bucket.rate == pytest.approx(5.0)
+
+    limiter.observe(url, 429, {})
+    assert bucket.rate == pytest.approx(2.5)
+
+    for _ in range(3):
+        limiter.observe(url, 200, {})
+    assert bucket.rate == pytest.approx(17.5)
+
+    limiter.observe(url, 429, {"retry-after": "0.2"})
+    start = time.perf_counter()
+    limiter.acquire(url)
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_rate_limiter_shared_by_tree(farm_server):
+    limiter = RateLimiter(rate=20, burst=1)
+    api = RequestSlug("farm", base_url=farm_server, rate_limiter=limiter)
+    crops = api.branch("crops", "/crops")
+    fields = api.branch("fields", "/fields/offset")
+    assert crops.rate_limiter is fields.rate_limiter is limiter
+
+    start = time.perf_counter()
+    for _ in range(3):
+        assert crops().ok is True
+        assert fields().ok is True
+    assert time.perf_counter() - start >= 5 / 20 * 0.9
+
+    throttled = api.branch("throttled", "/throttled")
+    first = throttled()
+    assert first.status == 429
+    start = time.perf_counter()
+    second = asyncio.run(throttled.acall())
+    assert second.ok is True
+    assert time.perf_counter() - start >= 0.25
+
+
+def test_single_flight_request_tree(farm_server):
+    flights = SingleFlight()
+    api = RequestSlug("farm", base_url=farm_server, single_flight=flights)
+    slow = api.branch("slow", "/fields/offset", sub_params={"delay": 0.2})
+    assert slow.single_flight is flights
+
+    results = list(slow.map([None] * 6, max_workers=6))
+    assert all(r.ok for r in results)
+    assert flights.stats()["leaders"] < 6
+    assert flights.stats()["followers"] >= 1
+
+
+def test_single_flight_skips_writes_and_streams(farm_server):
+    flights = SingleFlight()
+    api = RequestSlug("farm", base_url=farm_server, single_flight=flights)
+    plant = api.branch("plant", "/crops", method="POST")
+    export = api.branch("export", "/export/ndjson", stream="ndjson")
+
+    planted = list(plant.map([{"name": "rye"}] * 4, max_workers=4))
+    assert [r.status for r in planted] == [201] * 4
+
+    streams = list(export.map([{"rows": 50}] * 4, max_workers=4))
+    assert [len(list(r.output)) for r in streams] == [50] * 4
+    assert flights.stats()["leaders"] == flights.stats()["followers"] == 0
+
+    assert plant.flight_key(plant.assemble_tokens()) is None
+    assert api.flight_key(api.assemble_tokens()) is not None
+
+
+def make_response(body: bytes, content_type: str, status: int = 200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    response.encoding = "utf-8"
+    return response
+
+
+def test_lazy_pluggable_decoding():
+    calls = []
+
+    def counting_loads(body):
+        calls.append(body)
+        return json.loads(body)
+
+    api = RequestSlug("api", base_url="https://api.example.com", decoder=counting_loads)
+    leaf = api.branch("crops", "/crops")
+    assert leaf.loads is counting_loads
+    tokens = leaf.assemble_tokens()
+
+    result = leaf.handle_response(
+        make_response(b'{"crops": ["corn"]}', "application/json"), tokens
+    )
+    assert result.ok and result.status == 200
+    assert calls == []  # status-only callers never pay for the parse
+    assert result.output == {"crops": ["corn"]}
+    assert result.output == {"crops": ["corn"]}
+    assert len(calls) == 1
+
+    text = leaf.handle_response(
+        make_response(b'{"not": "parsed"}', "text/plain"), tokens
+    )
+    assert text.output == '{"not": "parsed"}'
+    broken = leaf.handle_response(make_response(b"<html>", "application/json"), tokens)
+    assert broken.output == "<html>"
+    assert len(calls) == 2  # text/plain was never handed to the decoder
+
+    restored = pickle.loads(
+        pickle.dumps(
+            leaf.handle_response(make_response(b"[1, 2]", "application/json"), tokens)
+        )
+    )
+    assert isinstance(restored, SlugResult) and restored.output == [1, 2]
+
+    with pytest.raises(ValueError):
+        RequestSlug("api", decoder="yaml")
+    orjson = pytest.importorskip("orjson")
+    fast = RequestSlug("api", base_url="https://api.example.com", decoder="orjson")
+    assert fast.branch("crops", "/crops").loads is orjson.loads
+
+
+def test_lazy_decoding_status_only_savings():
+    """Benchmark: callers that only check `ok`/`status` skip the JSON parse entirely."""
+    body = json.dumps(
+        {"fields": [{"id": i, "crop": "corn", "acres": i * 1.5} for i in range(20000)]}
+    ).encode()
+    slug = RequestSlug("api", base_url="https://api.example.com")
+    tokens = slug.assemble_tokens()
+
+    def per_call(read_output, calls=20):
+        start = time.perf_counter()
+        for _ in range(calls):
+            result = slug.handle_response(
+                make_response(body, "application/json"), tokens
+            )
+            if read_output:
+                assert len(result.output["fields"]) == 20000
+            else:
+                assert result.ok and result.status == 200
+        return (time.perf_counter() - start) / calls
+
+    full_cost = min(per_call(True) for _ in range(3))
+    status_cost = min(per_call(False) for _ in range(3))
+
+    _COMPARE_STATS.append(
+        {
+            "name": "RequestSlug full decode vs status-only",
+            "baseline": full_cost,
+            "candidate": status_cost,
+            "ok": status_cost < full_cost,
+        }
+    )
+    assert status_cost < full_cost / 5
+
+
+def test_token_cache_request_tree(farm_server):
+    cache = TokenCache()
+    api = RequestSlug("farm", base_url=farm_server, token_cache=cache)
+    field = api.branch("field", "/fields/offset")
+
+    first = field(task_kwargs={"limit": 2})
+    second = field(task_kwargs={"limit": 2})
+    assert first.ok and second.ok
+    assert first.tokens[0] is second.tokens[0]
+    assert dict(second.tokens[0].params) == {"limit": 2}
+    with pytest.raises(TypeError):
+        second.tokens[0].params["limit"] = 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_token_cache_same_named_request_branches():
+    api = RequestSlug(
+        "api", base_url="https://api.example.com", token_cache=TokenCache()
+    )
+    crops = api.branch("get", "/crops")
+    fields = api.branch("get", "/fields")
+
+    for _ in range(2):
+        assert crops(test=True).output.url == "https://api.example.com/crops"
+        assert fields(test=True).output.url == "https://api.example.com/fields"
+
+
+class UnsharedRequestSlug(RequestSlug):
+    """The old layout: a __dict__ per slug and private copies of headers/params."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.headers = dict(self.headers)
+        self.params = dict(self.params)
+
+
+def build_api_tree(slug_class, size):
+    root = slug_class(
+        "api",
+        base_url="https://api.example.com/v1",
+        headers={"Accept": "application/json", "Authorization": "Bearer abc"},
+        params={"api_key": "k"},
+    )
+    tree = [root]
+    for i in range(100):
+        group = root.branch(f"group_{i}", f"/group_{i}")
+        tree.append(group)
+        tree.extend(
+            group.branch(f"item_{j}", f"/item_{j}/{{item_id}}")
+            for j in range(size // 100 - 1)
+        )
+    return tree
+
+
+def test_slug_tree_bytes_per_slug():
+    """Benchmark: resident bytes per RequestSlug in a 10k-node tree."""
+    sizes = {}
+    for slug_class in (UnsharedRequestSlug, RequestSlug):
+        tracemalloc.start()
+        tree = build_api_tree(slug_class, 10_000)
+        sizes[slug_class] = tracemalloc.get_traced_memory()[0] / len(tree)
+        tracemalloc.stop()
+        del tree
+
+    root, *_, leaf = build_api_tree(RequestSlug, 200)
+    assert not hasattr(leaf, "__dict__")
+    assert leaf.headers is root.headers and leaf.params is root.params
+    tagged = leaf.branch("tagged", sub_params={"tag": "x"})
+    assert tagged.headers is root.headers and tagged.params == {
+        "api_key": "k",
+        "tag": "x",
+    }
+
+    _COMPARE_STATS.append(
+        {
+            "name": "RequestSlug bytes/slug dict vs slots",
+            "baseline": sizes[UnsharedRequestSlug],
+            "candidate": sizes[RequestSlug],
+            "ok": sizes[RequestSlug] < sizes[UnsharedRequestSlug],
+            "unit": "B",
+        }
+    )
+    assert sizes[RequestSlug] < sizes[UnsharedRequestSlug]
@@ -1,15 +1,25 @@
+import asyncio
 import json
 import socket
 import sqlite3
+import statistics
 import threading
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pytest
-from conftest import _BURST_STATS
+from conftest import _BURST_STATS, _COMPARE_STATS
 
-from slug_farm import UDP_Slug
+from slug_farm import (
+    BurstScheduler,
+    SingleFlight,
+    TokenCache,
+    UDP_Slug,
+    UDPSocketPool,
+)
+from slug_farm.udp_sockets import GSO_MAX_SEGMENTS, _segmentation, send_datagrams
 
 
 @pytest.fixture
@@ -95,6 +105,19 @@ def test_udp_branching_and_package_integrity():
     assert "udp_id" in package.body
 
 
+def test_udp_token_cache_keeps_fresh_udp_ids():
+    """Assembly is cached, but every call still gets its own udp_id."""
+    root = UDP_Slug("root", url="127.0.0.1", port=8000, slug_kwargs={"global": True})
+    root.token_cache = TokenCache()
+    leaf = root.branch("sensor", slug_kwargs={"local": True})
+
+    first = leaf(test=True, task_kwargs={"reading": 1}).output
+    second = leaf(test=True, task_kwargs={"reading": 1}).output
+    assert leaf.token_cache.stats()["hits"] == 1
+    assert first.body["reading"] == second.body["reading"] == 1
+    assert first.body["udp_id"] != second.body["udp_id"]
+
+
 # --- Live Execution Tests (Functional) ---
 def test_udp_slug_high_volume_burst(udp_auditor):
     host, port, db_path = udp_auditor
@@ -216,3 +239,457 @@ def test_udp_burst_timing_logic(udp_auditor):
 
     assert 0.18 <= gap_1 <= 0.22
     assert 0.18 <= gap_2 <= 0.22
+
+
+def test_udp_async_burst(udp_auditor):
+    host, port, db_path = udp_auditor
+
+    slug = UDP_Slug(
+        "async_telemetry", url=host, port=port, burst_size=3, burst_delay_ms=50
+    )
+
+    async def run_all():
+        return await asyncio.gather(slug.acall(command="A"), slug.acall(command="B"))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert all(r.ok for r in results)
+    assert elapsed < 0.2, f"Two 100ms bursts took {elapsed:.3f}s, they did not overlap"
+
+    time.sleep(0.3)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 6
+    assert len({row[0] for row in rows}) == 2
+
+
+def test_udp_single_flight_sends_every_burst(udp_auditor):
+    host, port, db_path = udp_auditor
+    slug = UDP_Slug("beacon", url=host, port=port, burst_size=2, burst_delay_ms=50)
+    slug.single_flight = SingleFlight()
+    start_line = threading.Barrier(4)
+
+    def call(_):
+        start_line.wait()
+        return slug(command="ping")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call, range(4)))
+
+    assert all(r.ok for r in results)
+    assert len({r.output.body["udp_id"] for r in results}) == 4
+    assert slug.single_flight.stats()["followers"] == 0
+
+    time.sleep(0.3)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 8
+    assert len({row[0] for row in rows}) == 4
+
+
+def test_udp_socket_pool_shared_across_branches(udp_auditor):
+    host, port, db_path = udp_auditor
+
+    with UDPSocketPool() as pool:
+        root = UDP_Slug("pooled", url=host, port=port, socket_pool=pool)
+        left = root.branch("left", slug_kwargs={"side": "left"})
+        right = root.branch("right", slug_kwargs={"side": "right"}, burst_size=2)
+
+        assert left.socket_pool is right.socket_pool is pool
+        assert all(left(command="ping").ok for _ in range(5))
+        assert all(right(command="ping").ok for _ in range(5))
+        assert asyncio.run(left.acall(command="ping")).ok
+
+        stats = pool.stats()
+        assert stats["opened"] == 1
+        assert stats["sockets"][f"{host}:{port}"] == {"sends": 16, "connected": True}
+
+    time.sleep(0.3)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 16
+    assert len({row[0] for row in rows}) == 11
+
+
+def test_udp_socket_pool_evicts_idle_sockets(udp_auditor):
+    host, port, _ = udp_auditor
+
+    pool = UDPSocketPool(connect=False, idle_timeout=0.01)
+    first = UDP_Slug("first", url=host, port=port, socket_pool=pool)
+    second = UDP_Slug("second", url="localhost", port=port, socket_pool=pool)
+
+    assert first().ok is True
+    time.sleep(1.1)
+    assert second().ok is True
+
+    assert pool.evictions == 1
+    assert pool.stats()["open"] == 1
+    pool.close()
+    assert pool.stats()["open"] == 0
+
+
+def test_udp_socket_pool_keeps_sockets_in_use(udp_auditor):
+    """An idle sweep from another slug must not close a socket mid-burst."""
+    host, port, db_path = udp_auditor
+
+    with UDPSocketPool(idle_timeout=0.3) as pool:
+        burst = UDP_Slug(
+            "burst",
+            url=host,
+            port=port,
+            burst_size=5,
+            burst_delay_ms=200,
+            socket_pool=pool,
+        )
+        other = UDP_Slug("other", url="localhost", port=port, socket_pool=pool)
+        results = []
+        sender = threading.Thread(target=lambda: results.append(burst()))
+        sender.start()
+        time.sleep(0.5)
+        assert other().ok is True
+        sender.join()
+
+        assert results[0].ok is True, results[0].error
+        assert pool.evictions == 0
+        time.sleep(0.4)
+        assert other().ok is True
+        # Both idle now, the burst's socket included once it was handed back.
+        assert pool.evictions == 2
+
+    time.sleep(0.2)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM packets").fetchone()[0] == 7
+    conn.close()
+
+
+def test_udp_socket_pool_throughput():
+    """Benchmark: one pooled, connected socket against a fresh socket per call."""
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    calls = 2000
+
+    def per_second(slug):
+        start = time.perf_counter()
+        for _ in range(calls):
+            slug(task_kwargs={"reading": 1})
+        return calls / (time.perf_counter() - start)
+
+    try:
+        direct = UDP_Slug("direct", url="localhost", port=port, burst_size=1)
+        with UDPSocketPool() as pool:
+            pooled = UDP_Slug(
+                "pooled", url="localhost", port=port, burst_size=1, socket_pool=pool
+            )
+            direct_rates = [per_second(direct) for _ in range(3)]
+            pooled_rates = [per_second(pooled) for _ in range(3)]
+            assert pool.stats()["opened"] == 1
+    finally:
+        sink.close()
+
+    direct_rate = statistics.median(direct_rates)
+    pooled_rate = statistics.median(pooled_rates)
+    _COMPARE_STATS.append(
+        {
+            "name": "UDP_Slug sends/s fresh vs pooled",
+            # Seconds per send, so the report's ratio reads as a speed-up.
+            "baseline": 1 / direct_rate,
+            "candidate": 1 / pooled_rate,
+            "ok": pooled_rate >= direct_rate,
+        }
+    )
+    # Rates are only reported: under load either side can stall.  What pooling
+    # changes is the socket count, asserted above: one for 6000 sends.
+
+
+def test_udp_send_bulk_payloads(udp_auditor):
+    host, port, db_path = udp_auditor
+
+    with UDPSocketPool() as pool:
+        slug = UDP_Slug("bulk", url=host, port=port, socket_pool=pool)
+        result = slug.send_bulk(
+            ({"reading": f"{i:04d}"} for i in range(100)),
+            command="REAP",
+            task_kwargs={"crop": "wheat"},
+        )
+
+    assert result.ok is True and result.status == 200
+    assert result.delivered == 100 and result.failed == []
+    assert len(result.output) == len(result.tokens) == 100
+    assert result.output[7].body == {
+        "crop": "wheat",
+        "reading": "0007",
+        "command": "REAP",
+        "udp_id": result.output[7].body["udp_id"],
+    }
+    # Equal-sized messages share segmented sends: 100 datagrams, 2 syscalls.
+    assert result.syscalls < 100
+    assert set(result.sent) == {len(json.dumps(result.output[0].body))}
+
+    time.sleep(0.3)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 100
+    assert len({row[0] for row in rows}) == 100
+
+
+def test_udp_send_bulk_repeat_and_zero_delay_burst(udp_auditor):
+    host, port, db_path = udp_auditor
+
+    slug = UDP_Slug("bulk", url=host, port=port, burst_size=20, burst_delay_ms=0)
+    repeated = slug.send_bulk(command="PING", repeat=30)
+    assert repeated.ok is True
+    assert repeated.delivered == 30
+    assert len({p.body["udp_id"] for p in repeated.output}) == 1
+
+    start = time.perf_counter()
+    assert slug(command="BURST").ok is True
+    assert time.perf_counter() - start < 0.05
+
+    time.sleep(0.3)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 50
+    assert len({row[0] for row in rows}) == 2
+
+
+def test_udp_send_bulk_accounts_per_message(udp_auditor):
+    host, port, _ = udp_auditor
+
+    slug = UDP_Slug("bulk", url=host, port=port)
+    result = slug.send_bulk([{"n": 1}, {"n": 2, "blob": "x" * 70000}, {"n": 3}])
+    assert result.ok is False and result.status == 500
+    assert result.failed == [1]
+    assert result.delivered == 2
+
+    defaults = slug.send_bulk([None, {"n": 2}], task_kwargs={"n": 1, "crop": "rye"})
+    assert defaults.ok is True
+    assert [p.body["n"] for p in defaults.output] == [1, 2]
+    assert all(p.body["crop"] == "rye" for p in defaults.output)
+    assert result.sent[1] == 0 and result.sent[0] > 0
+    assert "1/3 failed" in result.error
+
+    # The plain per-message path gives the same accounting.
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        delivery = send_datagrams(sock, [b"a" * 8] * 5, (host, port), segment=False)
+    assert delivery.syscalls == 5
+    assert delivery.sent == [8] * 5
+
+
+def test_udp_send_bulk_throughput():
+    """Benchmark: one call per datagram against one send_bulk for all of them."""
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    payloads = [{"reading": f"{i:05d}"} for i in range(2000)]
+
+    try:
+        with UDPSocketPool() as pool:
+            slug = UDP_Slug("bulk", url="127.0.0.1", port=port, socket_pool=pool)
+
+            def per_call():
+                start = time.perf_counter()
+                for payload in payloads:
+                    slug(task_kwargs=payload)
+                return time.perf_counter() - start
+
+            def bulk():
+                start = time.perf_counter()
+                result = slug.send_bulk(payloads)
+                assert result.delivered == len(payloads)
+                syscalls.append(result.syscalls)
+                return time.perf_counter() - start
+
+            syscalls = []
+            call_cost = statistics.median(per_call() for _ in range(3))
+            bulk_cost = statistics.median(bulk() for _ in range(3))
+    finally:
+        sink.close()
+
+    _COMPARE_STATS.append(
+        {
+            "name": "UDP_Slug 2000 calls vs send_bulk",
+            "baseline": call_cost,
+            "candidate": bulk_cost,
+            "ok": bulk_cost < call_cost,
+        }
+    )
+    # Timings are only reported: on a busy machine either side can stall.  The
+    # syscall count is what batching actually changes.
+    if _segmentation.get(socket.AF_INET):
+        assert max(syscalls) <= -(-len(payloads) // GSO_MAX_SEGMENTS)
+    else:
+        assert syscalls == [len(payloads)] * 3
+
+
+def _arrival_deltas(db_path, udp_id):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT arrival_time FROM packets WHERE udp_id = ? ORDER BY arrival_time",
+        (udp_id,),
+    ).fetchall()
+    conn.close()
+    return np.diff([row[0] for row in rows])
+
+
+def test_udp_scheduled_burst_jitter(udp_auditor):
+    """Benchmark: inter-packet spacing of the timer wheel against the sleep loop."""
+    host, port, db_path = udp_auditor
+    burst_count, delay_ms, runs = 20, 20, 5
+    target_s = delay_ms / 1000
+
+    sleeper = UDP_Slug(
+        "sleeper", url=host, port=port, burst_size=burst_count, burst_delay_ms=delay_ms
+    )
+    slept, scheduled, send_errors = [], [], []
+    with BurstScheduler() as scheduler:
+        wheel = UDP_Slug(
+            "wheel",
+            url=host,
+            port=port,
+            burst_size=burst_count,
+            burst_delay_ms=delay_ms,
+            burst_scheduler=scheduler,
+        )
+        for _ in range(runs):
+            slept.append(sleeper(command="JITTER"))
+            submitted = time.monotonic()
+            handle = wheel.schedule(command="JITTER")
+            scheduled.append(handle.result(timeout=5))
+            assert len(handle.sent_at) == burst_count
+            # At or after each deadline, never before it.
+            assert all(
+                sent >= submitted + i * target_s
+                for i, sent in enumerate(handle.sent_at)
+            )
+            send_errors.extend(abs(gap - target_s) for gap in np.diff(handle.sent_at))
+
+    assert all(r.ok for r in slept + scheduled)
+    time.sleep(0.3)
+
+    errors = {}
+    for name, results in (("sleep loop", slept), ("timer wheel", scheduled)):
+        deltas = np.concatenate(
+            [_arrival_deltas(db_path, r.output.body["udp_id"]) for r in results]
+        )
+        assert len(deltas) == runs * (burst_count - 1)
+        med, std = float(np.median(deltas)), float(np.std(deltas))
+        errors[name] = float(np.median(np.abs(deltas - target_s)))
+        _BURST_STATS.append(
+            {
+                "name": f"UDP burst jitter ({name})",
+                "med": med,
+                "std": std,
+                "rate": 100.0,
+                "ok": (target_s * 0.9 <= med <= target_s * 1.1) and std < 0.003,
+            }
+        )
+        if name == "timer wheel":
+            assert target_s * 0.9 <= med <= target_s * 1.1
+
+    _COMPARE_STATS.append(
+        {
+            "name": "UDP burst gap error sleep vs wheel",
+            "baseline": errors["sleep loop"],
+            "candidate": errors["timer wheel"],
+            "ok": errors["timer wheel"] <= errors["sleep loop"],
+        }
+    )
+    _COMPARE_STATS.append(
+        {
+            "name": "UDP wheel send gap error p50 vs p90",
+            "baseline": float(np.percentile(send_errors, 90)),
+            "candidate": statistics.median(send_errors),
+            "ok": True,
+        }
+    )
+    # Absolute sub-millisecond bounds are at the mercy of whatever else the machine
+    # runs; both loops suffer the same stalls, so compare the wheel to the sleep loop.
+    assert errors["timer wheel"] <= max(errors["sleep loop"] * 2, 0.002)
+
+
+def test_burst_scheduler_thousands_of_bursts_one_thread():
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    bursts, burst_count, delay = 2000, 5, 0.02
+
+    threads_before = threading.active_count()
+    try:
+        with UDPSocketPool() as pool, BurstScheduler() as scheduler:
+            root = UDP_Slug(
+                "fleet",
+                url="127.0.0.1",
+                port=port,
+                burst_size=burst_count,
+                burst_delay_ms=int(delay * 1000),
+                socket_pool=pool,
+                burst_scheduler=scheduler,
+            )
+            start = time.perf_counter()
+            handles = [root.schedule(task_kwargs={"unit": i}) for i in range(bursts)]
+            submitted = time.perf_counter() - start
+            assert threading.active_count() == threads_before + 1
+
+            results = [handle.result(timeout=10) for handle in handles]
+            elapsed = time.perf_counter() - start
+            assert scheduler.stats() == {"pending": 0, "fired": bursts * burst_count}
+    finally:
+        sink.close()
+
+    assert all(result.ok for result in results)
+    assert submitted < (burst_count - 1) * delay * 10
+    assert elapsed < submitted + (burst_count - 1) * delay + 1.0
+
+    # Each packet against its deadline (i * delay after the burst's first packet).
+    errors = [
+        abs((sent - handle.sent_at[0]) - i * delay)
+        for handle in handles
+        for i, sent in enumerate(handle.sent_at)
+    ]
+    assert statistics.median(errors) < 0.005
+
+
+def test_burst_scheduler_async_and_cancel(udp_auditor):
+    host, port, db_path = udp_auditor
+
+    with BurstScheduler() as scheduler:
+        slug = UDP_Slug(
+            "async_wheel",
+            url=host,
+            port=port,
+            burst_size=3,
+            burst_delay_ms=50,
+            burst_scheduler=scheduler,
+        )
+
+        async def run_all():
+            return await asyncio.gather(
+                slug.acall(command="A"), slug.acall(command="B")
+            )
+
+        start = time.perf_counter()
+        results = asyncio.run(run_all())
+        assert time.perf_counter() - start < 0.2
+        assert all(r.ok for r in results)
+
+        slow = slug.branch("slow", burst_size=10, burst_delay_ms=100)
+        handle = slow.schedule(command="C")
+        time.sleep(0.15)
+        assert handle.cancel() is True
+        time.sleep(0.2)
+        assert 1 <= len(handle.sent_at) <= 3
+        assert scheduler.stats()["pending"] == 0
+
+    time.sleep(0.2)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT udp_id FROM packets").fetchall()
+    conn.close()
+    assert len(rows) == 6 + len(handle.sent_at)